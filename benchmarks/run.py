@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Throughput benchmarks of the time steppers on the NumPy/SciPy heat problem
+for a range of problem sizes in 1D, 2D, and 3D.
+
+    python benchmarks/run.py -o results.json
+    python benchmarks/run.py -o new.json --compare results.json
+    python benchmarks/run.py --threads 1 2 4 8
+    python benchmarks/run.py --bandwidth --threads 1 2 4 8
+
+With several `--threads`, every case is run with each thread count, which
+shows how the (memory-bound) evaluations scale across cores. With
+`--bandwidth`, only the evaluations of :math:`\\alpha M u + \\beta F(u)`
+are timed, and reported as the memory bandwidth they reach (the bytes of the
+matrices and vectors they have to read and write, per second) and its
+speedup over the first of the `--threads`.
+
+With `--compare`, all cases which got slower by more than `--threshold`
+are listed and the exit code is nonzero.
+'''
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from timeit import default_timer as timer
+import tracemalloc
+
+import numpy
+import scipy
+
+# Benchmark the checkout this script is part of, whether or not parabolic is
+# installed. The experimental steppers are not part of the package at all.
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path[:0] = [ROOT_DIR, os.path.join(ROOT_DIR, 'experimental')]
+# pylint: disable=import-error,wrong-import-position
+import parabolic  # noqa: E402
+from parabolic.numpy_backend import Heat  # noqa: E402
+from time_steppers import Heun  # noqa: E402
+
+
+STEPPERS = {
+    'ExplicitEuler': parabolic.ExplicitEuler,
+    'ImplicitEuler': parabolic.ImplicitEuler,
+    'Trapezoidal': parabolic.Trapezoidal,
+    'Heun': Heun,
+    }
+
+SIZES = {
+    1: [1000, 10000, 100000],
+    2: [31, 127, 511],
+    3: [7, 15, 31],
+    }
+
+QUICK_SIZES = {
+    1: [1000],
+    2: [31],
+    3: [7],
+    }
+
+
+def _initial_state(problem):
+    return numpy.prod(numpy.sin(numpy.pi * problem.points), axis=1)
+
+
+def _stable_dt(problem):
+    # Well within the stability limit of the explicit methods, such that the
+    # state stays bounded.
+    h = 1.0 / (problem.n + 1)
+    return 0.1 * h**2 / problem.dim
+
+
+def run_case(Stepper, dim, n, min_time=0.2, dtype='float64', num_threads=1):
+    problem = Heat(n, dim=dim, dtype=dtype, num_threads=num_threads)
+    stepper = Stepper(problem)
+    u = _initial_state(problem).astype(dtype)
+    dt = _stable_dt(problem)
+
+    # Warm up; this includes the factorizations.
+    u = stepper.step(u, 0.0, dt)
+
+    # Double the number of steps until the run takes long enough.
+    num_steps = 1
+    while True:
+        start = timer()
+        for _ in range(num_steps):
+            u = stepper.step(u, 0.0, dt)
+        elapsed = timer() - start
+        if elapsed > min_time:
+            break
+        num_steps *= 2
+
+    # Peak memory of a single step, measured separately since tracemalloc
+    # slows down everything.
+    tracemalloc.start()
+    stepper.step(u, 0.0, dt)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    num_dofs = problem.M.shape[0]
+    steps_per_second = num_steps / elapsed
+    return {
+        'stepper': Stepper.__name__,
+        'dim': dim,
+        'n': n,
+        'dtype': dtype,
+        'num_threads': num_threads,
+        'num_dofs': num_dofs,
+        'num_steps': num_steps,
+        'steps_per_second': steps_per_second,
+        'dof_steps_per_second': num_dofs * steps_per_second,
+        'peak_memory_per_step': peak,
+        }
+
+
+def _eval_bytes(problem):
+    # The memory traffic of one evaluation: the values, indices, and row
+    # pointers of M and A, reading u twice and the forcing once, and writing
+    # the result.
+    matrices = [problem._M, problem._A]  # pylint: disable=protected-access
+    num_bytes = sum(
+        m.data.nbytes + m.indices.nbytes + m.indptr.nbytes for m in matrices
+        )
+    vector = problem.M.shape[0] * problem.dtype.itemsize
+    return num_bytes + 3 * vector + problem.M.shape[0] * 8
+
+
+def run_bandwidth_case(dim, n, min_time=0.2, dtype='float64', num_threads=1):
+    problem = Heat(
+        n, dim=dim, f=lambda x, t: x[:, 0], dtype=dtype,
+        num_threads=num_threads
+        )
+    u = _initial_state(problem).astype(dtype)
+    dt = _stable_dt(problem)
+
+    # Warm up; this starts the thread pool and evaluates the forcing.
+    problem.eval_alpha_M_beta_F(1.0, dt, u, 0.0)
+
+    num_evals = 1
+    while True:
+        start = timer()
+        for _ in range(num_evals):
+            problem.eval_alpha_M_beta_F(1.0, dt, u, 0.0)
+        elapsed = timer() - start
+        if elapsed > min_time:
+            break
+        num_evals *= 2
+
+    return {
+        'dim': dim,
+        'n': n,
+        'dtype': dtype,
+        'num_threads': num_threads,
+        'num_dofs': problem.M.shape[0],
+        'evals_per_second': num_evals / elapsed,
+        'bytes_per_second': _eval_bytes(problem) * num_evals / elapsed,
+        }
+
+
+def run_bandwidth(sizes, min_time, dtype='float64', threads=(1,)):
+    results = []
+    for dim in sorted(sizes):
+        for n in sizes[dim]:
+            first = None
+            for num_threads in threads:
+                result = run_bandwidth_case(
+                    dim, n, min_time=min_time, dtype=dtype,
+                    num_threads=num_threads
+                    )
+                if first is None:
+                    first = result['bytes_per_second']
+                result['speedup'] = result['bytes_per_second'] / first
+                print(
+                    '{}D  {:9d} dofs  {:2d} threads  {:8.2f} GB/s  '
+                    '{:5.2f}x'.format(
+                        dim, result['num_dofs'], num_threads,
+                        1.0e-9 * result['bytes_per_second'],
+                        result['speedup']
+                        ))
+                results.append(result)
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__))
+            ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, steppers, min_time, dtype='float64', threads=(1,)):
+    results = []
+    for dim in sorted(sizes):
+        for n in sizes[dim]:
+            for name in steppers:
+                for num_threads in threads:
+                    result = run_case(
+                        STEPPERS[name], dim, n, min_time=min_time,
+                        dtype=dtype, num_threads=num_threads
+                        )
+                    print(
+                        '{:14s} {}D  {:9d} dofs  {:2d} threads  '
+                        '{:10.1f} steps/s  {:.3e} dof-steps/s  '
+                        '{:9d} B'.format(
+                            name, dim, result['num_dofs'], num_threads,
+                            result['steps_per_second'],
+                            result['dof_steps_per_second'],
+                            result['peak_memory_per_step']
+                            ))
+                    results.append(result)
+    return {
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'scipy': scipy.__version__,
+        'parabolic': parabolic.__version__,
+        'results': results,
+        }
+
+
+def compare(new, old, threshold):
+    '''
+    Returns the list of cases which are slower in `new` than in `old` by
+    more than the relative `threshold`.
+    '''
+    def key(r):
+        return (
+            r['stepper'], r['dim'], r['n'], r.get('dtype', 'float64'),
+            r.get('num_threads', 1)
+            )
+
+    old_results = {key(r): r for r in old['results']}
+    regressions = []
+    for r in new['results']:
+        if key(r) not in old_results:
+            continue
+        ratio = (
+            r['steps_per_second'] / old_results[key(r)]['steps_per_second']
+            )
+        if ratio < 1.0 - threshold:
+            regressions.append((key(r), ratio))
+    return regressions
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Benchmark parabolic time steppers.'
+        )
+    parser.add_argument('-o', '--output', help='write results to JSON file')
+    parser.add_argument(
+        '--compare', help='JSON results to compare against'
+        )
+    parser.add_argument(
+        '--threshold', type=float, default=0.1,
+        help='relative slowdown considered a regression (default: 0.1)'
+        )
+    parser.add_argument(
+        '--steppers', nargs='+', default=sorted(STEPPERS),
+        choices=sorted(STEPPERS)
+        )
+    parser.add_argument(
+        '--quick', action='store_true', help='only run the smallest sizes'
+        )
+    parser.add_argument(
+        '--min-time', type=float, default=0.2,
+        help='minimum time per case in seconds (default: 0.2)'
+        )
+    parser.add_argument(
+        '--dtype', default='float64', choices=['float64', 'float32'],
+        help='state precision; float32 is mixed precision (default: float64)'
+        )
+    parser.add_argument(
+        '--threads', type=int, nargs='+', default=[1],
+        help='numbers of threads for the evaluations (default: 1)'
+        )
+    parser.add_argument(
+        '--bandwidth', action='store_true',
+        help='only time the evaluations and report their memory bandwidth'
+        )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    sizes = QUICK_SIZES if args.quick else SIZES
+    if args.bandwidth:
+        results = run_bandwidth(
+            sizes, args.min_time, dtype=args.dtype, threads=args.threads
+            )
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({'bandwidth': results}, f, indent=2)
+        return 0
+
+    data = run(
+        sizes, args.steppers, args.min_time, dtype=args.dtype,
+        threads=args.threads
+        )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        regressions = compare(data, old, args.threshold)
+        for (name, dim, n, _, _), ratio in regressions:
+            print('REGRESSION {} {}D n={}: {:.1f}% of previous throughput'.format(
+                name, dim, n, 100 * ratio
+                ))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
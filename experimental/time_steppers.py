@@ -2,6 +2,9 @@
 #
 import numpy
 
+from parabolic.interpolation import LinearInterpolant
+from parabolic.kernels import linear_combination
+
 
 class Heun(object):
     '''
@@ -9,6 +12,8 @@ class Heun(object):
     https://en.wikipedia.org/wiki/Heun's_method
     '''
     order = 2.0
+    # stable for dt*lambda in [-2, 0] for real eigenvalues lambda
+    stability_limit = 2.0
 
     def __init__(self, problem):
         self.problem = problem
@@ -27,6 +32,10 @@ class Heun(object):
     def step(self, u0, t, dt):
         return _runge_kutta_step(self.problem, self.tableau, u0, t, dt)
 
+    def dense_output(self, u0, u1, t, dt):
+        # Second-order accurate, just like the method.
+        return LinearInterpolant(t, u0, t+dt, u1)
+
 
 # def rk4_step(
 #         V,
@@ -121,27 +130,71 @@ def _runge_kutta_step(
     #                 )
     #             )
 
+    num_threads = getattr(problem, 'num_threads', 1)
+
     # Compute the stage values.
-    k = [u0.copy() for i in range(s)]
+    k = []
+    L = []
     for i in range(s):
-        U = u0.copy()
-        for j in range(i):
-            if A[i][j] != 0.0:
-                U.vector()[:] += dt * A[i][j] * k[j].vector()
+        U = _accumulate(
+            u0, [(dt * A[i][j], k[j]) for j in range(i)],
+            num_threads=num_threads
+            )
 
-        L = problem.eval_alpha_M_beta_F(0.0, 1.0, U, t + c[i]*dt)
+        L.append(problem.eval_alpha_M_beta_F(0.0, 1.0, U, t + c[i]*dt))
         # TODO boundary conditions!
         # for g in BCS[1]:
         #     g.t = t + c[i] * dt
-        k[i].assign(problem.solve_alpha_M_beta_F(1.0, 0.0, L, t + c[i]*dt))
+        # The last stage derivative is never needed.
+        if i < s-1:
+            k.append(
+                problem.solve_alpha_M_beta_F(1.0, 0.0, L[i], t + c[i]*dt)
+                )
 
-    # Put it all together.
-    U = u0.copy()
-    for i in range(s):
-        U.vector()[:] += dt * b[i] * k[i].vector()
+    # Put it all together. Assemble
+    #
+    #    M u{k+1} = M u{k} + dt * sum_i b_i F(U_i)
+    #
+    # from the stage evaluations and solve once; this is correct for any M.
+    rhs = _accumulate(
+        problem.eval_alpha_M_beta_F(1.0, 0.0, u0, t),
+        [(dt * b[i], L[i]) for i in range(s)],
+        keep_double=True,
+        num_threads=num_threads
+        )
 
     # TODO boundary conditions
     # for g in BCS[0]:
     #     g.t = t + dt
-    theta = problem.solve_alpha_M_beta_F(1.0, 0.0, U, t+dt)
+    theta = problem.solve_alpha_M_beta_F(1.0, 0.0, rhs, t+dt)
     return theta
+
+
+def _accumulate(u, terms, keep_double=False, num_threads=1):
+    '''
+    :math:`u + \\sum_j c_j v_j` for `terms = [(c_j, v_j), ...]`. For
+    single-precision arrays, the sum is accumulated in double precision and
+    rounded once at the end, unless `keep_double` is set. Double-precision
+    arrays are combined in one (blocked, possibly multithreaded) pass.
+    '''
+    if isinstance(u, numpy.ndarray) and u.dtype == numpy.float32:
+        out = u.astype(numpy.float64)
+        for c, v in terms:
+            if c != 0.0:
+                # the float64 scalar makes the product double precision
+                out += numpy.float64(c) * v
+        return out if keep_double else out.astype(u.dtype)
+
+    if isinstance(u, numpy.ndarray):
+        return linear_combination(u, terms, num_threads=num_threads)
+
+    out = u.copy()
+    for c, v in terms:
+        if c != 0.0:
+            _vector(out)[:] += c * _vector(v)
+    return out
+
+
+def _vector(u):
+    # Coefficient vector of dolfin functions; plain arrays are used as is.
+    return u.vector() if hasattr(u, 'vector') else u
@@ -1,9 +1,13 @@
 # -*- coding: utf-8 -*-
 #
+'''
+The public names are imported lazily on first access, so `import parabolic`
+is cheap and has no side effects. This matters for worker processes which
+import the package many times.
+'''
 from __future__ import print_function
 
-# pylint: disable=wildcard-import
-from .time_steppers import *
+import importlib
 
 from .__about__ import (
     __version__,
@@ -11,10 +15,80 @@ from .__about__ import (
     __author_email__
     )
 
-try:
-    import pipdate
-except ImportError:
-    pass
-else:
+# public name -> submodule defining it
+_LAZY = {
+    'ExplicitEuler': 'time_steppers',
+    'ImplicitEuler': 'time_steppers',
+    'Theta': 'time_steppers',
+    'Trapezoidal': 'time_steppers',
+    'ActiveSet': 'active_set',
+    'adjoint_gradient': 'adjoint',
+    'revolve': 'adjoint',
+    'integrate_async': 'async_driver',
+    'autotune': 'tuning',
+    'save_checkpoint': 'checkpoint',
+    'load_checkpoint': 'checkpoint',
+    'integrate': 'driver',
+    'integrate_to_steady_state': 'driver',
+    'ForcingCache': 'forcing',
+    'AffineForcing': 'forcing',
+    'Instrumented': 'instrumentation',
+    'LinearInterpolant': 'interpolation',
+    'AsyncWriter': 'output',
+    'read_snapshots': 'output',
+    'periodic_steady_state': 'periodic',
+    'RunCache': 'run_cache',
+    'run_fingerprint': 'run_cache',
+    'IncrementalPOD': 'reduced',
+    'ReducedProblem': 'reduced',
+    'integrate_reduced': 'reduced',
+    'StepSizeLadder': 'step_size',
+    'StiffnessSwitching': 'switching',
+    'TuningOptions': 'tuning',
+    'compute_numerical_order_of_convergence': 'verification',
+    'compute_time_errors': 'verification',
+    'verify_temporal_order': 'verification',
+    }
+
+# submodules with optional dependencies, available as attributes
+_SUBMODULES = [
+    'manufactured',
+    'matrix_free',
+    'multigrid',
+    'numpy_backend',
+    'scheduler',
+    'structured',
+    ]
+
+__all__ = sorted(_LAZY) + ['check_for_updates']
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        module = importlib.import_module('.' + _LAZY[name], __name__)
+        value = getattr(module, name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module('.' + name, __name__)
+    else:
+        raise AttributeError(
+            'module {!r} has no attribute {!r}'.format(__name__, name)
+            )
+    # Cache it; __getattr__ is only called for missing attributes.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | set(_SUBMODULES))
+
+
+def check_for_updates():
+    '''
+    Prints a note if a newer version of parabolic is available. Needs
+    `pipdate`.
+    '''
+    # optional dependency, only needed here
+    import pipdate  # pylint: disable=import-error,import-outside-toplevel
     if pipdate.needs_checking(__name__):
         print(pipdate.check(__name__, __version__), end='')
+    return
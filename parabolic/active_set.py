@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Time stepping restricted to the part of the domain where the solution
+actually changes, e.g., around a moving heat source.
+'''
+import numpy
+import scipy.sparse.linalg
+
+from .interpolation import LinearInterpolant
+from .time_steppers import Theta
+
+
+# pylint: disable-next=too-many-instance-attributes
+class ActiveSet(object):
+    '''
+    Theta method (see :class:`parabolic.Theta`; `theta=0` is explicit Euler)
+    for a :class:`parabolic.numpy_backend.LinearProblem` which only updates
+    the active DOFs, i.e., the DOFs whose change per step exceeds `tol`
+    times the maximum of the solution, plus `halo` layers of neighbors in the
+    sparsity graph of `M` and `A`. All other DOFs are frozen, so a step
+    solves
+
+    .. math::
+        (M_{SS} - \\theta dt A_{SS}) d_S
+            = dt (A_{S:} u_k + \\theta f_S(t+dt) + (1-\\theta) f_S(t))
+
+    for the update :math:`u_{k+1} - u_k` on the active set :math:`S` only.
+    The factorization of the restricted matrix is kept until the set changes.
+
+    The set grows by itself: if DOFs at its edge change by more than `tol`,
+    their neighbors are added for the next step, as are the DOFs reported by
+    the problem's `activity_mask(t0, t1, tol)` (if it has one), e.g., where
+    a source is switched on. Every `check_every` steps, a full step is taken
+    and the set is recomputed from scratch, which also lets it shrink. Frozen
+    DOFs hence drift by at most about `check_every * tol` relative to the
+    solution between checks.
+    '''
+    def __init__(self, problem, theta=1.0, tol=1.0e-6, halo=2,
+                 check_every=20):
+        self.problem = problem
+        self.theta = theta
+        self.order = 2.0 if theta == 0.5 else 1.0
+        self.tol = tol
+        self.halo = halo
+        self.check_every = check_every
+        self._full = Theta(problem, theta=theta)
+        self._graph = (abs(problem.M) + abs(problem.A)).tocsr()
+        self.reset()
+        return
+
+    def reset(self):
+        self.active = None
+        self.num_full_steps = 0
+        self.num_restricted_steps = 0
+        self._steps_taken = 0
+        # the system restricted to the active set, see _set_active()
+        self._mask = None
+        self._M_SS = None
+        self._A_rows = None
+        self._A_SS = None
+        self._factorizations = {}
+        self._edge = None
+        return
+
+    def _dilate(self, idx, mask=None):
+        # `idx` plus `halo` layers of neighbors, as a sorted index array
+        mask = numpy.zeros(len(self._graph.indptr) - 1, dtype=bool) \
+            if mask is None else mask.copy()
+        mask[idx] = True
+        for _ in range(self.halo):
+            neighbors = self._graph[idx].indices
+            idx = numpy.unique(neighbors[~mask[neighbors]])
+            mask[idx] = True
+        return numpy.flatnonzero(mask)
+
+    def _set_active(self, idx):
+        problem = self.problem
+        self.active = idx
+        self._mask = numpy.zeros(problem.M.shape[0], dtype=bool)
+        self._mask[idx] = True
+        self._M_SS = problem.M[idx][:, idx]
+        self._A_rows = problem.A[idx]
+        self._A_SS = self._A_rows[:, idx]
+        self._factorizations = {}
+        # DOFs in the set with neighbors outside of it
+        if len(idx) > 0:
+            rows = self._graph[idx]
+            outside = (~self._mask[rows.indices]).astype(int)
+            self._edge = numpy.add.reduceat(outside, rows.indptr[:-1]) > 0
+        else:
+            self._edge = numpy.zeros(0, dtype=bool)
+        return
+
+    def _problem_mask(self, t0, t1):
+        activity_mask = getattr(self.problem, 'activity_mask', None)
+        if activity_mask is None:
+            return numpy.zeros(len(self._graph.indptr) - 1, dtype=bool)
+        return activity_mask(t0, t1, self.tol)
+
+    def _restricted_update(self, u0, t, dt):
+        idx = self.active
+        rhs = self._A_rows.dot(u0)
+        f0 = self.problem.forcing(t)
+        if f0 is not None:
+            f1 = self.problem.forcing(t+dt)
+            rhs += (1.0-self.theta) * f0[idx] + self.theta * f1[idx]
+        if dt not in self._factorizations:
+            self._factorizations[dt] = scipy.sparse.linalg.splu(
+                (self._M_SS - self.theta * dt * self._A_SS).tocsc()
+                )
+        return self._factorizations[dt].solve(dt * rhs)
+
+    def step(self, u0, t, dt):
+        if self.active is None or self._steps_taken % self.check_every == 0:
+            self._steps_taken += 1
+            self.num_full_steps += 1
+            u1 = self._full.step(u0, t, dt)
+            changed = abs(u1 - u0) > self.tol * numpy.max(abs(u1))
+            changed |= self._problem_mask(t, t+dt)
+            self._set_active(self._dilate(numpy.flatnonzero(changed)))
+            return u1
+
+        self._steps_taken += 1
+        self.num_restricted_steps += 1
+        new = self._problem_mask(t, t+dt) & ~self._mask
+        if new.any():
+            self._set_active(
+                self._dilate(numpy.flatnonzero(new), self._mask)
+                )
+
+        u1 = numpy.array(u0, dtype=float)
+        if len(self.active) == 0:
+            return u1
+        d = self._restricted_update(u0, t, dt)
+        u1[self.active] += d
+
+        # Grow the set where the update reaches its edge.
+        grow = self._edge & (abs(d) > self.tol * numpy.max(abs(u1)))
+        if grow.any():
+            self._set_active(self._dilate(self.active[grow], self._mask))
+        return u1
+
+    def dense_output(self, u0, u1, t, dt):
+        return LinearInterpolant(t, u0, t+dt, u1)
+
+    def get_state(self):
+        state = {
+            'num_full_steps': self.num_full_steps,
+            'num_restricted_steps': self.num_restricted_steps,
+            'steps_taken': self._steps_taken,
+            }
+        if self.active is not None:
+            state['active'] = self.active
+        return state
+
+    def set_state(self, state):
+        self.num_full_steps = int(state['num_full_steps'])
+        self.num_restricted_steps = int(state['num_restricted_steps'])
+        self._steps_taken = int(state['steps_taken'])
+        if 'active' in state:
+            self._set_active(numpy.array(state['active'], dtype=int))
+        else:
+            self.active = None
+        return
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Discrete adjoints of linear one-step methods of theta type,
+
+.. math::
+    (M - \\theta dt A) u_{n+1} = (M + (1-\\theta) dt A) u_n
+        + dt (\\theta f_{n+1} + (1-\\theta) f_n),
+
+i.e., `ExplicitEuler` (theta=0), `Trapezoidal` (theta=1/2), and
+`ImplicitEuler` (theta=1). Besides the usual protocol, the problem needs to
+provide
+
+  * `eval_alpha_M_beta_A_transposed(alpha, beta, v)`:
+    :math:`(\\alpha M + \\beta A)^T v`, and
+  * `solve_alpha_M_beta_A_transposed(alpha, beta, b)`:
+    solve :math:`(\\alpha M + \\beta A)^T x = b`,
+
+as `parabolic.numpy_backend.LinearProblem` does, reusing its cached
+factorizations.
+
+The adjoint sweep needs the forward states in reverse order. Instead of
+storing all of them, at most `num_checkpoints` states are kept and the
+others are recomputed following the binomial checkpointing schedule of
+
+    A. Griewank, A. Walther,
+    Algorithm 799: Revolve,
+    ACM TOMS 26 (1), 2000,
+    <https://doi.org/10.1145/347837.347846>,
+
+which minimizes the number of recomputed steps for the given memory.
+'''
+import copy
+
+import numpy
+
+from .time_steppers import ImplicitEuler
+
+
+def _revolve_split(num_steps, num_snapshots):
+    '''
+    Optimal position of the next checkpoint for reversing `num_steps` steps
+    with `num_snapshots` snapshots (including the one of the start state),
+    cf. the function `revolve` in Griewank's and Walther's reference
+    implementation.
+    '''
+    snaps = num_snapshots
+    reps = 0
+    rnge = 1
+    while rnge < num_steps:
+        reps += 1
+        rnge = rnge * (reps + snaps) // reps
+    bino1 = rnge * reps // (snaps + reps)
+    bino2 = bino1 * snaps // (snaps + reps - 1) if snaps > 1 else 1
+    if snaps == 1:
+        bino3 = 0
+    else:
+        bino3 = bino2 * (snaps - 1) // (snaps + reps - 2) if snaps > 2 else 1
+    bino4 = bino2 * (reps - 1) // snaps
+    if snaps < 3:
+        bino5 = 0
+    else:
+        bino5 = bino3 * (snaps - 2) // reps if snaps > 3 else 1
+
+    if num_steps <= bino1 + bino3:
+        m = max(bino4, 1)
+    elif num_steps >= rnge - bino5:
+        m = bino1
+    else:
+        m = num_steps - bino2 - bino3
+    return max(m, 1)
+
+
+def revolve(forward, backward, u0, num_steps, num_checkpoints):
+    '''
+    Calls `backward(n, u_n, u_{n+1})` for `n = num_steps-1, ..., 0`, where
+    the states are computed by `u_{n+1} = forward(n, u_n)` from `u0`. Apart
+    from `u0`, at most `num_checkpoints` states are held at any time.
+
+    Returns the total number of calls to `forward`.
+    '''
+    count = [0]
+
+    def _forward(n, u):
+        count[0] += 1
+        return forward(n, u)
+
+    def _reverse(u, n0, l, s):
+        # Reverses steps n0, ..., n0+l-1 starting from u = u_{n0} with s
+        # checkpoints in addition to u.
+        while l > 0:
+            if l == 1:
+                backward(n0, u, _forward(n0, u))
+                return
+            if s == 0:
+                # No memory left; recompute the last state from u.
+                v = u
+                for j in range(l-1):
+                    v = _forward(n0+j, v)
+                backward(n0+l-1, v, _forward(n0+l-1, v))
+                l -= 1
+                continue
+            m = _revolve_split(l, s+1)
+            v = u
+            for j in range(m):
+                v = _forward(n0+j, v)
+            _reverse(v, n0+m, l-m, s-1)
+            # continue with the first m steps
+            l = m
+        return
+
+    _reverse(u0, 0, num_steps, num_checkpoints)
+    return count[0]
+
+
+# pylint: disable-next=too-many-arguments
+def adjoint_gradient(
+        stepper, u0, t0, dt, num_steps, *,
+        dJdu,
+        dF_dp=None,
+        num_checkpoints=None,
+        memory=None
+        ):
+    '''
+    Gradient of :math:`J(u_N)` with respect to the initial state `u0` and,
+    if `dF_dp` is given, with respect to the parameters `p` of the problem,
+    where :math:`u_N` is the result of `num_steps` steps of size `dt` from
+    `t0`.
+
+    `dJdu(u_N)` returns the gradient of `J`. `dF_dp(u, t)` returns the
+    derivative of :math:`F(u, t) = A u + f(t)` with respect to the
+    parameters as an array of shape `(len(u), num_params)`; `M` must not
+    depend on the parameters.
+
+    The memory budget for the forward states is given either as
+    `num_checkpoints` or in bytes as `memory`. Without either, all states
+    are stored.
+
+    The Rannacher smoothing of :class:`parabolic.Theta` applies to the first
+    `rannacher_steps` steps from `u0`, whatever steps `stepper` has taken
+    before.
+
+    Returns the pair `(dJ/du0, dJ/dp)`; the latter is `None` without
+    `dF_dp`. For `num_steps=0`, they are `dJdu(u0)` and zeros.
+    '''
+    if num_steps < 0:
+        raise ValueError(
+            'The number of steps must not be negative, got {}.'.format(
+                num_steps
+                ))
+    if num_steps == 0:
+        # J(u0) does not depend on the parameters.
+        grad_p = None
+        if dF_dp is not None:
+            grad_p = numpy.zeros(dF_dp(u0, t0).shape[1])
+        return dJdu(u0), grad_p
+
+    problem = stepper.problem
+    # The checkpointing recomputes steps out of order, so the smoothed steps
+    # are taken by a separate implicit Euler stepper instead of counting.
+    num_smoothed = getattr(stepper, 'rannacher_steps', 0)
+    smoothing = None
+    if num_smoothed > 0:
+        smoothing = ImplicitEuler(problem)
+        stepper = copy.copy(stepper)
+        stepper.rannacher_steps = 0
+
+    def theta_of(n):
+        return 1.0 if n < num_smoothed else stepper.theta
+
+    if num_checkpoints is None:
+        if memory is None:
+            num_checkpoints = num_steps
+        else:
+            num_checkpoints = max(int(memory // numpy.asarray(u0).nbytes), 0)
+
+    def forward(n, u):
+        s = smoothing if n < num_smoothed else stepper
+        return s.step(u, t0 + n*dt, dt)
+
+    # The adjoint state lambda_{n+1}, initialized in the last step when
+    # u_N is available
+    lmbda = [None]
+    grad_p = [None]
+
+    def backward(n, u_n, u_n1):
+        if lmbda[0] is None:
+            lmbda[0] = dJdu(u_n1)
+        theta = theta_of(n)
+        mu = problem.solve_alpha_M_beta_A_transposed(
+            1.0, -theta*dt, lmbda[0]
+            )
+        if dF_dp is not None:
+            g = 0.0
+            if theta != 0.0:
+                g = g + theta * dt * dF_dp(u_n1, t0 + (n+1)*dt).T.dot(mu)
+            if theta != 1.0:
+                g = g + (1.0-theta) * dt * dF_dp(u_n, t0 + n*dt).T.dot(mu)
+            grad_p[0] = g if grad_p[0] is None else grad_p[0] + g
+        lmbda[0] = problem.eval_alpha_M_beta_A_transposed(
+            1.0, (1.0-theta)*dt, mu
+            )
+        return
+
+    revolve(forward, backward, u0, num_steps, num_checkpoints)
+    return lmbda[0], grad_p[0]
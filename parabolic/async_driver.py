@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+#
+'''
+asyncio version of :func:`parabolic.integrate` for services which advance
+many simulations concurrently without blocking the event loop.
+'''
+import asyncio
+
+from .driver import integrate
+
+
+_DONE = object()
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+async def integrate_async(
+        stepper, u0, t0, t_end, dt,
+        output_times=None, *,
+        executor=None,
+        deadline=None
+        ):
+    '''
+    Asynchronous generator with the same arguments and results as
+    :func:`parabolic.integrate`,
+
+        async for t, u in integrate_async(stepper, u0, t0, t_end, dt):
+            ...
+
+    Every step runs in `executor` (default: the loop's default executor).
+    Pass the same bounded `concurrent.futures.ThreadPoolExecutor` to all
+    simulations to limit the number of concurrent solves. Since every
+    simulation has at most one step in flight and the executor works in
+    submission order, the simulations advance in turn.
+
+    If the simulation is not finished at `deadline` (in terms of
+    `loop.time()`), `asyncio.TimeoutError` is raised. On timeout or
+    cancellation, the step in flight still finishes in its worker thread but
+    its result is discarded.
+    '''
+    loop = asyncio.get_running_loop()
+    steps = integrate(stepper, u0, t0, t_end, dt, output_times=output_times)
+    while True:
+        future = loop.run_in_executor(executor, next, steps, _DONE)
+        if deadline is None:
+            item = await future
+        else:
+            timeout = deadline - loop.time()
+            if timeout <= 0.0:
+                future.cancel()
+                raise asyncio.TimeoutError()
+            item = await asyncio.wait_for(future, timeout)
+        if item is _DONE:
+            return
+        yield item
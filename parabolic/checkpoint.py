@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Checkpoints for resuming interrupted runs.
+
+A checkpoint is a directory with one `.npy` file per state vector and a
+`checkpoint.json` with the metadata. The metadata file is replaced
+atomically and only then are the vectors of the previous checkpoint removed,
+so a run interrupted while writing still leaves a consistent checkpoint.
+
+Steppers with internal state (e.g., step counters, history vectors) expose
+it through `get_state()`, returning a dictionary of arrays and scalars, and
+`set_state(state)`.
+'''
+import json
+import os
+import re
+import uuid
+
+import numpy
+
+
+_METADATA = 'checkpoint.json'
+# `<key>.<generation>.npy`, see `save_checkpoint`
+_ARRAY_FILE = re.compile(r'^(u|stepper\..+)\.[0-9a-f]{32}\.npy$')
+
+
+def has_checkpoint(directory):
+    return os.path.isfile(os.path.join(directory, _METADATA))
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def save_checkpoint(directory, stepper, u, t, dt, step=0, **extra):
+    '''
+    Writes `u`, the internal state of `stepper`, and the metadata `t`, `dt`,
+    `step` as well as the JSON-serializable `extra` data into `directory`.
+    '''
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    generation = uuid.uuid4().hex
+    arrays = {'u': u}
+    scalars = {}
+    get_state = getattr(stepper, 'get_state', None)
+    if get_state is not None:
+        for key, value in get_state().items():
+            if isinstance(value, numpy.ndarray):
+                arrays['stepper.' + key] = value
+            else:
+                scalars[key] = value
+
+    filenames = {}
+    for key, value in arrays.items():
+        filenames[key] = '{}.{}.npy'.format(key, generation)
+        numpy.save(os.path.join(directory, filenames[key]), value)
+
+    metadata = {
+        'method': type(stepper).__name__,
+        't': t,
+        'dt': dt,
+        'step': step,
+        'arrays': filenames,
+        'stepper_scalars': scalars,
+        'extra': extra,
+        }
+    tmp = os.path.join(directory, _METADATA + '.' + generation)
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f)
+    os.replace(tmp, os.path.join(directory, _METADATA))
+
+    # Remove the files of previous (or interrupted) checkpoints, but nothing
+    # else which may be in the directory.
+    for filename in os.listdir(directory):
+        if _ARRAY_FILE.match(filename) and \
+                filename not in filenames.values():
+            os.remove(os.path.join(directory, filename))
+    return
+
+
+def load_checkpoint(directory, stepper=None):
+    '''
+    Reads the checkpoint in `directory` and returns a dictionary with the
+    keys `u`, `t`, `dt`, `step`, and `extra`. The state vector is
+    memory-mapped copy-on-write, so nothing is read before it's used and the
+    file is never modified.
+
+    If `stepper` is given, its internal state is restored; the checkpoint
+    must have been written with the same method.
+    '''
+    with open(os.path.join(directory, _METADATA), encoding='utf-8') as f:
+        metadata = json.load(f)
+
+    arrays = {
+        key: numpy.load(os.path.join(directory, filename), mmap_mode='c')
+        for key, filename in metadata['arrays'].items()
+        }
+
+    if stepper is not None:
+        if type(stepper).__name__ != metadata['method']:
+            raise ValueError(
+                'Checkpoint was written by {}, not {}.'.format(
+                    metadata['method'], type(stepper).__name__
+                    ))
+        state = dict(metadata['stepper_scalars'])
+        for key, value in arrays.items():
+            if key.startswith('stepper.'):
+                state[key[len('stepper.'):]] = value
+        if state:
+            stepper.set_state(state)
+
+    return {
+        'u': arrays['u'],
+        't': metadata['t'],
+        'dt': metadata['dt'],
+        'step': metadata['step'],
+        'extra': metadata['extra'],
+        }
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Time integration loops built on top of the single-step methods.
+'''
+import hashlib
+import warnings
+
+import numpy
+
+from .checkpoint import has_checkpoint, load_checkpoint, save_checkpoint
+
+
+def _m_norm(problem, v, t):
+    # sqrt(v^T M v) with M v = eval_alpha_M_beta_F(1, 0, v, t)
+    return numpy.sqrt(
+        numpy.dot(v, problem.eval_alpha_M_beta_F(1.0, 0.0, v, t))
+        )
+
+
+def _run_fingerprint(problem, u0, t0, dt):
+    # Identifies the start of a run, so that the checkpoint of another run is
+    # not resumed by accident. Only NumPy states can be hashed.
+    if not isinstance(u0, numpy.ndarray):
+        return None
+    h = hashlib.sha256()
+    h.update(repr((t0, dt)).encode())
+    for v in [u0, problem.eval_alpha_M_beta_F(1.0, 1.0, u0, t0)]:
+        h.update(numpy.ascontiguousarray(v).tobytes())
+    return h.hexdigest()
+
+
+def _resume(checkpoint_dir, stepper, run):
+    # The checkpoint in `checkpoint_dir`, if any, after checking that it
+    # belongs to the run with the fingerprint `run`. Restores the state of
+    # `stepper`.
+    if not has_checkpoint(checkpoint_dir):
+        return None
+    # Check before the stepper's state is overwritten.
+    if load_checkpoint(checkpoint_dir)['extra'].get('run') != run:
+        raise ValueError(
+            'The checkpoint in {} belongs to a different run.'.format(
+                checkpoint_dir
+                ))
+    return load_checkpoint(checkpoint_dir, stepper)
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def integrate(
+        stepper, u0, t0, t_end, dt, output_times=None, *,
+        checkpoint_dir=None,
+        checkpoint_every=100
+        ):
+    '''
+    Advances `u0` from `t0` to `t_end` with `stepper` and yields `(t, u)`
+    pairs.
+
+    Without `output_times`, the state after every step is yielded; only the
+    last step is shortened to hit `t_end` exactly.
+
+    With `output_times`, the stepper always takes steps of size `dt` and the
+    solution at the requested times is evaluated from the stepper's
+    `dense_output()`. No step is clipped, so problems can keep reusing their
+    factorizations for `dt`. Note that the last step may reach beyond `t_end`.
+
+    The interpolants combine states linearly, so the state type must support
+    the arithmetic operators (e.g., NumPy arrays or dolfin vectors).
+
+    If `checkpoint_dir` is given, a checkpoint is written there every
+    `checkpoint_every` steps, as in :func:`integrate_to_steady_state`. If the
+    directory already holds a checkpoint, the run resumes from it and yields
+    only what comes after it; a `ValueError` is raised if the checkpoint was
+    written by another run. The stepper must access its problem through
+    `stepper.problem`.
+    '''
+    # Tolerance for deciding whether the end point is reached. Avoids
+    # spurious tiny steps, or steps which differ from dt only by round-off,
+    # due to the accumulation of t.
+    eps = 1.0e-10 * abs(dt)
+
+    t = t0
+    u = u0
+    first_step = 0
+    data = None
+    run = None
+    if checkpoint_dir is not None:
+        run = _run_fingerprint(stepper.problem, u0, t0, dt)
+        data = _resume(checkpoint_dir, stepper, run)
+    if data is not None:
+        u = data['u']
+        t = data['t']
+        first_step = data['step']
+
+    def save(k, u, t):
+        if checkpoint_dir is not None and k > first_step \
+                and k % checkpoint_every == 0:
+            save_checkpoint(checkpoint_dir, stepper, u, t, dt, step=k, run=run)
+        return
+
+    if output_times is None:
+        k = first_step
+        while t_end - t > eps:
+            save(k, u, t)
+            h = dt
+            t_next = t + dt
+            if t_next > t_end - eps:
+                if t_next > t_end + eps:
+                    h = t_end - t
+                t_next = t_end
+            u = stepper.step(u, t, h)
+            t = t_next
+            k += 1
+            yield t, u
+        return
+
+    times = sorted(output_times)
+    if times and (times[0] < t0 - eps or times[-1] > t_end + eps):
+        raise ValueError(
+            'Output times must lie in [{}, {}].'.format(t0, t_end)
+            )
+
+    # A resumed run has yielded the output up to its checkpoint before.
+    k = 0
+    while k < len(times) and times[k] <= t:
+        if data is None:
+            yield times[k], u0
+        k += 1
+
+    step = first_step
+    while k < len(times):
+        save(step, u, t)
+        u1 = stepper.step(u, t, dt)
+        t1 = t + dt
+        interpolant = stepper.dense_output(u, u1, t, dt)
+        while k < len(times) and times[k] <= t1:
+            yield times[k], interpolant(times[k])
+            k += 1
+        t = t1
+        u = u1
+        step += 1
+    return
+
+
+# pylint: disable-next=too-many-arguments
+def integrate_to_steady_state(
+        stepper, u0, t0, dt, *,
+        tol=1.0e-8,
+        max_steps=10000,
+        dt_growth=1.0,
+        dt_max=None,
+        steady_solve_tol=None,
+        norm=None,
+        checkpoint_dir=None,
+        checkpoint_every=100,
+        dt_ladder=None
+        ):
+    '''
+    Marches `u0` with `stepper` until the rate of change
+    :math:`\\|u_{n+1} - u_n\\|_M / dt` drops below `tol` and returns the
+    final `(t, u)`. All options must be passed as keyword arguments.
+
+    As long as the rate of change decays, the step size is multiplied by
+    `dt_growth` (capped at `dt_max`). Values larger than 1 are only sensible
+    for unconditionally stable methods such as `ImplicitEuler`. Pass a
+    :class:`parabolic.StepSizeLadder` as `dt_ladder` to round the growing
+    step sizes down to its rungs, so only a few distinct operators are
+    factorized.
+
+    If `steady_solve_tol` is given, the marching is stopped as soon as the
+    rate of change drops below it, and the steady state is computed directly
+    by solving :math:`F(u, t) = 0`. This assumes that `F` no longer depends
+    on `t`.
+
+    `norm(v, t)` defaults to the M-norm :math:`\\sqrt{v^T M v}`, where `M v`
+    is obtained from the problem's `eval_alpha_M_beta_F`.
+
+    If `checkpoint_dir` is given, a checkpoint is written there every
+    `checkpoint_every` steps. If the directory already holds a checkpoint,
+    the run resumes from it instead of starting from `u0`, `t0`, `dt`, and
+    continues exactly as the interrupted run would have. For NumPy states, a
+    `ValueError` is raised if the checkpoint was written by a run with
+    another initial state, initial step size, or problem.
+    '''
+    problem = stepper.problem
+    if norm is None:
+        def norm(v, t):
+            return _m_norm(problem, v, t)
+
+    t = t0
+    u = u0
+    rate_prev = None
+    first_step = 0
+    rate = numpy.inf
+    run = None
+    data = None
+    if checkpoint_dir is not None:
+        run = _run_fingerprint(problem, u0, t0, dt)
+        data = _resume(checkpoint_dir, stepper, run)
+    if data is not None:
+        u = data['u']
+        t = data['t']
+        dt = data['dt']
+        first_step = data['step']
+        rate_prev = data['extra']['rate_prev']
+        if rate_prev is not None:
+            rate = rate_prev
+
+    for k in range(first_step, max_steps):
+        if checkpoint_dir is not None and k > first_step \
+                and k % checkpoint_every == 0:
+            save_checkpoint(
+                checkpoint_dir, stepper, u, t, dt, step=k, rate_prev=rate_prev,
+                run=run
+                )
+
+        dt_k = dt if dt_ladder is None else dt_ladder.quantize(dt)
+        u1 = stepper.step(u, t, dt_k)
+        t += dt_k
+        rate = norm(u1 - u, t) / dt_k
+        u = u1
+
+        if steady_solve_tol is not None and rate < steady_solve_tol:
+            # alpha=0, beta=1, b=0:  F(u, t) = 0
+            zero = 0.0 * u
+            return t, problem.solve_alpha_M_beta_F(0.0, 1.0, zero, t)
+
+        if rate < tol:
+            return t, u
+
+        if rate_prev is not None and rate < rate_prev:
+            dt *= dt_growth
+            if dt_max is not None:
+                dt = min(dt, dt_max)
+        rate_prev = rate
+
+    warnings.warn(
+        'No steady state reached after {} steps '
+        '(||du/dt|| = {:e} > {:e}).'.format(max_steps, rate, tol)
+        )
+    return t, u
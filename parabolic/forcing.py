@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Helpers for the time-dependent right-hand side `f(t)` of a problem.
+
+Steppers evaluate `f` repeatedly at the same time, e.g., `Trapezoidal` in
+`solve_alpha_M_beta_F` at `t+dt` and, in the next step, in
+`eval_alpha_M_beta_F` at the same `t+dt`. Problems should hence not assemble
+their right-hand side directly but go through a `ForcingCache`.
+'''
+from collections import OrderedDict
+
+
+class ForcingCache(object):
+    '''
+    Memoizes the results of `assemble(t)` for the `size` most recently used
+    times. The returned vectors are shared between calls and must not be
+    modified.
+    '''
+    def __init__(self, assemble, size=2):
+        self.assemble = assemble
+        self.size = size
+        self._values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        return
+
+    def __call__(self, t):
+        try:
+            value = self._values.pop(t)
+            self.hits += 1
+        except KeyError:
+            value = self.assemble(t)
+            self.misses += 1
+            if len(self._values) >= self.size:
+                self._values.popitem(last=False)
+        self._values[t] = value
+        return value
+
+    def clear(self):
+        self._values.clear()
+        return
+
+
+class AffineForcing(object):
+    '''
+    Right-hand side which is affine in time,
+
+    .. math::
+        f(t) = \\sum_k g_k(t) b_k,
+
+    with scalar functions `coefficients` :math:`g_k` and precomputed
+    (assembled) `vectors` :math:`b_k`. Evaluating `f` requires no assembly.
+    '''
+    def __init__(self, coefficients, vectors):
+        assert len(coefficients) == len(vectors)
+        assert coefficients
+        self.coefficients = coefficients
+        self.vectors = vectors
+        return
+
+    def __call__(self, t):
+        out = self.coefficients[0](t) * self.vectors[0]
+        for g, b in zip(self.coefficients[1:], self.vectors[1:]):
+            out += g(t) * b
+        return out
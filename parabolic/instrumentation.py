@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Opt-in instrumentation of time steppers. Wrapping a stepper with
+`Instrumented` records, per step, the wall time, the number and duration of
+calls to `eval_alpha_M_beta_F` and `solve_alpha_M_beta_F`, linear iteration
+counts, and optionally the memory allocated. Steppers which are not wrapped
+are not affected at all.
+'''
+from collections import deque
+import copy
+import json
+from timeit import default_timer as timer
+import tracemalloc
+
+
+# pylint: disable-next=too-many-instance-attributes
+class StepRecord(object):
+    '''
+    Measurements of a single step. Times are in seconds; `other_time` is
+    the part of the wall time spent neither in evaluations nor in solves,
+    i.e., in vector updates, copies etc.
+    '''
+    def __init__(self, t, dt):
+        self.t = t
+        self.dt = dt
+        self.wall_time = 0.0
+        self.num_evals = 0
+        self.eval_time = 0.0
+        self.num_solves = 0
+        self.solve_time = 0.0
+        # Only available if the problem reports them via its
+        # `last_num_iterations` attribute.
+        self.linear_iterations = None
+        # Only available with `trace_memory=True`.
+        self.bytes_allocated = None
+        return
+
+    @property
+    def other_time(self):
+        return self.wall_time - self.eval_time - self.solve_time
+
+    def as_dict(self):
+        return {
+            't': self.t,
+            'dt': self.dt,
+            'wall_time': self.wall_time,
+            'num_evals': self.num_evals,
+            'eval_time': self.eval_time,
+            'num_solves': self.num_solves,
+            'solve_time': self.solve_time,
+            'other_time': self.other_time,
+            'linear_iterations': self.linear_iterations,
+            'bytes_allocated': self.bytes_allocated,
+            }
+
+
+class Stats(object):
+    '''
+    Collection of `StepRecord`s plus a timeline of the timed events. Only
+    the `max_events` most recent events are kept (`None` for all).
+    '''
+    def __init__(self, max_events=100000):
+        self.steps = []
+        # (name, start, duration, args) with times relative to `self.origin`
+        self.events = deque(maxlen=max_events)
+        self.origin = timer()
+        return
+
+    def totals(self):
+        out = {
+            'num_steps': len(self.steps),
+            'wall_time': sum(s.wall_time for s in self.steps),
+            'num_evals': sum(s.num_evals for s in self.steps),
+            'eval_time': sum(s.eval_time for s in self.steps),
+            'num_solves': sum(s.num_solves for s in self.steps),
+            'solve_time': sum(s.solve_time for s in self.steps),
+            'other_time': sum(s.other_time for s in self.steps),
+            }
+        iterations = [
+            s.linear_iterations for s in self.steps
+            if s.linear_iterations is not None
+            ]
+        out['linear_iterations'] = sum(iterations) if iterations else None
+        allocated = [
+            s.bytes_allocated for s in self.steps
+            if s.bytes_allocated is not None
+            ]
+        out['max_bytes_allocated'] = max(allocated) if allocated else None
+        return out
+
+    def as_dict(self):
+        return {
+            'totals': self.totals(),
+            'steps': [s.as_dict() for s in self.steps],
+            }
+
+    def write_json(self, filename):
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.as_dict(), f, indent=2)
+        return
+
+    def write_chrome_trace(self, filename):
+        '''
+        Writes the event timeline in the Chrome trace event format, to be
+        viewed in chrome://tracing or Perfetto.
+        '''
+        trace_events = [{
+            'name': name,
+            'ph': 'X',
+            'ts': 1.0e6 * start,
+            'dur': 1.0e6 * duration,
+            'pid': 0,
+            'tid': 0,
+            'args': args,
+            } for name, start, duration, args in self.events]
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace_events}, f)
+        return
+
+
+class _InstrumentedProblem(object):
+    '''
+    Proxy of a problem which times the calls to `eval_alpha_M_beta_F` and
+    `solve_alpha_M_beta_F`. All other attributes are passed through.
+    '''
+    def __init__(self, problem, stats):
+        self.problem = problem
+        self.stats = stats
+        self.record = None
+        return
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+    def eval_alpha_M_beta_F(self, alpha, beta, u, t):
+        start = timer()
+        out = self.problem.eval_alpha_M_beta_F(alpha, beta, u, t)
+        duration = timer() - start
+        self.stats.events.append((
+            'eval_alpha_M_beta_F', start - self.stats.origin, duration,
+            {'alpha': alpha, 'beta': beta, 't': t}
+            ))
+        if self.record is not None:
+            self.record.num_evals += 1
+            self.record.eval_time += duration
+        return out
+
+    def solve_alpha_M_beta_F(self, alpha, beta, b, t):
+        start = timer()
+        out = self.problem.solve_alpha_M_beta_F(alpha, beta, b, t)
+        duration = timer() - start
+        iterations = getattr(self.problem, 'last_num_iterations', None)
+        self.stats.events.append((
+            'solve_alpha_M_beta_F', start - self.stats.origin, duration,
+            {'alpha': alpha, 'beta': beta, 't': t, 'iterations': iterations}
+            ))
+        if self.record is not None:
+            self.record.num_solves += 1
+            self.record.solve_time += duration
+            if iterations is not None:
+                self.record.linear_iterations = \
+                    (self.record.linear_iterations or 0) + iterations
+        return out
+
+
+class Instrumented(object):
+    '''
+    Wraps a stepper such that every call to `step()` is measured; the
+    results are collected in `self.stats` (see :class:`Stats` for
+    `max_events`). The steps are taken by a shallow copy of the stepper
+    whose problem is a timing proxy, so the given stepper itself is not
+    modified. `detach()` returns a copy of the instrumented stepper, in its
+    current state, with the original problem.
+
+    With `trace_memory=True`, the peak memory allocated during each step is
+    measured with `tracemalloc`. This does have a considerable overhead.
+    Before Python 3.9, the peak cannot be reset, so if `tracemalloc` is
+    already tracing, the peak since tracing started is reported instead.
+    '''
+    def __init__(self, stepper, trace_memory=False, max_events=100000):
+        self.stats = Stats(max_events=max_events)
+        self.trace_memory = trace_memory
+        self._proxy = _InstrumentedProblem(stepper.problem, self.stats)
+        self._stepper = copy.copy(stepper)
+        self._stepper.problem = self._proxy
+        return
+
+    def __getattr__(self, name):
+        return getattr(self._stepper, name)
+
+    def detach(self):
+        stepper = copy.copy(self._stepper)
+        stepper.problem = self._proxy.problem
+        return stepper
+
+    def step(self, u0, t, dt):
+        record = StepRecord(t, dt)
+        self._proxy.record = record
+
+        if self.trace_memory:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            elif hasattr(tracemalloc, 'reset_peak'):
+                # Python 3.9+
+                tracemalloc.reset_peak()
+            memory0, _ = tracemalloc.get_traced_memory()
+
+        start = timer()
+        u1 = self._stepper.step(u0, t, dt)
+        record.wall_time = timer() - start
+
+        if self.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            record.bytes_allocated = peak - memory0
+            if started_tracing:
+                tracemalloc.stop()
+
+        self._proxy.record = None
+        self.stats.steps.append(record)
+        self.stats.events.append((
+            'step', start - self.stats.origin, record.wall_time,
+            {'t': t, 'dt': dt}
+            ))
+        return u1
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Continuous extensions of a single time step, used for evaluating the solution
+at times that do not coincide with the step grid.
+'''
+
+
+class LinearInterpolant(object):
+    '''
+    Linear interpolant between the states `u0` at `t0` and `u1` at `t1`. The
+    interpolation error is of order :math:`dt^2`, so this is a sufficient
+    dense output for all methods of order two or less. No additional
+    evaluations of the problem are necessary.
+    '''
+    def __init__(self, t0, u0, t1, u1):
+        self.t0 = t0
+        self.u0 = u0
+        self.t1 = t1
+        self.u1 = u1
+        return
+
+    def __call__(self, t):
+        s = (t - self.t0) / (self.t1 - self.t0)
+        return (1.0 - s) * self.u0 + s * self.u1
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Multithreaded kernels for the NumPy/SciPy backend.
+
+`RowBlockOperator` evaluates :math:`\\alpha M u + \\beta (A u + b)` by
+blocks of rows, one per thread, and `linear_combination` the sums of stage
+vectors in Runge-Kutta steps by blocks of entries. Per row, they do the same
+operations in the same order as the plain evaluation with whole vectors, so
+the results do not depend on the number of blocks.
+
+The blocks are processed by a thread pool. SciPy's sparse products and
+NumPy's vector operations release the GIL, so the blocks run in parallel; as
+all of these kernels are memory-bound, they scale with the memory bandwidth
+rather than the number of cores (see `benchmarks/run.py --bandwidth`).
+
+The row blocks are not fused: `M` and `A` are still applied one after the
+other, and the values of :math:`\\alpha M + \\beta A` are never formed.
+Doing that on the fly, block by block, costs more in NumPy than the memory
+traffic it saves.
+'''
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import numpy
+import scipy.sparse
+
+_EXECUTORS = {}
+
+if hasattr(os, 'register_at_fork'):
+    # The worker threads don't survive a fork. A child process would wait
+    # forever for the pools inherited from its parent, so it starts new ones.
+    os.register_at_fork(after_in_child=_EXECUTORS.clear)
+
+
+def _map(function, num_items, num_threads):
+    # Runs `function(k)` for all `k < num_items` on a shared pool.
+    if num_threads <= 1 or num_items <= 1:
+        for k in range(num_items):
+            function(k)
+        return
+    if num_threads not in _EXECUTORS:
+        _EXECUTORS[num_threads] = ThreadPoolExecutor(num_threads)
+    # list() to wait for all blocks and to reraise exceptions
+    list(_EXECUTORS[num_threads].map(function, range(num_items)))
+    return
+
+
+def _row_block(matrix, lo, hi):
+    # Rows `lo:hi` of the CSR `matrix`, sharing its data and indices
+    p0 = matrix.indptr[lo]
+    p1 = matrix.indptr[hi]
+    block = scipy.sparse.csr_matrix(
+        (matrix.data[p0:p1], matrix.indices[p0:p1],
+         matrix.indptr[lo:hi+1] - p0),
+        shape=(hi - lo, matrix.shape[1])
+        )
+    # The constructor copies small views; replace the copies.
+    block.data = matrix.data[p0:p1]
+    block.indices = matrix.indices[p0:p1]
+    return block
+
+
+class RowBlockOperator(object):
+    '''
+    :math:`\\alpha M + \\beta A` for sparse `M`, `A`, applied by
+    `num_threads` blocks of rows with about the same number of nonzeros. The
+    blocks share the values and indices of `M` and `A`.
+    '''
+    def __init__(self, M, A, num_threads=1):
+        M = scipy.sparse.csr_matrix(M)
+        A = scipy.sparse.csr_matrix(A)
+        self.shape = M.shape
+        self.num_threads = num_threads
+        indptr = M.indptr + A.indptr
+        nnz = numpy.linspace(0, indptr[-1], num_threads + 1)
+        self.bounds = numpy.unique(
+            numpy.searchsorted(indptr, nnz).clip(0, self.shape[0])
+            )
+        self.bounds[0] = 0
+        self.bounds[-1] = self.shape[0]
+        self.blocks = [
+            (lo, hi, _row_block(M, lo, hi), _row_block(A, lo, hi))
+            for lo, hi in zip(self.bounds[:-1], self.bounds[1:])
+            ]
+        return
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def apply(self, alpha, beta, u, b=None, out=None, dtype=None,
+              scales=None):
+        '''
+        :math:`\\alpha M u + \\beta (A u + b)` (`b=None` for `b=0`),
+        rounded like `alpha * M.dot(u) + beta * A.dot(u) + beta * b`. The
+        terms are added in `dtype` (by default that of `out`, or of `u`) and
+        only then rounded to `out`. If `scales` is given, `scales[k]` is set
+        to the largest magnitudes of :math:`\\alpha M u` and
+        :math:`\\beta (A u + b)` in block `k`, which are then added.
+        '''
+        if out is None:
+            out = numpy.empty(self.shape[0], dtype=u.dtype)
+        if dtype is None:
+            dtype = out.dtype
+
+        def kernel(k):
+            lo, hi, M, A = self.blocks[k]
+            if dtype == out.dtype:
+                o = out[lo:hi]
+            else:
+                o = numpy.empty(hi - lo, dtype=dtype)
+            if alpha != 0.0:
+                numpy.multiply(M.dot(u), alpha, out=o, dtype=dtype)
+            else:
+                o[:] = 0.0
+            if beta != 0.0:
+                g = numpy.multiply(A.dot(u), beta, dtype=dtype)
+                if scales is None:
+                    o += g
+                    if b is not None:
+                        o += beta * b[lo:hi]
+                else:
+                    if b is not None:
+                        g += beta * b[lo:hi]
+                    scales[k] = (
+                        numpy.max(abs(o), initial=0.0),
+                        numpy.max(abs(g), initial=0.0)
+                        )
+                    o += g
+            if dtype != out.dtype:
+                out[lo:hi] = o
+
+        _map(kernel, len(self.blocks), self.num_threads)
+        return out
+
+
+def linear_combination(u, terms, out=None, num_threads=1, block_size=2**14):
+    '''
+    :math:`u + \\sum_j c_j v_j` for `terms = [(c_j, v_j), ...]`, computed in
+    blocks of `block_size` entries, so that each block of `out` stays in
+    cache until all terms have been added.
+    '''
+    terms = [(c, v) for c, v in terms if c != 0.0]
+    if out is None:
+        out = numpy.empty_like(u)
+    n = len(u)
+    num_blocks = max((n + block_size - 1) // block_size, 1)
+
+    def kernel(k):
+        block = slice(k * block_size, min((k+1) * block_size, n))
+        o = out[block]
+        o[:] = u[block]
+        for c, v in terms:
+            o += c * v[block]
+
+    _map(kernel, num_blocks, num_threads)
+    return out
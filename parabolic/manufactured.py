@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Manufactured solutions for the heat equation. SymPy expressions in
+`x = sympy.DeferredVector('x')` and `t = sympy.Symbol('t')` are compiled into
+NumPy-vectorized functions `f(points, t)` which evaluate at all nodes
+(`points` of shape `(num_points, dim)`) in one call.
+'''
+import numpy
+import sympy
+
+
+# Compiled functions, keyed by (expression, dimension)
+_compiled = {}
+
+
+def lambdify(expr, dim):
+    '''
+    Compiles `expr` into a vectorized function `f(points, t)`. The result is
+    memoized, so compiling the same expression again is free.
+    '''
+    key = (expr, dim)
+    try:
+        return _compiled[key]
+    except KeyError:
+        pass
+
+    x = sympy.DeferredVector('x')
+    t = sympy.Symbol('t')
+    X = sympy.symbols('x0:{}'.format(dim))
+    fun = sympy.lambdify(
+        X + (t,),
+        expr.subs({x[i]: X[i] for i in range(dim)}),
+        'numpy'
+        )
+
+    def f(points, t):
+        out = fun(*([points[:, i] for i in range(dim)] + [t]))
+        # Expressions independent of x evaluate to scalars.
+        return numpy.broadcast_to(out, points.shape[:1])
+
+    _compiled[key] = f
+    return f
+
+
+class ManufacturedSolution(object):
+    '''
+    Exact solution `solution` (a SymPy expression) of
+
+    .. math::
+        \\rho c_p u' = \\nabla\\cdot(\\kappa \\nabla u) + f
+
+    in `dim` dimensions together with the matching right-hand side `f`, both
+    compiled into vectorized functions of `(points, t)`.
+    '''
+    def __init__(self, solution, dim, kappa=1.0, rho_cp=1.0):
+        x = sympy.DeferredVector('x')
+        t = sympy.Symbol('t')
+        self.solution_expr = solution
+        self.forcing_expr = rho_cp * sympy.diff(solution, t) - sum(
+            sympy.diff(kappa * sympy.diff(solution, x[i]), x[i])
+            for i in range(dim)
+            )
+        self.solution = lambdify(self.solution_expr, dim)
+        self.forcing = lambdify(self.forcing_expr, dim)
+        return
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Matrix-free problems :math:`M u' = A u + f(t)`. Only the actions of `M` and
+`A` and their diagonals are needed; the solves are done with preconditioned
+Krylov methods.
+'''
+from collections import OrderedDict
+
+import numpy
+import scipy.sparse.linalg
+
+from .forcing import ForcingCache
+from .numpy_backend import grid_points, nodal_forcing
+
+
+def _lru_store(cache, key, value, size):
+    # Inserts into the OrderedDict `cache`, dropping the least recently used
+    # entries beyond `size`.
+    cache.pop(key, None)
+    while len(cache) >= size:
+        cache.popitem(last=False)
+    cache[key] = value
+    return
+
+
+# pylint: disable-next=too-many-arguments
+def _krylov_solve(K, b, P, positive_definite, *, x0, tol, maxiter):
+    '''
+    Solves `K x = b` with CG if `K` is positive definite, with GMRES
+    otherwise, preconditioned by `P`. Returns the solution and the number of
+    iterations.
+    '''
+    num_iterations = [0]
+
+    def callback(_):
+        num_iterations[0] += 1
+
+    if positive_definite:
+        u, info = scipy.sparse.linalg.cg(
+            K, b, x0=x0, rtol=tol, atol=0.0, maxiter=maxiter,
+            M=P, callback=callback
+            )
+    else:
+        u, info = scipy.sparse.linalg.gmres(
+            K, b, x0=x0, rtol=tol, atol=0.0, maxiter=maxiter,
+            M=P, callback=callback, callback_type='pr_norm'
+            )
+    if info != 0:
+        raise RuntimeError(
+            'Linear solver did not converge (info={}).'.format(info)
+            )
+    return u, num_iterations[0]
+
+
+# pylint: disable-next=too-many-instance-attributes
+class MatrixFreeProblem(object):
+    '''
+    Base class for problems which only provide the operator actions.
+    Subclasses implement
+
+      * `apply_M(u)` and `apply_A(u)`,
+      * `diagonal_M()` and `diagonal_A()`,
+
+    and may pass a right-hand side `f(t)` to the constructor.
+
+    `solve_alpha_M_beta_F` uses CG if :math:`\\alpha M + \\beta A` is
+    positive definite, i.e., if `symmetric` is set (`M` symmetric positive
+    definite, `A` symmetric negative semidefinite), `alpha > 0`, and
+    `beta <= 0`; otherwise GMRES. The preconditioner is either `'jacobi'`,
+    `'chebyshev'` (a Chebyshev polynomial of degree `chebyshev_degree` in
+    the Jacobi-preconditioned operator), or `None`. Both only need the
+    diagonals.
+
+    The number of iterations of the last solve is available in
+    `last_num_iterations`. The last solution and the eigenvalue estimate for
+    the Chebyshev preconditioner are kept for the `cache_size` most recently
+    used `(alpha, beta)` pairs.
+    '''
+    symmetric = True
+
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+            self, f=None, *,
+            tol=1.0e-10,
+            maxiter=1000,
+            preconditioner='jacobi',
+            chebyshev_degree=4,
+            cache_size=4
+            ):
+        self._forcing = None if f is None else ForcingCache(f)
+        self.tol = tol
+        self.maxiter = maxiter
+        assert preconditioner in ['jacobi', 'chebyshev', None]
+        self.preconditioner = preconditioner
+        self.chebyshev_degree = chebyshev_degree
+        self.last_num_iterations = None
+        self.cache_size = cache_size
+        # per (alpha, beta): estimate of the largest eigenvalue of D^{-1} K
+        self._lambda_max = OrderedDict()
+        # per (alpha, beta): last solution, used as initial guess
+        self._last_solution = OrderedDict()
+        return
+
+    def apply_M(self, u):
+        raise NotImplementedError
+
+    def apply_A(self, u):
+        raise NotImplementedError
+
+    def diagonal_M(self):
+        raise NotImplementedError
+
+    def diagonal_A(self):
+        raise NotImplementedError
+
+    def forcing(self, t):
+        return None if self._forcing is None else self._forcing(t)
+
+    def eval_alpha_M_beta_F(self, alpha, beta, u, t):
+        # Evaluate  alpha * M * u + beta * F(u, t).
+        out = alpha * self.apply_M(u) if alpha != 0.0 \
+            else numpy.zeros_like(u)
+        if beta != 0.0:
+            out += beta * self.apply_A(u)
+            f = self.forcing(t)
+            if f is not None:
+                out += beta * f
+        return out
+
+    def solve_alpha_M_beta_F(self, alpha, beta, b, t):
+        # Solve  alpha * M * u + beta * F(u, t) = b  for u.
+        if beta != 0.0:
+            f = self.forcing(t)
+            if f is not None:
+                b = b - beta * f
+
+        n = len(b)
+
+        def matvec(x):
+            out = alpha * self.apply_M(x) if alpha != 0.0 \
+                else numpy.zeros_like(x)
+            if beta != 0.0:
+                out += beta * self.apply_A(x)
+            return out
+
+        K = scipy.sparse.linalg.LinearOperator(
+            (n, n), matvec=matvec, dtype=float
+            )
+        P = self._preconditioner(alpha, beta, matvec, n)
+
+        key = (alpha, beta)
+        u, self.last_num_iterations = _krylov_solve(
+            K, b, P, self.symmetric and beta <= 0.0 < alpha,
+            x0=self._last_solution.get(key), tol=self.tol,
+            maxiter=self.maxiter
+            )
+        _lru_store(self._last_solution, key, u, self.cache_size)
+        return u
+
+    def _preconditioner(self, alpha, beta, matvec, n):
+        if self.preconditioner is None:
+            return None
+
+        diagonal = alpha * self.diagonal_M() + beta * self.diagonal_A()
+        inv_diagonal = 1.0 / diagonal
+
+        if self.preconditioner == 'jacobi':
+            return scipy.sparse.linalg.LinearOperator(
+                (n, n), matvec=lambda r: inv_diagonal * r, dtype=float
+                )
+
+        key = (alpha, beta)
+        lambda_max = self._lambda_max.get(key)
+        if lambda_max is None:
+            lambda_max = _estimate_lambda_max(matvec, inv_diagonal, n)
+        _lru_store(self._lambda_max, key, lambda_max, self.cache_size)
+        # Chebyshev interval as usual for smoothers: the upper part of the
+        # spectrum, with a safety margin
+        interval = (1.1 * lambda_max / 30.0, 1.1 * lambda_max)
+
+        return scipy.sparse.linalg.LinearOperator(
+            (n, n),
+            matvec=lambda r: _chebyshev(
+                matvec, inv_diagonal, r, interval, self.chebyshev_degree
+                ),
+            dtype=float
+            )
+
+
+def _estimate_lambda_max(matvec, inv_diagonal, n, num_iterations=15):
+    '''
+    Estimate of the largest eigenvalue of :math:`D^{-1} K` by power
+    iteration.
+    '''
+    # deterministic start vector with components in all eigenvectors
+    x = numpy.random.RandomState(0).rand(n)
+    lmbda = 0.0
+    for _ in range(num_iterations):
+        y = inv_diagonal * matvec(x)
+        lmbda = numpy.dot(x, y) / numpy.dot(x, x)
+        x = y / numpy.linalg.norm(y)
+    return lmbda
+
+
+def _chebyshev(matvec, inv_diagonal, r, interval, degree):
+    '''
+    Chebyshev approximation to :math:`K^{-1} r`, optimal on the spectral
+    interval `[a, b]` of :math:`D^{-1} K`; see Y. Saad, Iterative Methods for
+    Sparse Linear Systems, Algorithm 12.1.
+    '''
+    a, b = interval
+    theta = 0.5 * (b + a)
+    delta = 0.5 * (b - a)
+    sigma = theta / delta
+    rho = 1.0 / sigma
+    d = inv_diagonal * r / theta
+    x = d.copy()
+    for _ in range(degree - 1):
+        rho_new = 1.0 / (2.0 * sigma - rho)
+        d = rho_new * rho * d \
+            + 2.0 * rho_new / delta * inv_diagonal * (r - matvec(x))
+        x += d
+        rho = rho_new
+    return x
+
+
+def _apply_tridiagonal(u, axis, lower, main, upper):
+    # Applies the tridiagonal Toeplitz matrix along `axis` of `u`.
+    out = main * u
+    src = [slice(None)] * u.ndim
+    dst = [slice(None)] * u.ndim
+    # subdiagonal: out[i] += lower * u[i-1]
+    src[axis] = slice(None, -1)
+    dst[axis] = slice(1, None)
+    out[tuple(dst)] += lower * u[tuple(src)]
+    # superdiagonal: out[i] += upper * u[i+1]
+    src[axis] = slice(1, None)
+    dst[axis] = slice(None, -1)
+    out[tuple(dst)] += upper * u[tuple(src)]
+    return out
+
+
+class Heat(MatrixFreeProblem):
+    '''
+    Matrix-free version of :class:`parabolic.numpy_backend.Heat`: tensor-
+    product linear finite elements on the unit interval, square, or cube
+    with `n` interior nodes per direction. The operators are applied by sum
+    factorization, i.e., one-dimensional stencils along every axis.
+    '''
+    def __init__(self, n, dim=1, kappa=1.0, f=None, **kwargs):
+        self.n = n
+        self.dim = dim
+        self.kappa = kappa
+        self.h = 1.0 / (n+1)
+
+        self.points = grid_points(n, dim)
+        rhs = nodal_forcing(f, self.points, self.apply_M)
+
+        super().__init__(f=rhs, **kwargs)
+        return
+
+    def _apply_M_1d(self, u, axis):
+        h = self.h
+        return _apply_tridiagonal(u, axis, h/6, 4*h/6, h/6)
+
+    def _apply_K_1d(self, u, axis):
+        h = self.h
+        return _apply_tridiagonal(u, axis, -1.0/h, 2.0/h, -1.0/h)
+
+    def apply_M(self, u):
+        u = u.reshape(self.dim * (self.n,))
+        for axis in range(self.dim):
+            u = self._apply_M_1d(u, axis)
+        return u.ravel()
+
+    def apply_A(self, u):
+        u = u.reshape(self.dim * (self.n,))
+        out = numpy.zeros(u.shape)
+        for i in range(self.dim):
+            v = u
+            for axis in range(self.dim):
+                v = self._apply_K_1d(v, axis) if axis == i \
+                    else self._apply_M_1d(v, axis)
+            out += v
+        return -self.kappa * out.ravel()
+
+    def diagonal_M(self):
+        return numpy.full(self.n**self.dim, (4*self.h/6)**self.dim)
+
+    def diagonal_A(self):
+        value = self.dim * 2.0/self.h * (4*self.h/6)**(self.dim-1)
+        return numpy.full(self.n**self.dim, -self.kappa * value)
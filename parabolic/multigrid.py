@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Geometric multigrid for nested structured grids.
+
+The coarse-grid operators are the Galerkin products :math:`P^T M P` and
+:math:`P^T A P`, computed once; for every `(alpha, beta)` the level matrices
+:math:`\\alpha M_l + \\beta A_l`, their diagonals, spectral estimates, and the
+coarsest-grid factorization are set up on first use and cached, so
+subsequent time steps only run V-cycles.
+'''
+from collections import OrderedDict
+
+import numpy
+import scipy.sparse
+import scipy.sparse.linalg
+
+from .matrix_free import _chebyshev, _estimate_lambda_max, _krylov_solve
+from .numpy_backend import (
+    LinearProblemBase, _kron_all, _p1_1d, _tensor_matrices, grid_points,
+    nodal_forcing
+    )
+
+
+def _prolongation_1d(n_coarse):
+    '''
+    Linear interpolation from `n_coarse` to `2*n_coarse + 1` interior nodes
+    of the unit interval.
+    '''
+    n = 2 * n_coarse + 1
+    rows = []
+    cols = []
+    vals = []
+    for j in range(n_coarse):
+        i = 2*j + 1
+        rows += [i-1, i, i+1]
+        cols += [j, j, j]
+        vals += [0.5, 1.0, 0.5]
+    return scipy.sparse.csr_matrix(
+        (vals, (rows, cols)), shape=(n, n_coarse)
+        )
+
+
+class _Levels(object):
+    '''
+    Everything the V-cycle needs for one `(alpha, beta)`.
+    '''
+    def __init__(self, hierarchy, alpha, beta):
+        self.K = [
+            (alpha * M + beta * A).tocsr()
+            for M, A in zip(hierarchy.M, hierarchy.A)
+            ]
+        self.inv_diagonal = [1.0 / K.diagonal() for K in self.K[:-1]]
+        self.lambda_max = [
+            _estimate_lambda_max(K.dot, d, K.shape[0])
+            for K, d in zip(self.K[:-1], self.inv_diagonal)
+            ]
+        self.coarse_lu = scipy.sparse.linalg.splu(self.K[-1].tocsc())
+        return
+
+
+class Hierarchy(object):
+    '''
+    Multigrid hierarchy for :math:`\\alpha M + \\beta A` with the
+    `prolongations` from each level to the next finer one, finest first.
+    `preconditioner(alpha, beta)` returns one V-cycle with `degree`
+    Chebyshev-Jacobi smoothing sweeps before and after the coarse-grid
+    correction, which is symmetric and can precondition CG.
+    '''
+    def __init__(self, M, A, prolongations, *, degree=2, cache_size=4):
+        self.M = [scipy.sparse.csr_matrix(M)]
+        self.A = [scipy.sparse.csr_matrix(A)]
+        self.P = prolongations
+        for P in prolongations:
+            self.M.append((P.T.dot(self.M[-1]).dot(P)).tocsr())
+            self.A.append((P.T.dot(self.A[-1]).dot(P)).tocsr())
+        self.degree = degree
+        self.cache_size = cache_size
+        self._levels = OrderedDict()
+        return
+
+    def levels(self, alpha, beta):
+        key = (alpha, beta)
+        try:
+            levels = self._levels.pop(key)
+        except KeyError:
+            levels = _Levels(self, alpha, beta)
+            if len(self._levels) >= self.cache_size:
+                self._levels.popitem(last=False)
+        self._levels[key] = levels
+        return levels
+
+    def _smooth(self, levels, l, b, x):
+        K = levels.K[l]
+        b_max = 1.1 * levels.lambda_max[l]
+        # Only the upper part of the spectrum needs to be damped; the rest
+        # is left to the coarser grids.
+        dx = _chebyshev(
+            K.dot, levels.inv_diagonal[l], b - K.dot(x),
+            (b_max / 10.0, b_max), self.degree
+            )
+        return x + dx
+
+    def _vcycle(self, levels, l, b):
+        if l == len(self.P):
+            return levels.coarse_lu.solve(b)
+        x = self._smooth(levels, l, b, numpy.zeros_like(b))
+        r = b - levels.K[l].dot(x)
+        x += self.P[l].dot(self._vcycle(levels, l+1, self.P[l].T.dot(r)))
+        return self._smooth(levels, l, b, x)
+
+    def preconditioner(self, alpha, beta):
+        levels = self.levels(alpha, beta)
+        n = self.M[0].shape[0]
+        return scipy.sparse.linalg.LinearOperator(
+            (n, n), matvec=lambda b: self._vcycle(levels, 0, b), dtype=float
+            )
+
+
+# pylint: disable-next=too-many-instance-attributes
+class Heat(LinearProblemBase):
+    '''
+    Heat equation discretized like :class:`parabolic.numpy_backend.Heat`,
+    with `n = 2**k - 1` nodes per direction, solved with CG (or GMRES if
+    :math:`\\alpha M + \\beta A` is not positive definite) preconditioned by
+    a geometric multigrid V-cycle. Grids are coarsened down to `coarsest`
+    nodes per direction. The number of iterations of the last solve is
+    available in `last_num_iterations`.
+    '''
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+            self, n, dim=1, kappa=1.0, f=None, *,
+            tol=1.0e-10,
+            maxiter=100,
+            coarsest=3,
+            degree=2
+            ):
+        assert (n+1) & n == 0, 'n must be of the form 2**k - 1.'
+        M, K = _tensor_matrices(*_p1_1d(n), dim)
+        self.points = grid_points(n, dim)
+        super().__init__(M, -kappa * K, nodal_forcing(f, self.points, M.dot))
+        self.n = n
+        self.dim = dim
+        self.kappa = kappa
+        self.tol = tol
+        self.maxiter = maxiter
+        self.last_num_iterations = None
+
+        prolongations = []
+        m = n
+        while m > coarsest:
+            m_coarse = (m - 1) // 2
+            prolongations.append(
+                _kron_all(dim * [_prolongation_1d(m_coarse)])
+                )
+            m = m_coarse
+        self.hierarchy = Hierarchy(
+            self.M, self.A, prolongations, degree=degree
+            )
+        return
+
+    def _solve(self, alpha, beta, b, trans):
+        # The matrices are symmetric, so `trans` doesn't matter.
+        n = len(b)
+        K = scipy.sparse.linalg.LinearOperator(
+            (n, n), matvec=self.hierarchy.levels(alpha, beta).K[0].dot,
+            dtype=float
+            )
+        P = self.hierarchy.preconditioner(alpha, beta)
+        u, self.last_num_iterations = _krylov_solve(
+            K, b, P, beta <= 0.0 < alpha,
+            x0=None, tol=self.tol, maxiter=self.maxiter
+            )
+        return u
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+#
+'''
+NumPy/SciPy backend: linear problems
+
+.. math::
+    M u' = A u + f(t)
+
+with sparse matrices `M`, `A`, operating on plain NumPy arrays.
+'''
+from collections import OrderedDict
+import warnings
+
+import numpy
+import scipy.sparse
+import scipy.sparse.linalg
+
+from .forcing import ForcingCache
+from .kernels import RowBlockOperator
+
+
+# pylint: disable-next=too-many-instance-attributes
+class LinearProblemBase(object):
+    '''
+    :math:`M u' = A u + f(t)` with sparse matrices `M`, `A` and a callable
+    `f(t)` returning the right-hand side vector (or `None` for `f=0`), without
+    a way to solve with :math:`\\alpha M + \\beta A`. Subclasses provide it
+    as `_solve(alpha, beta, b, trans)`, see :class:`LinearProblem`.
+
+    `eval_alpha_M_beta_F` splits the rows across `num_threads` threads with
+    a :class:`parabolic.kernels.RowBlockOperator`, with the same results for
+    any number of threads. With `dtype=numpy.float32`, it works on
+    single-precision copies of `M` and `A`, but adds up
+    :math:`\\alpha M u` and :math:`\\beta F(u)` in double precision. When
+    the latter is too small to change the former in single precision, both
+    the evaluations and the solves warn with a `RuntimeWarning`.
+    '''
+    def __init__(self, M, A, f=None, *, dtype=numpy.float64, num_threads=1):
+        self.M = scipy.sparse.csr_matrix(M, dtype=numpy.float64)
+        self.A = scipy.sparse.csr_matrix(A, dtype=numpy.float64)
+        self.dtype = numpy.dtype(dtype)
+        assert self.dtype in [numpy.float32, numpy.float64]
+        self.set_forcing(f)
+        if self.dtype == numpy.float64:
+            self._M, self._A = self.M, self.A
+        else:
+            self._M = self.M.astype(self.dtype)
+            self._A = self.A.astype(self.dtype)
+        self.num_threads = num_threads
+        # set up on first use
+        self._operator = None
+        return
+
+    def set_forcing(self, f):
+        # Replaces the right-hand side; cached factorizations remain valid.
+        self.f = f
+        self._forcing = None if f is None else ForcingCache(f)
+        return
+
+    def forcing(self, t):
+        return None if self._forcing is None else self._forcing(t)
+
+    def activity_mask(self, t0, t1, tol):
+        '''
+        DOFs at which the right-hand side changes by more than `tol` (relative
+        to its maximum) between `t0` and `t1`, e.g., where a moving source
+        enters or leaves. Used by :class:`parabolic.ActiveSet`.
+        '''
+        f0 = self.forcing(t0)
+        if f0 is None:
+            return numpy.zeros(self.M.shape[0], dtype=bool)
+        f1 = self.forcing(t1)
+        scale = max(numpy.max(abs(f0)), numpy.max(abs(f1)))
+        return abs(f1 - f0) > tol * scale
+
+    def eval_alpha_M_beta_F(self, alpha, beta, u, t):
+        # Evaluate  alpha * M * u + beta * F(u, t).
+        u = numpy.asarray(u, dtype=self.dtype)
+        f = self.forcing(t) if beta != 0.0 else None
+        if self._operator is None:
+            self._operator = RowBlockOperator(
+                self._M, self._A, num_threads=self.num_threads
+                )
+        out = numpy.empty(len(u), dtype=self.dtype)
+        if self.dtype == numpy.float64:
+            return self._operator.apply(alpha, beta, u, f, out=out)
+        # Add up the terms in double precision, and round only the result.
+        scales = numpy.zeros((len(self._operator.blocks), 2))
+        self._operator.apply(
+            alpha, beta, u, f, out=out, dtype=numpy.float64, scales=scales
+            )
+        _check_resolution(*numpy.max(scales, axis=0))
+        return out
+
+    def solve_alpha_M_beta_F(self, alpha, beta, b, t):
+        # Solve  alpha * M * u + beta * F(u, t) = b  for u.
+        f = self.forcing(t) if beta != 0.0 else None
+        x = self._solve(alpha, beta, b if f is None else b - beta * f, 'N')
+        if self.dtype == numpy.float32 and alpha != 0.0 and beta != 0.0:
+            # In implicit steps, beta * F(x) is only formed here.
+            x64 = numpy.asarray(x, dtype=numpy.float64)
+            beta_F = beta * self.A.dot(x64)
+            if f is not None:
+                beta_F += beta * f
+            _check_resolution(
+                numpy.max(abs(alpha * self.M.dot(x64))),
+                numpy.max(abs(beta_F))
+                )
+        return x
+
+    def eval_alpha_M_beta_A_transposed(self, alpha, beta, v):
+        # Evaluate  (alpha * M + beta * A)^T v.
+        return alpha * self.M.T.dot(v) + beta * self.A.T.dot(v)
+
+    def solve_alpha_M_beta_A_transposed(self, alpha, beta, b):
+        # Solve  (alpha * M + beta * A)^T x = b  with the same method as the
+        # forward problem.
+        return self._solve(alpha, beta, b, 'T')
+
+    def _solve(self, alpha, beta, b, trans):
+        raise NotImplementedError
+
+
+def _check_resolution(alpha_M_u, beta_F):
+    # In single precision, an increment beta * F(u) below the resolution of
+    # alpha * M * u is rounded away: the state stops changing.
+    if 0.0 < beta_F < numpy.finfo(numpy.float32).eps * alpha_M_u:
+        warnings.warn(
+            'beta * F(u) (max {:.2e}) is below the single-precision '
+            'resolution of alpha * M * u (max {:.2e}) and gets rounded away. '
+            'Use dtype=numpy.float64 or larger time steps.'.format(
+                beta_F, alpha_M_u
+                ),
+            RuntimeWarning, stacklevel=3
+            )
+    return
+
+
+class LinearProblem(LinearProblemBase):
+    '''
+    :math:`M u' = A u + f(t)` with sparse matrices `M`, `A` and a callable
+    `f(t)` returning the right-hand side vector (or `None` for `f=0`).
+    Boundary conditions are assumed to be eliminated from the system.
+
+    Steppers only ever use a handful of distinct `(alpha, beta)` pairs, so
+    the LU factorizations of :math:`\\alpha M + \\beta A` are kept in an LRU
+    cache of size `cache_size`. Likewise, `f` is evaluated only once per
+    time `t` (see :class:`parabolic.ForcingCache`). For right-hand sides
+    which are affine in time, pass a :class:`parabolic.AffineForcing`.
+
+    With `dtype=numpy.float32`, the problem works in mixed precision: the
+    state vectors and the copies of `M` and `A` used in
+    `eval_alpha_M_beta_F` are single precision, which reduces the memory
+    traffic of the evaluations. The solves still use the double-precision
+    factorizations and only round their results, so they are as accurate
+    (and as fast) as in double precision, whatever the condition number.
+    '''
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+            self, M, A, f=None, *,
+            cache_size=4,
+            dtype=numpy.float64,
+            num_threads=1
+            ):
+        super().__init__(M, A, f, dtype=dtype, num_threads=num_threads)
+        self.cache_size = cache_size
+        self._factorizations = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        return
+
+    def _solve(self, alpha, beta, b, trans):
+        lu = self.factorization(alpha, beta)
+        x = lu.solve(numpy.asarray(b, dtype=numpy.float64), trans=trans)
+        return x.astype(self.dtype, copy=False)
+
+    def factorization(self, alpha, beta):
+        '''
+        (Cached) sparse LU factorization of :math:`\\alpha M + \\beta A`.
+        '''
+        key = (alpha, beta)
+        try:
+            lu = self._factorizations.pop(key)
+            self.cache_hits += 1
+        except KeyError:
+            lu = scipy.sparse.linalg.splu(
+                (alpha * self.M + beta * self.A).tocsc()
+                )
+            self.cache_misses += 1
+            if len(self._factorizations) >= self.cache_size:
+                self._factorizations.popitem(last=False)
+        self._factorizations[key] = lu
+        return lu
+
+
+def _p1_1d(n):
+    '''
+    Mass and stiffness matrices of linear finite elements on a uniform grid
+    of the unit interval with `n` interior nodes.
+    '''
+    h = 1.0 / (n+1)
+    e = numpy.ones(n-1)
+    M = scipy.sparse.diags(
+        [h/6 * e, 4*h/6 * numpy.ones(n), h/6 * e], [-1, 0, 1]
+        )
+    K = scipy.sparse.diags(
+        [-e/h, 2.0/h * numpy.ones(n), -e/h], [-1, 0, 1]
+        )
+    return M, K
+
+
+def grid_points(n, dim):
+    '''
+    The interior nodes of the uniform grid of the unit interval, square, or
+    cube with `n` interior nodes per direction, as an array of shape
+    `(n**dim, dim)` in the ordering of the tensor-product operators.
+    '''
+    return _tensor_points(numpy.linspace(0.0, 1.0, n+2)[1:-1], dim)
+
+
+def _tensor_points(x1, dim):
+    # The tensor-product grid of the one-dimensional nodes `x1`.
+    grid = numpy.meshgrid(*(dim * [x1]), indexing='ij')
+    return numpy.column_stack([g.ravel() for g in grid])
+
+
+def nodal_forcing(f, points, apply_M):
+    '''
+    The right-hand side :math:`t \\mapsto M f(x, t)` for the nodal values of
+    `f` at `points`, or `None` if `f` is `None`.
+    '''
+    if f is None:
+        return None
+
+    def rhs(t):
+        return apply_M(f(points, t))
+    return rhs
+
+
+def _kron_all(factors):
+    out = factors[0]
+    for factor in factors[1:]:
+        out = scipy.sparse.kron(out, factor)
+    return out.tocsr()
+
+
+def _tensor_matrices(M1, K1, dim):
+    # Mass and stiffness matrices of tensor-product elements from the
+    # one-dimensional ones
+    M = _kron_all(dim * [M1])
+    K = sum(
+        _kron_all([K1 if i == j else M1 for j in range(dim)])
+        for i in range(dim)
+        )
+    return M, K
+
+
+class Heat(LinearProblem):
+    '''
+    Heat equation :math:`u' = \\kappa \\Delta u + f` on the unit interval,
+    square or cube with homogeneous Dirichlet boundary conditions,
+    discretized with tensor-product linear finite elements on a uniform grid
+    with `n` interior nodes per direction.
+
+    `f(x, t)`, if given, is evaluated at the nodes `self.points` (an array of
+    shape `(n**dim, dim)`) and multiplied by the mass matrix.
+    '''
+    def __init__(self, n, dim=1, kappa=1.0, f=None, cache_size=4, **kwargs):
+        self.n = n
+        self.dim = dim
+        self.kappa = kappa
+
+        M, K = _tensor_matrices(*_p1_1d(n), dim)
+        self.points = grid_points(n, dim)
+        rhs = nodal_forcing(f, self.points, M.dot)
+
+        super().__init__(
+            M, -kappa * K, rhs, cache_size=cache_size, **kwargs
+            )
+        return
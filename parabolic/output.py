@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Asynchronous output of snapshots `(t, u)`. The time loop only copies the
+state into a recycled buffer; writing to disk happens in a background
+thread.
+'''
+import json
+import os
+import queue
+import threading
+
+import numpy
+
+
+# pylint: disable-next=too-many-instance-attributes
+class AsyncWriter(object):
+    '''
+    Writes snapshots of shape `shape` into chunked, memory-mapped `.npy`
+    files `<basename>_00000.npy`, `<basename>_00001.npy`, ... with
+    `chunk_size` snapshots each, and the times into `<basename>_times.npy`.
+    The names of the chunk files are listed in `<basename>_chunks.json`.
+    Snapshots are stored as `dtype`, e.g., `numpy.float32` for halving the
+    file size.
+
+    There are `num_buffers` snapshot buffers. If all of them are waiting to
+    be written, `write()` blocks until the background thread frees one, so
+    memory usage is bounded even if the disk is slower than the solver.
+
+    All data is on disk once `close()` returns; use the writer as a context
+    manager to make sure this happens.
+    '''
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+            self, basename, shape, *,
+            dtype=numpy.float64,
+            chunk_size=100,
+            num_buffers=4
+            ):
+        self.basename = basename
+        self.shape = tuple(shape)
+        self.dtype = numpy.dtype(dtype)
+        self.chunk_size = chunk_size
+
+        self._free = queue.Queue()
+        for _ in range(num_buffers):
+            self._free.put(numpy.empty(self.shape, dtype=self.dtype))
+        self._pending = queue.Queue()
+
+        self._times = []
+        self._chunk = None
+        self._error = None
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def write(self, t, u):
+        assert not self._closed, 'Writer is closed.'
+        self._raise_error()
+        buf = self._free.get()
+        buf[...] = u
+        self._pending.put((t, buf))
+        return
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._pending.put(None)
+        self._thread.join()
+        self._raise_error()
+        return
+
+    def _raise_error(self):
+        if self._error is not None:
+            error = self._error
+            self._error = None
+            raise error
+
+    def _chunk_filename(self, k):
+        return '{}_{:05d}.npy'.format(self.basename, k)
+
+    def _run(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            t, buf = item
+            try:
+                if self._error is None:
+                    self._store(t, buf)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                # Reraised in the main thread. Keep consuming the queue such
+                # that write() does not block forever.
+                self._error = e
+            finally:
+                self._free.put(buf)
+
+        try:
+            self._finalize()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self._error = e
+        return
+
+    def _store(self, t, buf):
+        k, i = divmod(len(self._times), self.chunk_size)
+        if i == 0:
+            if self._chunk is not None:
+                self._chunk.flush()
+            self._chunk = numpy.lib.format.open_memmap(
+                self._chunk_filename(k), mode='w+', dtype=self.dtype,
+                shape=(self.chunk_size,) + self.shape
+                )
+        self._chunk[i] = buf
+        self._times.append(t)
+        return
+
+    def _finalize(self):
+        if self._chunk is not None:
+            self._chunk.flush()
+            num_last = len(self._times) % self.chunk_size
+            if num_last > 0:
+                # Shrink the last chunk to its actual content.
+                k = len(self._times) // self.chunk_size
+                data = numpy.array(self._chunk[:num_last])
+                self._chunk = None
+                numpy.save(self._chunk_filename(k), data)
+            self._chunk = None
+        numpy.save(
+            '{}_times.npy'.format(self.basename), numpy.array(self._times)
+            )
+        num_chunks = \
+            (len(self._times) + self.chunk_size - 1) // self.chunk_size
+        filename = '{}_chunks.json'.format(self.basename)
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump([
+                os.path.basename(self._chunk_filename(k))
+                for k in range(num_chunks)
+                ], f)
+        return
+
+
+def read_snapshots(basename, mmap_mode='r'):
+    '''
+    Returns the times and the memory-mapped chunks written by an
+    `AsyncWriter` with the given `basename`. Only the chunks listed in its
+    `<basename>_chunks.json` are read, not any other (e.g., stale) files
+    which happen to match the naming pattern.
+    '''
+    times = numpy.load('{}_times.npy'.format(basename))
+    with open('{}_chunks.json'.format(basename), encoding='utf-8') as f:
+        filenames = json.load(f)
+    directory = os.path.dirname(basename)
+    chunks = [
+        numpy.load(os.path.join(directory, filename), mmap_mode=mmap_mode)
+        for filename in filenames
+        ]
+    return times, chunks
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Periodic steady states of periodically forced problems by shooting: instead
+of marching through many periods until the transient has died out, the
+fixed point :math:`u = \\Phi(u)` of the period map :math:`\\Phi` is
+computed with a Newton-Krylov method.
+'''
+import copy
+import functools
+import warnings
+
+import numpy
+import scipy.sparse.linalg
+
+
+class _Homogeneous(object):
+    '''
+    The linear part :math:`F(u, t) - F(0, t)` of an affine problem. Solves go
+    through the problem's own `solve_alpha_M_beta_F`, so its cached
+    factorizations are reused.
+    '''
+    def __init__(self, problem):
+        self.problem = problem
+        return
+
+    def _F0(self, u, t):
+        return self.problem.eval_alpha_M_beta_F(0.0, 1.0, 0.0 * u, t)
+
+    def eval_alpha_M_beta_F(self, alpha, beta, u, t):
+        out = self.problem.eval_alpha_M_beta_F(alpha, beta, u, t)
+        if beta != 0.0:
+            out -= beta * self._F0(u, t)
+        return out
+
+    def solve_alpha_M_beta_F(self, alpha, beta, b, t):
+        if beta != 0.0:
+            b = b + beta * self._F0(b, t)
+        return self.problem.solve_alpha_M_beta_F(alpha, beta, b, t)
+
+
+# pylint: disable-next=too-many-arguments
+def periodic_steady_state(
+        stepper, u0, t0, period, dt, *,
+        tol=1.0e-8,
+        max_iterations=20,
+        affine=False
+        ):
+    '''
+    Computes the state `u` at `t0` from which `stepper` returns to `u` after
+    one `period`, i.e., the periodic steady state of a problem with forcing
+    of period `period`. The period is divided into equal steps of size at
+    most `dt`.
+
+    Newton's method is applied to :math:`G(u) = \\Phi(u) - u`, where
+    :math:`\\Phi` maps the state at `t0` to the state at `t0 + period`. The
+    Newton systems are solved with GMRES; the products of the Jacobian
+    :math:`\\Phi'` with vectors are finite differences of period maps. If
+    `affine` is set, i.e., `F` is affine in `u`, they are instead computed
+    exactly by stepping with the homogeneous problem; then a single Newton
+    step suffices. The stepper must access its problem through
+    `stepper.problem`.
+
+    Rannacher smoothing (see :class:`parabolic.Theta`) is switched off: it
+    only affects the first steps of a run, not the state that the run
+    settles in, but it would make the first period map differ from the
+    others.
+
+    The iteration stops when :math:`\\|G(u)\\| \\le tol \\|\\Phi(u)\\|`.
+    Returns `(u, num_period_maps)`, where `num_period_maps` counts all
+    evaluations of the period map and its linearization.
+    '''
+    num_steps = max(int(numpy.ceil(period / dt - 1.0e-10)), 1)
+    h = period / num_steps
+    count = [0]
+
+    def period_map(s, u):
+        count[0] += 1
+        for k in range(num_steps):
+            u = s.step(u, t0 + k*h, h)
+        return u
+
+    if getattr(stepper, 'rannacher_steps', 0) > 0:
+        stepper = copy.copy(stepper)
+        stepper.rannacher_steps = 0
+
+    linearized = None
+    if affine:
+        linearized = copy.copy(stepper)
+        linearized.problem = _Homogeneous(stepper.problem)
+
+    def jvp(u, Phi_u, v):
+        # Phi'(u) v
+        if affine:
+            return period_map(linearized, v)
+        norm_v = numpy.linalg.norm(v)
+        if norm_v == 0.0:
+            return numpy.zeros_like(v)
+        eps = numpy.sqrt(numpy.finfo(float).eps) \
+            * (1.0 + numpy.linalg.norm(u)) / norm_v
+        return (period_map(stepper, u + eps*v) - Phi_u) / eps
+
+    def newton_matvec(u, Phi_u, v):
+        return jvp(u, Phi_u, v) - v
+
+    u = u0
+    Phi_u = period_map(stepper, u)
+    for _ in range(max_iterations):
+        G = Phi_u - u
+        norm_G = numpy.linalg.norm(G)
+        norm_Phi = numpy.linalg.norm(Phi_u)
+        if norm_G <= tol * norm_Phi:
+            return Phi_u, count[0]
+
+        n = len(u)
+        J = scipy.sparse.linalg.LinearOperator(
+            (n, n), matvec=functools.partial(newton_matvec, u, Phi_u),
+            dtype=float
+            )
+        # Solve just accurately enough for the Newton update to meet the
+        # tolerance, but not beyond the accuracy of the Jacobian products.
+        rtol_min = 1.0e-14 if affine else 1.0e-6
+        rtol = min(0.1, max(0.5 * tol * norm_Phi / norm_G, rtol_min))
+        delta, _ = scipy.sparse.linalg.gmres(
+            J, -G, rtol=rtol, atol=0.0, restart=50, maxiter=10
+            )
+        u = u + delta
+        Phi_u = period_map(stepper, u)
+
+    warnings.warn(
+        'No periodic steady state reached after {} Newton steps.'.format(
+            max_iterations
+            ))
+    return Phi_u, count[0]
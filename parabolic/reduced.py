@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Model reduction by proper orthogonal decomposition (POD).
+
+Snapshots of full runs are compressed on the fly into a POD basis `V` by
+`IncrementalPOD`; the snapshot matrix is never stored. `ReducedProblem` is
+the Galerkin projection
+
+.. math::
+    V^T M V c' = V^T A V c + V^T f(t)
+
+with small dense operators. It implements the usual problem protocol, so
+every stepper runs on it. `integrate_reduced` runs a stepper on the reduced
+problem, checks the residual of the full discrete equations, and continues
+with the full problem if the reduced model is not accurate enough.
+'''
+import numpy
+import scipy.linalg
+
+from .driver import integrate
+from .forcing import AffineForcing, ForcingCache
+
+
+class IncrementalPOD(object):
+    '''
+    POD basis of a stream of snapshots, updated by the incremental SVD of
+
+        M. Brand,
+        Incremental singular value decomposition of uncertain data with
+        missing values,
+        ECCV 2002,
+        <https://doi.org/10.1007/3-540-47969-4_47>.
+
+    Snapshots passed to `add(u)` are buffered and merged into the basis in
+    blocks of `block_size`. Modes with singular values below `tol` times the
+    largest one are dropped, and at most `max_rank` are kept. Memory is
+    :math:`O(n (r + block\\_size))` for rank `r`.
+    '''
+    def __init__(self, tol=1.0e-8, max_rank=None, block_size=16):
+        self.tol = tol
+        self.max_rank = max_rank
+        self.block_size = block_size
+        self.num_snapshots = 0
+        self._U = None
+        self._s = None
+        self._buffer = []
+        return
+
+    def add(self, u):
+        self._buffer.append(numpy.array(u, dtype=float))
+        self.num_snapshots += 1
+        if len(self._buffer) >= self.block_size:
+            self._flush()
+        return
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        B = numpy.column_stack(self._buffer)
+        self._buffer = []
+
+        if self._U is None:
+            U, s, _ = numpy.linalg.svd(B, full_matrices=False)
+        else:
+            # Component of B orthogonal to the current basis; twice, since
+            # once is not enough in floating point.
+            P = self._U.T.dot(B)
+            R = B - self._U.dot(P)
+            P2 = self._U.T.dot(R)
+            R -= self._U.dot(P2)
+            P += P2
+            Q, RR = numpy.linalg.qr(R)
+            r = len(self._s)
+            k = B.shape[1]
+            K = numpy.zeros((r + k, r + k))
+            K[:r, :r] = numpy.diag(self._s)
+            K[:r, r:] = P
+            K[r:, r:] = RR
+            UK, s, _ = numpy.linalg.svd(K)
+            U = numpy.column_stack([self._U, Q]).dot(UK)
+
+        keep = s > self.tol * s[0] if s[0] > 0.0 else s > 0.0
+        if self.max_rank is not None:
+            keep[self.max_rank:] = False
+        self._U = U[:, keep]
+        self._s = s[keep]
+        return
+
+    @property
+    def basis(self):
+        self._flush()
+        return self._U
+
+    @property
+    def singular_values(self):
+        self._flush()
+        return self._s
+
+
+class ReducedProblem(object):
+    '''
+    Galerkin projection of `problem` onto the orthonormal columns of
+    `basis`. States of the reduced problem are the coefficient vectors `c`,
+    see `reduce(u)` and `expand(c)`.
+
+    The reduced operators are built through the problem protocol from
+    :math:`2 r` evaluations of the full problem, assuming that `F` is affine
+    in `u` and that only the right-hand side depends on `t`. The right-hand
+    side is projected per evaluation time, which costs one full evaluation;
+    if the full problem was given a :class:`parabolic.AffineForcing`, pass
+    it to `set_forcing` to project its vectors once instead.
+    '''
+    def __init__(self, problem, basis):
+        self.problem = problem
+        self.basis = basis
+        n, r = basis.shape
+        zero = numpy.zeros(n)
+        F0 = problem.eval_alpha_M_beta_F(0.0, 1.0, zero, 0.0)
+        MV = numpy.column_stack([
+            problem.eval_alpha_M_beta_F(1.0, 0.0, basis[:, j], 0.0)
+            for j in range(r)
+            ])
+        AV = numpy.column_stack([
+            problem.eval_alpha_M_beta_F(0.0, 1.0, basis[:, j], 0.0) - F0
+            for j in range(r)
+            ])
+        self.M = basis.T.dot(MV)
+        self.A = basis.T.dot(AV)
+        self._factorizations = {}
+        self._set_reduced_forcing(None)
+        return
+
+    def _set_reduced_forcing(self, f):
+        V = self.basis
+        if isinstance(f, AffineForcing):
+            assemble = AffineForcing(
+                f.coefficients, [V.T.dot(b) for b in f.vectors]
+                )
+        else:
+            zero = numpy.zeros(V.shape[0])
+
+            def assemble(t):
+                return V.T.dot(
+                    self.problem.eval_alpha_M_beta_F(0.0, 1.0, zero, t)
+                    )
+        self._forcing = ForcingCache(assemble)
+        return
+
+    def set_forcing(self, f):
+        # Replaces the right-hand side of the full problem and its projection.
+        self.problem.set_forcing(f)
+        self._set_reduced_forcing(f)
+        return
+
+    def reduce(self, u):
+        return self.basis.T.dot(u)
+
+    def expand(self, c):
+        return self.basis.dot(c)
+
+    def eval_alpha_M_beta_F(self, alpha, beta, c, t):
+        # Evaluate  alpha * M * c + beta * F(c, t).
+        out = alpha * self.M.dot(c)
+        if beta != 0.0:
+            out += beta * (self.A.dot(c) + self._forcing(t))
+        return out
+
+    def solve_alpha_M_beta_F(self, alpha, beta, b, t):
+        # Solve  alpha * M * c + beta * F(c, t) = b  for c.
+        if beta != 0.0:
+            b = b - beta * self._forcing(t)
+        key = (alpha, beta)
+        if key not in self._factorizations:
+            self._factorizations[key] = scipy.linalg.lu_factor(
+                alpha * self.M + beta * self.A
+                )
+        return scipy.linalg.lu_solve(self._factorizations[key], b)
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def integrate_reduced(
+        reduced, Method, u0, t0, t_end, dt, *,
+        tol=1.0e-6,
+        check_every=10
+        ):
+    '''
+    Like :func:`parabolic.integrate`, yields `(t, u)` with full states `u`,
+    computed by `Method` (a theta method, e.g., `ImplicitEuler` or
+    `Trapezoidal`) on the reduced problem.
+
+    Every `check_every` steps and in the last step, the expanded step
+    :math:`u_n \\to u_{n+1}` is inserted into the full discrete equations,
+
+    .. math::
+        r = (M - \\theta dt A) u_{n+1} - \\theta dt f_{n+1}
+            - (M + (1-\\theta) dt A) u_n - (1-\\theta) dt f_n,
+
+    which only takes two evaluations of the full problem. If
+    :math:`\\|r\\|` exceeds `tol` times the norm of the right-hand side,
+    the step is repeated with the full problem, which is used from then on.
+    The time at which this happened is stored in `reduced.fallback_time`
+    (`None` if the reduced model sufficed).
+    '''
+    problem = reduced.problem
+    stepper = Method(reduced)
+    theta = stepper.theta
+    reduced.fallback_time = None
+
+    t_prev = t0
+    u_prev = u0
+    for k, (t, c) in enumerate(
+            integrate(stepper, reduced.reduce(u0), t0, t_end, dt)
+            ):
+        u = reduced.expand(c)
+        h = t - t_prev
+        if (k+1) % check_every == 0 or t >= t_end:
+            rhs = problem.eval_alpha_M_beta_F(
+                1.0, (1.0-theta)*h, u_prev, t_prev
+                )
+            r = problem.eval_alpha_M_beta_F(1.0, -theta*h, u, t) - rhs
+            if numpy.linalg.norm(r) > tol * numpy.linalg.norm(rhs):
+                reduced.fallback_time = t_prev
+                steps = integrate(Method(problem), u_prev, t_prev, t_end, dt)
+                for t, u in steps:
+                    yield t, u
+                return
+        yield t, u
+        t_prev = t
+        u_prev = u
+    return
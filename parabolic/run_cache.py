@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Memoization of whole integration runs on disk.
+
+A run is identified by a hash of everything it depends on: the problem's
+operators, the initial state, the stepper class and its parameters, and the
+time stepping parameters. Each entry consists of the raw trajectory
+`<key>.dat`, opened as a read-only memory map when read, and the metadata
+`<key>.json`. Both are written to temporary files first and renamed, the
+metadata last, so other processes sharing the directory only ever see
+complete entries.
+'''
+import glob
+import hashlib
+import json
+import numbers
+import os
+import uuid
+
+import numpy
+
+from .driver import integrate
+
+
+def _hash_value(h, value):
+    if isinstance(value, numpy.ndarray):
+        h.update(str(value.dtype).encode())
+        h.update(str(value.shape).encode())
+        h.update(numpy.ascontiguousarray(value).tobytes())
+    else:
+        h.update(repr(value).encode())
+    return
+
+
+def _parameters(stepper):
+    # Public scalar and array attributes, including class attributes like
+    # `theta` or Butcher tableaus.
+    params = {}
+    for name in dir(stepper):
+        if name.startswith('_') or name == 'problem':
+            continue
+        value = getattr(stepper, name)
+        if isinstance(value, (numbers.Number, str, type(None))):
+            params[name] = value
+        elif isinstance(value, (list, tuple, numpy.ndarray)):
+            params[name] = numpy.asarray(value)
+    return params
+
+
+# pylint: disable-next=too-many-arguments
+def run_fingerprint(
+        stepper, u0, t0, t_end, dt, *, output_times=None, tag=None
+        ):
+    '''
+    Hash of an integration run. The problem `stepper.problem` is identified
+    by its type, its matrices `M` and `A` if it has any, and evaluations of
+    :math:`M u_0 + F(u_0, t)` at the start, middle, and end of the interval.
+    Anything else the run depends on, e.g., parameters of a forcing which are
+    not visible in these evaluations, must be passed as (a `repr`-able)
+    `tag`.
+    '''
+    problem = stepper.problem
+    u0 = numpy.asarray(u0)
+    h = hashlib.sha256()
+    h.update(type(problem).__name__.encode())
+    for name in ['M', 'A']:
+        matrix = getattr(problem, name, None)
+        if matrix is None:
+            continue
+        matrix = matrix.tocsr() if hasattr(matrix, 'tocsr') else matrix
+        for attr in ['data', 'indices', 'indptr']:
+            _hash_value(h, getattr(matrix, attr, None))
+        _hash_value(h, numpy.asarray(matrix.shape))
+    for t in [t0, 0.5 * (t0 + t_end), t_end]:
+        _hash_value(h, numpy.asarray(
+            problem.eval_alpha_M_beta_F(1.0, 1.0, u0, t)
+            ))
+
+    h.update(type(stepper).__name__.encode())
+    params = _parameters(stepper)
+    get_state = getattr(stepper, 'get_state', None)
+    if get_state is not None:
+        params.update({
+            'state.' + key: value for key, value in get_state().items()
+            })
+    for name in sorted(params):
+        h.update(name.encode())
+        _hash_value(h, params[name])
+
+    _hash_value(h, u0)
+    _hash_value(h, (t0, t_end, dt, output_times, tag))
+    return h.hexdigest()
+
+
+class RunCache(object):
+    '''
+    Cache of integration runs in `directory`, shared by all processes using
+    the same directory. `run()` returns stored trajectories instead of
+    recomputing them.
+
+    The total size is bounded by `max_bytes`: after storing a run, the least
+    recently used entries are removed until the rest fits. A hit counts as a
+    use, it updates the modification time of the entry's metadata.
+    '''
+    def __init__(self, directory, max_bytes=2**30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        return
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + '.json', base + '.dat'
+
+    def _load(self, key):
+        meta_path, data_path = self._paths(key)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            shape = tuple(meta['shape'])
+            if shape[0] == 0:
+                # Empty files cannot be memory-mapped.
+                states = numpy.empty(shape, dtype=meta['dtype'])
+            else:
+                states = numpy.memmap(
+                    data_path, dtype=meta['dtype'], mode='r', shape=shape
+                    )
+            os.utime(meta_path, None)
+        except (IOError, OSError, ValueError):
+            # missing, or evicted by another process meanwhile
+            return None
+        return numpy.array(meta['times']), states
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def run(self, stepper, u0, t0, t_end, dt, *, output_times=None, tag=None):
+        '''
+        Returns `(times, states)` of
+        `parabolic.integrate(stepper, u0, t0, t_end, dt, output_times)`, with
+        the states as the rows of a read-only memory-mapped array. For a
+        cache hit, the stepper is not used at all, so its internal state
+        (e.g., step counters) is not advanced. See :func:`run_fingerprint`
+        for `tag`.
+        '''
+        key = run_fingerprint(
+            stepper, u0, t0, t_end, dt, output_times=output_times, tag=tag
+            )
+        cached = self._load(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+
+        meta_path, data_path = self._paths(key)
+        tmp = uuid.uuid4().hex
+        times = []
+        dtype = numpy.asarray(u0).dtype
+        shape = numpy.shape(u0)
+        # Stream the states to disk instead of keeping them in memory.
+        with open(data_path + tmp, 'wb') as f:
+            steps = integrate(
+                stepper, u0, t0, t_end, dt, output_times=output_times
+                )
+            for t, u in steps:
+                u = numpy.asarray(u)
+                dtype = u.dtype
+                f.write(numpy.ascontiguousarray(u).tobytes())
+                times.append(t)
+        meta = {
+            'times': times,
+            'dtype': str(dtype),
+            'shape': [len(times)] + list(shape),
+            }
+        with open(meta_path + tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(data_path + tmp, data_path)
+        os.replace(meta_path + tmp, meta_path)
+
+        # Map the entry before evicting, so it stays readable even if another
+        # process evicts it right away.
+        cached = self._load(key)
+        self._evict(keep=key)
+        return cached
+
+    def _evict(self, keep):
+        entries = []
+        total = 0
+        for meta_path in glob.glob(os.path.join(self.directory, '*.json')):
+            key = os.path.basename(meta_path)[:-len('.json')]
+            try:
+                mtime = os.path.getmtime(meta_path)
+                size = os.path.getsize(meta_path) \
+                    + os.path.getsize(self._paths(key)[1])
+            except OSError:
+                continue
+            total += size
+            if key != keep:
+                entries.append((mtime, size, key))
+
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            # metadata first, so readers never see an entry without data
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+        return
+
+    def clear(self):
+        for key in self.keys():
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        return
+
+    def keys(self):
+        return [
+            os.path.basename(path)[:-len('.json')]
+            for path in glob.glob(os.path.join(self.directory, '*.json'))
+            ]
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Parameter sweeps: many independent runs with the same operators `M`, `A`
+but different initial states and right-hand sides, distributed across
+processes.
+'''
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy
+import scipy.sparse
+
+from .driver import integrate
+from .numpy_backend import LinearProblem
+
+
+class SharedOperators(object):
+    '''
+    The CSR arrays of the sparse matrices `M` and `A` in shared memory. The
+    object is small when pickled; `attach()` in any process gives read-only
+    matrices backed by the shared memory, without copying.
+
+    The creating process must call `unlink()` once all workers are done.
+    '''
+    def __init__(self, M, A):
+        self.specs = {}
+        self._created = []
+        self._attached = []
+        for key, matrix in [('M', M), ('A', A)]:
+            matrix = scipy.sparse.csr_matrix(matrix)
+            arrays = {}
+            for name in ['data', 'indices', 'indptr']:
+                array = getattr(matrix, name)
+                block = shared_memory.SharedMemory(
+                    create=True, size=max(array.nbytes, 1)
+                    )
+                view = numpy.ndarray(
+                    array.shape, dtype=array.dtype, buffer=block.buf
+                    )
+                view[:] = array
+                self._created.append(block)
+                arrays[name] = (block.name, array.shape, array.dtype.str)
+            self.specs[key] = (matrix.shape, arrays)
+        return
+
+    def __getstate__(self):
+        # Only the names of the blocks are sent to the workers.
+        return {'specs': self.specs, '_created': [], '_attached': []}
+
+    def attach(self):
+        matrices = {}
+        for key in ['M', 'A']:
+            shape, arrays = self.specs[key]
+            views = {}
+            for name in ['data', 'indices', 'indptr']:
+                block_name, array_shape, dtype = arrays[name]
+                block = shared_memory.SharedMemory(name=block_name)
+                # Keep the block alive as long as this object.
+                self._attached.append(block)
+                view = numpy.ndarray(
+                    array_shape, dtype=numpy.dtype(dtype), buffer=block.buf
+                    )
+                view.flags.writeable = False
+                views[name] = view
+            matrix = scipy.sparse.csr_matrix(shape)
+            # Set the arrays directly; the constructor would copy them.
+            matrix.data = views['data']
+            matrix.indices = views['indices']
+            matrix.indptr = views['indptr']
+            matrices[key] = matrix
+        return matrices['M'], matrices['A']
+
+    def unlink(self):
+        for block in self._created:
+            block.close()
+            block.unlink()
+        self._created = []
+        return
+
+
+class _Worker(object):
+    '''
+    State of a worker process: the problem built from the shared operators
+    (with its factorization cache, reused for all runs of this worker) and
+    the memory-mapped output. `stepping` is the tuple
+    `(Method, t0, t_end, dt, output_times)`.
+    '''
+    def __init__(self, operators, stepping, output):
+        self.operators = operators
+        M, A = operators.attach()
+        self.problem = LinearProblem(M, A)
+        Method, t0, t_end, dt, self.output_times = stepping
+        self.stepper = Method(self.problem)
+        self.interval = (t0, t_end, dt)
+        self.output = numpy.load(output, mmap_mode='r+')
+        return
+
+    def __call__(self, task):
+        k, u0, f = task
+        self.problem.set_forcing(f)
+        # Steppers which count their steps start over for every run.
+        reset = getattr(self.stepper, 'reset', None)
+        if reset is not None:
+            reset()
+        steps = integrate(
+            self.stepper, u0, *self.interval, output_times=self.output_times
+            )
+        if self.output_times is None:
+            u = u0
+            for _, u in steps:
+                pass
+            self.output[k] = u
+        else:
+            for j, (_, u) in enumerate(steps):
+                self.output[k, j] = u
+        self.output.flush()
+        return k
+
+
+_worker = None
+
+
+def _init_worker(*args):
+    # pylint: disable=global-statement
+    global _worker
+    _worker = _Worker(*args)
+    return
+
+
+def _run_worker(task):
+    return _worker(task)
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def run_sweep(
+        M, A, runs, Method, t0, t_end, dt, output, *,
+        output_times=None,
+        processes=None
+        ):
+    '''
+    Integrates :math:`M u' = A u + f(t)` from `t0` to `t_end` for every
+    `(u0, f)` in `runs` (`f` may be `None`) with `Method` and step size `dt`.
+
+    `M` and `A` are placed in shared memory once; every worker process
+    builds its problem from them and factorizes each `(alpha, beta)` pair
+    once for all of its runs. Runs are handed out one at a time, so idle
+    workers take over the remaining work.
+
+    The results are written into the `.npy` file `output`, with shape
+    `(len(runs), n)` for the final states or, if `output_times` are given,
+    `(len(runs), len(output_times), n)`. The file is returned
+    memory-mapped.
+    '''
+    n = M.shape[0]
+    shape = (len(runs), n) if output_times is None \
+        else (len(runs), len(output_times), n)
+    numpy.lib.format.open_memmap(
+        output, mode='w+', dtype=numpy.float64, shape=shape
+        ).flush()
+
+    operators = SharedOperators(M, A)
+    stepping = (Method, t0, t_end, dt, output_times)
+    try:
+        with multiprocessing.Pool(
+                processes,
+                initializer=_init_worker,
+                initargs=(operators, stepping, output)
+                ) as pool:
+            tasks = ((k, u0, f) for k, (u0, f) in enumerate(runs))
+            for _ in pool.imap_unordered(_run_worker, tasks, chunksize=1):
+                pass
+    finally:
+        operators.unlink()
+
+    return numpy.load(output, mmap_mode='r')
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Step-size planning. Implicit steppers work with :math:`M - \\theta dt A`,
+so every distinct step size means another factorization. Restricting the
+step sizes to a geometric ladder keeps the number of distinct operators
+small enough for the problem's factorization cache.
+'''
+import math
+
+
+class StepSizeLadder(object):
+    '''
+    The step sizes :math:`dt_{ref} r^k` for integers `k`, optionally
+    restricted to `[dt_min, dt_max]`.
+
+    `quantize(dt)` rounds down to the ladder, so a step size chosen for
+    accuracy or stability is never exceeded. Every rung is computed from
+    its index, so equal rungs are bitwise equal and hit the same cache
+    entries.
+    '''
+    def __init__(self, dt_ref, ratio=2.0, dt_min=None, dt_max=None):
+        assert dt_ref > 0.0
+        assert ratio > 1.0
+        self.dt_ref = dt_ref
+        self.ratio = ratio
+        self.k_min = None if dt_min is None else self.index(dt_min, up=True)
+        self.k_max = None if dt_max is None else self.index(dt_max)
+        return
+
+    def index(self, dt, up=False):
+        '''
+        Index of the largest rung not larger than `dt` (or, with `up`, of the
+        smallest rung not smaller than `dt`).
+        '''
+        x = math.log(dt / self.dt_ref) / math.log(self.ratio)
+        # Absorb the round-off of the logarithms for rungs themselves.
+        return int(math.ceil(x - 1.0e-10)) if up \
+            else int(math.floor(x + 1.0e-10))
+
+    def rung(self, k):
+        if self.k_min is not None:
+            k = max(k, self.k_min)
+        if self.k_max is not None:
+            k = min(k, self.k_max)
+        return self.dt_ref * self.ratio**k
+
+    def quantize(self, dt):
+        return self.rung(self.index(dt))
+
+    def rungs(self):
+        '''
+        All step sizes of a bounded ladder, in increasing order.
+        '''
+        assert self.k_min is not None and self.k_max is not None
+        return [self.rung(k) for k in range(self.k_min, self.k_max+1)]
+
+    def ramp(self, dt_start, dt_end, steps_per_rung=1):
+        '''
+        Step sizes for ramping from `dt_start` to `dt_end` through the rungs
+        in between, taking `steps_per_rung` steps on every rung but the last
+        one, which is returned once.
+        '''
+        k0 = self.index(dt_start)
+        k1 = self.index(dt_end)
+        direction = 1 if k1 >= k0 else -1
+        dts = []
+        for k in range(k0, k1, direction):
+            dts += steps_per_rung * [self.rung(k)]
+        dts.append(self.rung(k1))
+        return dts
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Automatic switching between an explicit and an implicit method depending on
+the stiffness of the problem.
+'''
+import numpy
+
+from .time_steppers import ExplicitEuler, ImplicitEuler
+
+
+# pylint: disable-next=too-many-instance-attributes
+class StiffnessSwitching(object):
+    '''
+    Takes steps with the explicit method `explicit` (default:
+    `ExplicitEuler`) as long as it is stable and with the implicit method
+    `implicit` (default: `ImplicitEuler`) otherwise, so linear systems with
+    `F` are only solved when stability requires it.
+
+    The stiffness indicator is :math:`dt \\rho`, where :math:`\\rho` is the
+    spectral radius of the Jacobian :math:`M^{-1} \\partial F/\\partial u`,
+    estimated by power iteration with finite differences of `F`. The
+    iteration vector is kept from step to step, so `power_iterations` every
+    `monitor_every` steps suffice to track slowly changing problems; the
+    first estimate uses `initial_power_iterations`. Each power iteration
+    costs about as much as an explicit Euler step (a solve with `M`), hence
+    the default of monitoring every 10th step only. Changes of `dt` are
+    accounted for in every step; only changes of the problem itself are
+    noticed with a delay of up to `monitor_every` steps.
+
+    The explicit method is stable for :math:`dt \\rho` up to its
+    `stability_limit` (the length of the stability interval on the negative
+    real axis, 2 for explicit Euler and Heun). With hysteresis, the stepper
+    switches to implicit when :math:`dt \\rho` exceeds `to_implicit` times
+    the stability limit and back to explicit only when it drops below
+    `to_explicit` times the limit.
+
+    This assumes that the spectrum of the Jacobian is near the negative real
+    axis, as is the case for diffusion-dominated problems.
+    '''
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+            self, problem,
+            explicit=ExplicitEuler,
+            implicit=ImplicitEuler, *,
+            to_implicit=0.9,
+            to_explicit=0.5,
+            monitor_every=10,
+            power_iterations=1,
+            initial_power_iterations=20
+            ):
+        assert to_explicit < to_implicit <= 1.0
+        self.problem = problem
+        self.explicit = explicit(problem)
+        self.implicit = implicit(problem)
+        self.order = min(self.explicit.order, self.implicit.order)
+        self.to_implicit = to_implicit
+        self.to_explicit = to_explicit
+        self.monitor_every = monitor_every
+        self.power_iterations = power_iterations
+        self.initial_power_iterations = initial_power_iterations
+        self.reset()
+        return
+
+    def reset(self):
+        self.mode = None
+        self.spectral_radius = None
+        self.num_explicit_steps = 0
+        self.num_implicit_steps = 0
+        self.num_switches = 0
+        self._steps_taken = 0
+        self._x = None
+        self._last = self.explicit
+        return
+
+    def _estimate_spectral_radius(self, u, t, num_iterations):
+        # Power iteration on M^{-1} J with J x ~ (F(u + eps x) - F(u)) / eps.
+        problem = self.problem
+        if self._x is None:
+            x = numpy.random.RandomState(0).rand(len(u)) - 0.5
+            self._x = x / numpy.linalg.norm(x)
+        F0 = problem.eval_alpha_M_beta_F(0.0, 1.0, u, t)
+        eps = numpy.sqrt(numpy.finfo(float).eps) \
+            * (1.0 + numpy.linalg.norm(u))
+        rho = 0.0
+        for _ in range(num_iterations):
+            Jx = (problem.eval_alpha_M_beta_F(0.0, 1.0, u + eps*self._x, t)
+                  - F0) / eps
+            y = problem.solve_alpha_M_beta_F(1.0, 0.0, Jx, t)
+            rho = numpy.linalg.norm(y)
+            if rho == 0.0:
+                break
+            self._x = y / rho
+        return rho
+
+    def step(self, u0, t, dt):
+        if self.spectral_radius is None:
+            self.spectral_radius = self._estimate_spectral_radius(
+                u0, t, self.initial_power_iterations
+                )
+        elif self._steps_taken % self.monitor_every == 0:
+            self.spectral_radius = self._estimate_spectral_radius(
+                u0, t, self.power_iterations
+                )
+        self._steps_taken += 1
+
+        stiffness = dt * self.spectral_radius / self.explicit.stability_limit
+        if self.mode is None:
+            # first step
+            self.mode = 'implicit' if stiffness > self.to_implicit \
+                else 'explicit'
+        elif self.mode == 'explicit' and stiffness > self.to_implicit:
+            self.mode = 'implicit'
+            self.num_switches += 1
+        elif self.mode == 'implicit' and stiffness < self.to_explicit:
+            self.mode = 'explicit'
+            self.num_switches += 1
+
+        if self.mode == 'explicit':
+            self._last = self.explicit
+            self.num_explicit_steps += 1
+        else:
+            self._last = self.implicit
+            self.num_implicit_steps += 1
+        return self._last.step(u0, t, dt)
+
+    def dense_output(self, u0, u1, t, dt):
+        return self._last.dense_output(u0, u1, t, dt)
+
+    def get_state(self):
+        state = {
+            'mode': self.mode,
+            'spectral_radius': self.spectral_radius,
+            'num_explicit_steps': self.num_explicit_steps,
+            'num_implicit_steps': self.num_implicit_steps,
+            'num_switches': self.num_switches,
+            'steps_taken': self._steps_taken,
+            }
+        if self._x is not None:
+            state['x'] = self._x
+        return state
+
+    def set_state(self, state):
+        self.mode = state['mode']
+        self.spectral_radius = state['spectral_radius']
+        self.num_explicit_steps = int(state['num_explicit_steps'])
+        self.num_implicit_steps = int(state['num_implicit_steps'])
+        self.num_switches = int(state['num_switches'])
+        self._steps_taken = int(state['steps_taken'])
+        self._x = numpy.array(state['x']) if 'x' in state else None
+        self._last = self.implicit if self.mode == 'implicit' \
+            else self.explicit
+        return
@@ -7,6 +7,7 @@ Routines for one time-stepping of the general equation
     \\frac{du}{dt} = F(u).
 
 '''
+from .interpolation import LinearInterpolant
 
 
 class ExplicitEuler(object):
@@ -14,6 +15,9 @@ class ExplicitEuler(object):
     Explicit Euler method for :math:`u' = F(u)`.
     '''
     order = 1.0
+    theta = 0.0
+    # stable for dt*lambda in [-2, 0] for real eigenvalues lambda
+    stability_limit = 2.0
 
     def __init__(self, problem):
         self.problem = problem
@@ -26,40 +30,89 @@ class ExplicitEuler(object):
         u1 = self.problem.solve_alpha_M_beta_F(1.0, 0.0, b, t+dt)
         return u1
 
+    def dense_output(self, u0, u1, t, dt):
+        # The linear interpolant is accurate to O(dt^2), more than the method
+        # itself. It's free, too.
+        return LinearInterpolant(t, u0, t+dt, u1)
 
-class ImplicitEuler(object):
-    '''
-    Implicit Euler method for :math:`u' = F(u)`.
+
+class Theta(object):
     '''
-    order = 1.0
+    Theta method for :math:`u' = F(u)`,
 
-    def __init__(self, problem):
+    .. math::
+        (u_{k+1} - u_k) / dt = \\theta F(u_{k+1}, t+dt)
+            + (1-\\theta) F(u_k, t),
+
+    with `theta` in [0, 1]; second order for `theta=1/2`, first order
+    otherwise.
+
+    For `theta=1/2`, nonsmooth initial data excite high-frequency modes
+    which are hardly damped. With `rannacher_steps > 0`, the first
+    `rannacher_steps` steps are taken with implicit Euler instead (Rannacher
+    smoothing), which damps them without affecting the order. The stepper
+    counts its steps for this, whatever their start times and sizes;
+    `reset()` starts a new run.
+    '''
+    def __init__(self, problem, theta=0.5, rannacher_steps=0):
+        assert 0.0 <= theta <= 1.0
         self.problem = problem
+        self.theta = theta
+        self.order = 2.0 if theta == 0.5 else 1.0
+        self.rannacher_steps = rannacher_steps
+        self.reset()
         return
 
     def step(self, u0, t, dt):
-        # (u{k+1} - u{k}) / dt = F(u{k+1}, t+dt)
-        # u{k+1} - dt * F(u{k}, t+dt) = u{k}
-        b = self.problem.eval_alpha_M_beta_F(1.0, 0.0, u0, t)
-        u1 = self.problem.solve_alpha_M_beta_F(1.0, -dt, b, t+dt)
+        # u{k+1} - theta*dt * F(u{k+1}, t+dt)
+        #     = u{k} + (1-theta)*dt * F(u{k}, t)
+        theta = 1.0 if self.steps_taken < self.rannacher_steps else self.theta
+        self.steps_taken += 1
+        b = self.problem.eval_alpha_M_beta_F(1.0, (1.0-theta)*dt, u0, t)
+        u1 = self.problem.solve_alpha_M_beta_F(1.0, -theta*dt, b, t+dt)
         return u1
 
+    def dense_output(self, u0, u1, t, dt):
+        # The linear interpolant is accurate to O(dt^2), i.e., it retains the
+        # order of the method without additional evaluations of F.
+        return LinearInterpolant(t, u0, t+dt, u1)
+
+    def reset(self):
+        self.steps_taken = 0
+        return
+
+    def get_state(self):
+        return {'steps_taken': self.steps_taken}
+
+    def set_state(self, state):
+        self.steps_taken = int(state['steps_taken'])
+        return
+
 
-class Trapezoidal(object):
+class ImplicitEuler(Theta):
     '''
-    Trapezoidal method for :math:`u' = F(u)`. (Known as Crank-Nicolson if
-    combined with a second-order discretization in time, or used in an ODE
-    context.)
+    Implicit Euler method for :math:`u' = F(u)`, the theta method with
+    `theta=1`.
     '''
-    order = 2.0
+    order = 1.0
+    theta = 1.0
 
     def __init__(self, problem):
-        self.problem = problem
+        super().__init__(problem, theta=1.0)
         return
 
-    def step(self, u0, t, dt):
-        # (u{k+1} - u{k}) / dt = 1/2 * (F(u{k+1}, t+dt) + F(u{k}, t))
-        # u{k+1} - dt/2 * F(u{k+1}, t+dt) = u{k} + dt/2 * F(u{k}, t)
-        b = self.problem.eval_alpha_M_beta_F(1.0, 0.5*dt, u0, t)
-        u1 = self.problem.solve_alpha_M_beta_F(1.0, -0.5*dt, b, t+dt)
-        return u1
+
+class Trapezoidal(Theta):
+    '''
+    Trapezoidal method for :math:`u' = F(u)`, the theta method with
+    `theta=1/2`. (Known as Crank-Nicolson if combined with a second-order
+    discretization in time, or used in an ODE context.)
+    '''
+    order = 2.0
+    theta = 0.5
+
+    def __init__(self, problem, rannacher_steps=0):
+        super().__init__(
+            problem, theta=0.5, rannacher_steps=rannacher_steps
+            )
+        return
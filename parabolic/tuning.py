@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Selection of the cheapest stepper, step size, and solver configuration which
+meets a given accuracy, by timing short calibration runs.
+'''
+import hashlib
+import json
+import os
+from timeit import default_timer as timer
+import uuid
+
+import numpy
+
+from .driver import integrate
+from .time_steppers import Trapezoidal
+from .verification import compute_numerical_order_of_convergence
+
+
+def fingerprint(problem, u0, t0, t_end, **settings):
+    '''
+    Hash identifying a tuning task: the problem is probed by evaluating
+    :math:`M u_0 + F(u_0, t)` at `t0` and `t_end`, so problems with
+    different operators, forcings, or sizes get different keys. `settings`
+    must be JSON-serializable.
+    '''
+    h = hashlib.sha256()
+    h.update(type(problem).__name__.encode())
+    u0 = numpy.asarray(u0, dtype=float)
+    h.update(u0.tobytes())
+    for t in [t0, t_end]:
+        probe = problem.eval_alpha_M_beta_F(1.0, 1.0, u0, t)
+        h.update(numpy.asarray(probe, dtype=float).tobytes())
+    h.update(json.dumps(
+        dict(settings, t0=t0, t_end=t_end), sort_keys=True
+        ).encode())
+    return h.hexdigest()
+
+
+def _load_cache(cache_file):
+    if cache_file is None or not os.path.isfile(cache_file):
+        return {}
+    with open(cache_file, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _store_cache(cache_file, cache):
+    directory = os.path.dirname(os.path.abspath(cache_file))
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    tmp = '{}.{}'.format(cache_file, uuid.uuid4().hex)
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp, cache_file)
+    return
+
+
+class TuningOptions(object):
+    '''
+    What :func:`autotune` chooses from and how: the candidates are the
+    steppers in `methods` (a dict `name -> Method`), the step sizes `Dt`,
+    and the solver configurations `solvers` (a dict `name -> options`;
+    `problem_factory(**options)` creates the problem), and the result must
+    keep the relative error
+
+    .. math::
+        \\|u(t) - u_{ref}(t)\\|_\\infty / \\|u_{ref}(t)\\|_\\infty
+
+    at the end of the run below `target_error`.
+
+    `reference(t)` returns the reference solution; by default, it is
+    computed with `Trapezoidal` and a quarter of the smallest step size.
+    Every candidate is run (on a fresh problem) up to `calibration_time`
+    (default: `t_end`). For shorter calibration runs, error and wall time
+    are extrapolated linearly to `t_end`, which overestimates the error of
+    decaying solutions. If `cache_file` is given, results are stored there.
+    '''
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+            self, target_error, methods, Dt, *,
+            solvers=None,
+            reference=None,
+            calibration_time=None,
+            cache_file=None
+            ):
+        if solvers is None:
+            solvers = {'default': {}}
+        if not methods or not Dt or not solvers:
+            raise ValueError('There are no candidates to choose from.')
+        self.target_error = target_error
+        self.methods = methods
+        self.Dt = sorted(Dt, reverse=True)
+        self.solvers = solvers
+        self.reference = reference
+        self.calibration_time = calibration_time
+        self.cache_file = cache_file
+        return
+
+
+def autotune(problem_factory, u0, t0, t_end, options):
+    '''
+    Returns the cheapest combination of a stepper, a step size, and a solver
+    configuration among the candidates of the :class:`TuningOptions`
+    `options` which meets their target error.
+
+    The result is a dict with the keys `method`, `dt`, `solver`, `error`,
+    `time`, and `orders`, the numerical orders of convergence over `Dt` per
+    `'<method>/<solver>'`. With `options.cache_file`, results are keyed by
+    the :func:`fingerprint` of the task and looked up before tuning. If no
+    candidate meets the target, `ValueError` is raised.
+    '''
+    methods = options.methods
+    Dt = options.Dt
+    solvers = options.solvers
+    target_error = options.target_error
+    calibration_time = options.calibration_time
+    if calibration_time is None:
+        calibration_time = t_end
+    scale = (t_end - t0) / (calibration_time - t0)
+
+    first_solver = sorted(solvers)[0]
+    key = fingerprint(
+        problem_factory(**solvers[first_solver]), u0, t0, t_end,
+        target_error=target_error,
+        methods=sorted(methods),
+        Dt=Dt,
+        solvers={name: repr(solvers[name]) for name in sorted(solvers)},
+        calibration_time=calibration_time
+        )
+    cache = _load_cache(options.cache_file)
+    if key in cache:
+        return cache[key]
+
+    if options.reference is None:
+        problem = problem_factory(**solvers[first_solver])
+        u_ref = u0
+        for _, u_ref in integrate(
+                Trapezoidal(problem), u0, t0, calibration_time, Dt[-1] / 4
+                ):
+            pass
+    else:
+        u_ref = options.reference(calibration_time)
+    norm_ref = numpy.max(abs(u_ref))
+
+    candidates = []
+    orders = {}
+    for method_name in sorted(methods):
+        for solver_name in sorted(solvers):
+            errors = []
+            for dt in Dt:
+                problem = problem_factory(**solvers[solver_name])
+                stepper = methods[method_name](problem)
+                start = timer()
+                u = u0
+                with numpy.errstate(over='ignore', invalid='ignore'):
+                    for _, u in integrate(
+                            stepper, u0, t0, calibration_time, dt
+                            ):
+                        pass
+                    elapsed = timer() - start
+                    error = scale * numpy.max(abs(u - u_ref)) / norm_ref
+                # unstable runs may end up with inf or nan
+                if not numpy.isfinite(error):
+                    error = numpy.inf
+                errors.append(error)
+                candidates.append({
+                    'method': method_name,
+                    'dt': dt,
+                    'solver': solver_name,
+                    'error': error,
+                    'time': scale * elapsed,
+                    })
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                orders['{}/{}'.format(method_name, solver_name)] = \
+                    compute_numerical_order_of_convergence(
+                        Dt, numpy.array(errors)
+                        ).tolist()
+
+    feasible = [c for c in candidates if c['error'] <= target_error]
+    if not feasible:
+        raise ValueError(
+            'No candidate reaches the target error {:e} (best: {:e}).'.format(
+                target_error, min(c['error'] for c in candidates)
+                ))
+    best = min(feasible, key=lambda c: c['time'])
+    best['orders'] = orders
+
+    if options.cache_file is not None:
+        # Reread in case another process has added entries meanwhile.
+        cache = _load_cache(options.cache_file)
+        cache[key] = best
+        _store_cache(options.cache_file, cache)
+    return best
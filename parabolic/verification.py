@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Verification of the temporal order of convergence of time steppers.
+'''
+import multiprocessing
+
+import numpy
+
+from .driver import integrate
+
+
+def compute_numerical_order_of_convergence(Dt, errors):
+    return numpy.array([
+        # pylint: disable=no-member
+        numpy.log(errors[k] / errors[k+1]) / numpy.log(Dt[k] / Dt[k+1])
+        for k in range(len(Dt)-1)
+        ])
+
+
+class _Sweep(object):
+    '''
+    Computes the error for one `(mesh_size, dt)` pair. The setups returned by
+    the problem factory (operators, initial states, reference solutions)
+    are cached per mesh size, so they are created at most once per process.
+    '''
+    def __init__(self, problem_factory, Method, t_end):
+        self.problem_factory = problem_factory
+        self.Method = Method
+        self.t_end = t_end
+        self._setups = {}
+        return
+
+    def __call__(self, task):
+        k, mesh_size, j, dt = task
+        if mesh_size not in self._setups:
+            self._setups[mesh_size] = self.problem_factory(mesh_size)
+        problem, u0, error = self._setups[mesh_size]
+
+        stepper = self.Method(problem)
+        if self.t_end is None:
+            t = dt
+            u = stepper.step(u0, 0.0, dt)
+        else:
+            t, u = 0.0, u0
+            for t, u in integrate(stepper, u0, 0.0, self.t_end, dt):
+                pass
+        return k, j, error(u, t)
+
+
+# The sweep of the worker process, set by the pool initializer.
+_worker_sweep = None
+
+
+def _init_worker(problem_factory, Method, t_end):
+    # pylint: disable=global-statement
+    global _worker_sweep
+    _worker_sweep = _Sweep(problem_factory, Method, t_end)
+    return
+
+
+def _run_worker(task):
+    return _worker_sweep(task)
+
+
+# pylint: disable-next=too-many-arguments
+def compute_time_errors(
+        problem_factory, Method, mesh_sizes, Dt, *, t_end=None, processes=None
+        ):
+    '''
+    Errors of `Method` for all combinations of `mesh_sizes` and time steps
+    `Dt`, as an array of shape `(len(mesh_sizes), len(Dt))`.
+
+    `problem_factory(mesh_size)` must return a tuple `(problem, u0, error)`,
+    where `error(u, t)` is the norm of the error of the approximation `u` at
+    time `t`. If `t_end` is `None`, a single step of size `dt` is taken from
+    `t=0`; otherwise, the solution is integrated up to `t_end`.
+
+    The pairs are distributed across a pool of `processes` worker processes
+    (default: number of CPUs). Each worker calls the factory at most once
+    per mesh size. With `processes=1`, everything runs in the current
+    process and the factory does not need to be picklable. Note that the
+    workers are forked on POSIX systems, so libraries which do not survive a
+    fork (e.g., MPI) require `processes=1`.
+    '''
+    if t_end is not None and t_end <= 0.0:
+        raise ValueError('t_end must be positive (got {}).'.format(t_end))
+
+    tasks = [
+        (k, mesh_size, j, dt)
+        for k, mesh_size in enumerate(mesh_sizes)
+        for j, dt in enumerate(Dt)
+        ]
+
+    if processes == 1:
+        sweep = _Sweep(problem_factory, Method, t_end)
+        results = [sweep(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(
+                processes,
+                initializer=_init_worker,
+                initargs=(problem_factory, Method, t_end)
+                ) as pool:
+            # Consecutive tasks share the mesh size; handing them out in
+            # chunks lets the workers reuse their setups.
+            chunksize = max(1, len(Dt) // 2)
+            results = pool.map(_run_worker, tasks, chunksize=chunksize)
+
+    errors = numpy.empty((len(mesh_sizes), len(Dt)))
+    for k, j, err in results:
+        errors[k][j] = err
+    return errors
+
+
+# pylint: disable-next=too-many-arguments
+def verify_temporal_order(
+        problem_factory, Method, mesh_sizes, Dt, *, t_end=None, processes=None
+        ):
+    '''
+    Computes the errors with :func:`compute_time_errors` and returns them
+    together with the table of numerical orders of convergence, one row per
+    mesh size.
+
+    For single steps (`t_end=None`), the local errors are divided by `dt`
+    first since the error bounds are of the form
+
+    .. math::
+        \\|E\\| < C t_n (C_1 dt^k + C_2 h^l).
+    '''
+    errors = compute_time_errors(
+        problem_factory, Method, mesh_sizes, Dt,
+        t_end=t_end, processes=processes
+        )
+    if t_end is None:
+        errors /= Dt
+    orders = compute_numerical_order_of_convergence(Dt, errors.T).T
+    return errors, orders
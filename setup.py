@@ -42,6 +42,7 @@ setup(
         'matplotlib',
         'numpy',
         'pipdate',
+        'scipy',
         ],
     classifiers=[
         about['__status__'],
@@ -49,7 +50,6 @@ setup(
         'Intended Audience :: Science/Research',
         'Operating System :: OS Independent',
         'Programming Language :: Python',
-        'Programming Language :: Python :: 2',
         'Programming Language :: Python :: 3',
         'Topic :: Scientific/Engineering :: Mathematics'
         ],
@@ -16,6 +16,8 @@ import matplotlib.pyplot as plt
 import numpy
 import sympy
 
+from parabolic import compute_numerical_order_of_convergence
+
 
 def _truncate_degree(degree, max_degree=10):
     if degree > max_degree:
@@ -86,14 +88,6 @@ def show_timeorder_info(Dt, mesh_sizes, errors):
     return
 
 
-def compute_numerical_order_of_convergence(Dt, errors):
-    return numpy.array([
-        # pylint: disable=no-member
-        numpy.log(errors[k] / errors[k+1]) / numpy.log(Dt[k] / Dt[k+1])
-        for k in range(len(Dt)-1)
-        ])
-
-
 def _assert_time_order(problem, MethodClass):
     mesh_sizes = [8, 16, 32]
     Dt = [0.5**k for k in range(2)]
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+import numpy
+
+import parabolic
+from parabolic.numpy_backend import Heat
+
+
+def _source(x, t):
+    # a heat source moving from left to right
+    r2 = (x[:, 0] - 0.2 - 0.6*t)**2 + (x[:, 1] - 0.5)**2
+    return 100.0 * numpy.exp(-r2 / 0.05**2)
+
+
+def _run(stepper, u0, t_end, dt):
+    u = u0
+    for _, u in parabolic.integrate(stepper, u0, 0.0, t_end, dt):
+        pass
+    return u
+
+
+def test_moving_source():
+    n = 40
+    u0 = numpy.zeros(n**2)
+    for theta in [1.0, 0.5]:
+        stepper = parabolic.ActiveSet(
+            Heat(n, dim=2, kappa=1.0e-3, f=_source), theta=theta
+            )
+        u = _run(stepper, u0, 0.5, 1.0e-2)
+        v = _run(
+            parabolic.Theta(Heat(n, dim=2, kappa=1.0e-3, f=_source), theta),
+            u0, 0.5, 1.0e-2
+            )
+        assert numpy.max(abs(u - v)) < 1.0e-4 * numpy.max(abs(v))
+        assert stepper.num_restricted_steps > stepper.num_full_steps
+        assert len(stepper.active) < 0.5 * n**2
+        # The set follows the source.
+        x = stepper.problem.points[stepper.active]
+        assert numpy.any(abs(x[:, 0] - 0.5) < 0.05)
+    return
+
+
+def test_growing_set():
+    # A bump spreads; without full steps, the set has to grow by itself.
+    n = 200
+    problem = Heat(n, kappa=1.0e-2)
+    u0 = numpy.exp(-(problem.points[:, 0] - 0.5)**2 / 0.02**2)
+    stepper = parabolic.ActiveSet(problem, check_every=1000)
+    stepper.step(u0, 0.0, 1.0e-3)
+    size0 = len(stepper.active)
+    u = _run(stepper, u0, 0.2, 1.0e-3)
+    assert stepper.num_full_steps == 1
+    assert len(stepper.active) > size0
+    v = _run(parabolic.ImplicitEuler(Heat(n, kappa=1.0e-2)), u0, 0.2, 1.0e-3)
+    assert numpy.max(abs(u - v)) < 1.0e-4 * numpy.max(abs(v))
+    return
+
+
+def test_explicit():
+    n = 50
+    problem = Heat(n, kappa=1.0e-2)
+    u0 = numpy.exp(-(problem.points[:, 0] - 0.5)**2 / 0.05**2)
+    dt = 1.0e-3
+    u = _run(parabolic.ActiveSet(problem, theta=0.0), u0, 0.1, dt)
+    v = _run(parabolic.ExplicitEuler(Heat(n, kappa=1.0e-2)), u0, 0.1, dt)
+    assert numpy.max(abs(u - v)) < 1.0e-4 * numpy.max(abs(v))
+    return
+
+
+def test_state():
+    n = 40
+    problem = Heat(n, dim=2, kappa=1.0e-3, f=_source)
+    u0 = numpy.zeros(n**2)
+    stepper = parabolic.ActiveSet(problem)
+    u = _run(stepper, u0, 0.05, 1.0e-2)
+    other = parabolic.ActiveSet(problem)
+    other.set_state(stepper.get_state())
+    numpy.testing.assert_array_equal(other.active, stepper.active)
+    numpy.testing.assert_array_equal(
+        other.step(u, 0.05, 1.0e-2), stepper.step(u, 0.05, 1.0e-2)
+        )
+    return
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+#
+import numpy
+import pytest
+
+import parabolic
+from parabolic.numpy_backend import Heat
+
+
+def _forward_cost(num_steps, num_checkpoints):
+    # Minimal number of forward steps by brute-force dynamic programming
+    cost = {}
+    for s in range(num_checkpoints+1):
+        for l in range(1, num_steps+1):
+            if l == 1:
+                cost[l, s] = 1
+            elif s == 0:
+                cost[l, s] = l * (l+1) // 2
+            else:
+                cost[l, s] = min(
+                    m + cost[l-m, s-1] + cost[m, s] for m in range(1, l)
+                    )
+    return cost[num_steps, num_checkpoints]
+
+
+@pytest.mark.parametrize('num_steps', [1, 2, 7, 20, 57])
+@pytest.mark.parametrize('num_checkpoints', [0, 1, 2, 3, 5])
+def test_revolve(num_steps, num_checkpoints):
+    visited = []
+
+    def forward(n, u):
+        assert u == n
+        return n+1
+
+    def backward(n, u_n, u_n1):
+        assert (u_n, u_n1) == (n, n+1)
+        visited.append(n)
+
+    count = parabolic.revolve(forward, backward, 0, num_steps, num_checkpoints)
+    assert visited == list(reversed(range(num_steps)))
+    assert count == _forward_cost(num_steps, num_checkpoints)
+    return
+
+
+# steps of the gradient tests
+NUM_STEPS = 25
+DT = 1.0e-4
+
+
+def _objective(Method, kappa, u0, target):
+    problem = Heat(20, kappa=kappa, f=lambda x, t: numpy.sin(t) * x[:, 0])
+    stepper = Method(problem)
+    u = u0
+    for n in range(NUM_STEPS):
+        u = stepper.step(u, n*DT, DT)
+    return 0.5 * numpy.dot(u - target, u - target)
+
+
+@pytest.mark.parametrize('Method', [
+    parabolic.ExplicitEuler,
+    parabolic.ImplicitEuler,
+    parabolic.Trapezoidal,
+    ])
+@pytest.mark.parametrize('num_checkpoints', [0, 3, None])
+def test_gradient(Method, num_checkpoints):
+    kappa = 0.7
+    problem = Heat(20, kappa=kappa, f=lambda x, t: numpy.sin(t) * x[:, 0])
+    x = problem.points[:, 0]
+    u0 = numpy.sin(numpy.pi * x) + x
+    target = 0.5 * numpy.sin(numpy.pi * x)
+
+    def dF_dp(u, t):  # pylint: disable=unused-argument
+        # F = -kappa K u + f
+        return (problem.A.dot(u) / kappa)[:, None]
+
+    grad_u0, grad_kappa = parabolic.adjoint_gradient(
+        Method(problem), u0, 0.0, DT, NUM_STEPS,
+        dJdu=lambda u: u - target,
+        dF_dp=dF_dp,
+        num_checkpoints=num_checkpoints
+        )
+
+    # compare with finite differences
+    eps = 1.0e-6
+    fd = (
+        _objective(Method, kappa+eps, u0, target)
+        - _objective(Method, kappa-eps, u0, target)
+        ) / (2*eps)
+    assert abs(grad_kappa[0] - fd) < 1.0e-6 * abs(fd)
+
+    v = numpy.cos(3 * x)
+    fd = (
+        _objective(Method, kappa, u0 + eps*v, target)
+        - _objective(Method, kappa, u0 - eps*v, target)
+        ) / (2*eps)
+    assert abs(numpy.dot(grad_u0, v) - fd) < 1.0e-6 * abs(fd)
+    return
+
+
+def test_rannacher_gradient():
+    # The implicit Euler steps at the start are reversed as such, also when
+    # the checkpointing recomputes them out of order.
+    problem = Heat(20, f=lambda x, t: numpy.sin(t) * x[:, 0])
+    x = problem.points[:, 0]
+    u0 = (abs(x - 0.5) < 0.25).astype(float)
+    target = numpy.zeros(20)
+
+    def method(problem):
+        return parabolic.Trapezoidal(problem, rannacher_steps=2)
+
+    # The steps the stepper took before don't matter.
+    stepper = method(problem)
+    stepper.step(u0, 0.0, DT)
+    grad_u0, _ = parabolic.adjoint_gradient(
+        stepper, u0, 0.0, DT, NUM_STEPS,
+        dJdu=lambda u: u - target, num_checkpoints=2
+        )
+    v = numpy.cos(3 * x)
+    eps = 1.0e-6
+    fd = (
+        _objective(method, 1.0, u0 + eps*v, target)
+        - _objective(method, 1.0, u0 - eps*v, target)
+        ) / (2*eps)
+    assert abs(numpy.dot(grad_u0, v) - fd) < 1.0e-6 * abs(fd)
+    return
+
+
+def test_no_steps():
+    problem = Heat(10)
+    u0 = numpy.linspace(0.0, 1.0, 10)
+
+    def dF_dp(u, t):  # pylint: disable=unused-argument
+        return numpy.ones((len(u), 3))
+
+    grad_u0, grad_p = parabolic.adjoint_gradient(
+        parabolic.Trapezoidal(problem), u0, 0.0, 0.01, 0,
+        dJdu=lambda u: 2.0 * u, dF_dp=dF_dp
+        )
+    assert numpy.array_equal(grad_u0, 2.0 * u0)
+    assert numpy.array_equal(grad_p, numpy.zeros(3))
+
+    with pytest.raises(ValueError):
+        parabolic.adjoint_gradient(
+            parabolic.Trapezoidal(problem), u0, 0.0, 0.01, -1,
+            dJdu=lambda u: u
+            )
+    return
+
+
+def test_memory_budget():
+    problem = Heat(10)
+    u0 = numpy.ones(10)
+    grad0, _ = parabolic.adjoint_gradient(
+        parabolic.Trapezoidal(problem), u0, 0.0, 0.01, 30, dJdu=lambda u: u
+        )
+    grad1, _ = parabolic.adjoint_gradient(
+        parabolic.Trapezoidal(problem), u0, 0.0, 0.01, 30, dJdu=lambda u: u,
+        memory=2 * u0.nbytes
+        )
+    assert numpy.allclose(grad0, grad1, rtol=1.0e-14, atol=0.0)
+    return
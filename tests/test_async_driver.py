@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+import numpy
+import pytest
+
+import parabolic
+from parabolic.numpy_backend import Heat
+
+
+def _simulation(n=20):
+    problem = Heat(n)
+    u0 = numpy.sin(numpy.pi * problem.points[:, 0])
+    return parabolic.ImplicitEuler(problem), u0
+
+
+def test_same_as_sync():
+    stepper, u0 = _simulation()
+    ref = list(parabolic.integrate(stepper, u0, 0.0, 0.1, 0.01))
+
+    async def run():
+        return [
+            item async for item in
+            parabolic.integrate_async(stepper, u0, 0.0, 0.1, 0.01)
+            ]
+
+    out = asyncio.run(run())
+    assert [t for t, _ in out] == [t for t, _ in ref]
+    for (_, u), (_, v) in zip(out, ref):
+        assert numpy.array_equal(u, v)
+    return
+
+
+def test_fair_interleaving():
+    order = []
+
+    async def simulate(k, executor):
+        stepper, u0 = _simulation()
+        async for _ in parabolic.integrate_async(
+                stepper, u0, 0.0, 0.05, 0.01, executor=executor
+                ):
+            order.append(k)
+
+    async def run():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            await asyncio.gather(*[simulate(k, executor) for k in range(3)])
+
+    asyncio.run(run())
+    # Every simulation gets one step per round.
+    assert order == 5 * [0, 1, 2]
+    return
+
+
+class Slow(parabolic.ImplicitEuler):
+    def step(self, u0, t, dt):
+        time.sleep(0.05)
+        return super().step(u0, t, dt)
+
+
+def test_deadline():
+    _, u0 = _simulation()
+    stepper = Slow(Heat(20))
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        count = 0
+        async for _ in parabolic.integrate_async(
+                stepper, u0, 0.0, 1.0, 0.01, deadline=loop.time() + 0.12
+                ):
+            count += 1
+        return count
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
+    return
+
+
+def test_cancel():
+    _, u0 = _simulation()
+    stepper = Slow(Heat(20))
+    steps = []
+
+    async def simulate():
+        async for t, _ in parabolic.integrate_async(stepper, u0, 0.0, 1.0, 0.01):
+            steps.append(t)
+
+    async def run():
+        task = asyncio.ensure_future(simulate())
+        await asyncio.sleep(0.12)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The event loop was responsive all the time.
+        return len(steps)
+
+    num_steps = asyncio.run(run())
+    assert 0 < num_steps < 100
+    return
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+#
+import numpy
+import pytest
+
+import parabolic
+from parabolic.numpy_backend import Heat
+
+
+class Counting(parabolic.ImplicitEuler):
+    '''
+    Stepper with internal state.
+    '''
+    def __init__(self, problem):
+        super().__init__(problem)
+        self.num_steps = 0
+        self.history = numpy.zeros(3)
+        return
+
+    def step(self, u0, t, dt):
+        self.num_steps += 1
+        self.history[:] = u0[:3]
+        return super().step(u0, t, dt)
+
+    def get_state(self):
+        return {'num_steps': self.num_steps, 'history': self.history}
+
+    def set_state(self, state):
+        self.num_steps = state['num_steps']
+        self.history[:] = state['history']
+        return
+
+
+def _initial_state(problem):
+    return numpy.sin(numpy.pi * problem.points[:, 0])
+
+
+def test_roundtrip(tmp_path):
+    directory = str(tmp_path / 'checkpoint')
+    problem = Heat(10)
+    stepper = Counting(problem)
+    u = _initial_state(problem)
+    for _ in range(3):
+        u = stepper.step(u, 0.0, 0.1)
+    parabolic.save_checkpoint(directory, stepper, u, 0.3, 0.1, step=3, a=1)
+    # Overwrite; the files of the previous checkpoint are gone afterwards.
+    parabolic.save_checkpoint(directory, stepper, u, 0.3, 0.1, step=3, a=2)
+    assert len(list(tmp_path.glob('checkpoint/*.npy'))) == 2
+    # Other files in the directory are left alone.
+    numpy.save(str(tmp_path / 'checkpoint' / 'mesh.npy'), numpy.zeros(3))
+    parabolic.save_checkpoint(directory, stepper, u, 0.3, 0.1, step=3, a=2)
+    assert len(list(tmp_path.glob('checkpoint/*.npy'))) == 3
+
+    other = Counting(problem)
+    data = parabolic.load_checkpoint(directory, other)
+    assert numpy.array_equal(data['u'], u)
+    assert data['t'] == 0.3
+    assert data['dt'] == 0.1
+    assert data['step'] == 3
+    assert data['extra'] == {'a': 2}
+    assert other.num_steps == 3
+    assert numpy.array_equal(other.history, stepper.history)
+
+    with pytest.raises(ValueError):
+        parabolic.load_checkpoint(directory, parabolic.Trapezoidal(problem))
+    return
+
+
+def test_resume_integrate(tmp_path):
+    directory = str(tmp_path / 'checkpoint')
+    problem = Heat(10, f=lambda x, t: numpy.sin(t) * x[:, 0])
+    u0 = _initial_state(problem)
+    dt = 0.013
+
+    u_ref = u0
+    for _, u_ref in parabolic.integrate(
+            parabolic.Trapezoidal(problem), u0, 0.0, 1.0, dt
+            ):
+        pass
+
+    stepper = parabolic.Trapezoidal(problem)
+    for k, (t, u) in enumerate(parabolic.integrate(stepper, u0, 0.0, 1.0, dt)):
+        if k == 30:
+            parabolic.save_checkpoint(directory, stepper, u, t, dt)
+            break
+
+    stepper = parabolic.Trapezoidal(problem)
+    data = parabolic.load_checkpoint(directory, stepper)
+    for _, u in parabolic.integrate(
+            stepper, data['u'], data['t'], 1.0, data['dt']
+            ):
+        pass
+    assert numpy.array_equal(u, u_ref)
+    return
+
+
+@pytest.mark.parametrize('output_times', [None, numpy.linspace(0.0, 1.0, 31)])
+def test_integrate_checkpoints(tmp_path, output_times):
+    directory = str(tmp_path / 'checkpoint')
+    problem = Heat(10, f=lambda x, t: numpy.sin(t) * x[:, 0])
+    u0 = _initial_state(problem)
+
+    def run(num_outputs=None):
+        stepper = parabolic.Trapezoidal(problem, rannacher_steps=2)
+        steps = parabolic.integrate(
+            stepper, u0, 0.0, 1.0, 0.013, output_times,
+            checkpoint_dir=directory, checkpoint_every=10
+            )
+        return [step for _, step in zip(range(num_outputs or 1000), steps)]
+
+    expected = list(parabolic.integrate(
+        parabolic.Trapezoidal(problem, rannacher_steps=2), u0, 0.0, 1.0,
+        0.013, output_times
+        ))
+    # Interrupted after the checkpoint at step 20, i.e., t = 0.26
+    run(25 if output_times is None else 10)
+    assert len(list(tmp_path.glob('checkpoint/*.npy'))) == 1
+    # The resumed run continues from there.
+    resumed = run()
+    assert len(expected) - len(resumed) == (20 if output_times is None else 8)
+    for (t, u), (s, v) in zip(expected[-len(resumed):], resumed):
+        assert t == s
+        assert numpy.array_equal(u, v)
+
+    # The checkpoint is not resumed by a run from another initial state.
+    with pytest.raises(ValueError):
+        next(parabolic.integrate(
+            parabolic.Trapezoidal(problem), u0 + 1.0, 0.0, 1.0, 0.013,
+            checkpoint_dir=directory
+            ))
+    return
+
+
+def test_resume_steady_state(tmp_path):
+    directory = str(tmp_path / 'checkpoint')
+    problem = Heat(10, f=lambda x, t: numpy.ones(len(x)))
+    u0 = numpy.zeros(10)
+    kwargs = {'tol': 1.0e-10, 'dt_growth': 1.1, 'dt_max': 10.0}
+
+    stepper = Counting(problem)
+    t_ref, u_ref = parabolic.integrate_to_steady_state(
+        stepper, u0, 0.0, 1.0e-3, **kwargs
+        )
+    num_steps = stepper.num_steps
+
+    # Interrupted run
+    stepper = Counting(problem)
+    with pytest.warns(UserWarning):
+        parabolic.integrate_to_steady_state(
+            stepper, u0, 0.0, 1.0e-3, max_steps=25,
+            checkpoint_dir=directory, checkpoint_every=10, **kwargs
+            )
+
+    # Restart
+    stepper = Counting(problem)
+    t, u = parabolic.integrate_to_steady_state(
+        stepper, u0, 0.0, 1.0e-3,
+        checkpoint_dir=directory, checkpoint_every=10, **kwargs
+        )
+    assert t == t_ref
+    assert numpy.array_equal(u, u_ref)
+    assert stepper.num_steps == num_steps
+
+    # The checkpoint is not resumed by a run from another initial state.
+    with pytest.raises(ValueError):
+        parabolic.integrate_to_steady_state(
+            Counting(problem), u0 + 1.0, 0.0, 1.0e-3,
+            checkpoint_dir=directory, checkpoint_every=10, **kwargs
+            )
+    return
+
+
+def test_rannacher_state(tmp_path):
+    directory = str(tmp_path / 'checkpoint')
+    problem = Heat(10)
+    stepper = parabolic.Trapezoidal(problem, rannacher_steps=2)
+    u = stepper.step(_initial_state(problem), 0.0, 0.1)
+    parabolic.save_checkpoint(directory, stepper, u, 0.1, 0.1, step=1)
+
+    restored = parabolic.Trapezoidal(problem, rannacher_steps=2)
+    parabolic.load_checkpoint(directory, restored)
+    assert restored.steps_taken == 1
+    # The second step is still an implicit Euler step.
+    expected = parabolic.ImplicitEuler(problem).step(u, 0.1, 0.1)
+    assert numpy.array_equal(restored.step(u, 0.1, 0.1), expected)
+    assert numpy.array_equal(stepper.step(u, 0.1, 0.1), expected)
+    return
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+#
+import numpy
+import pytest
+
+import parabolic
+
+
+class Heat(object):
+    '''
+    u' = \\Delta u + f  on (0, 1) with finite differences and homogeneous
+    Dirichlet conditions. For f=0, exp(-pi^2 t) sin(pi x) is a solution.
+    '''
+    def __init__(self, n, f=0.0):
+        h = 1.0 / (n+1)
+        self.x = numpy.linspace(h, 1.0-h, n)
+        self.A = (
+            numpy.diag(-2.0 * numpy.ones(n))
+            + numpy.diag(numpy.ones(n-1), 1)
+            + numpy.diag(numpy.ones(n-1), -1)
+            ) / h**2
+        self.M = numpy.eye(n)
+        self.f = f
+        return
+
+    # pylint: disable=unused-argument
+    def eval_alpha_M_beta_F(self, alpha, beta, u, t):
+        # Evaluate  alpha * M * u + beta * F(u, t).
+        return (
+            alpha * numpy.dot(self.M, u)
+            + beta * (numpy.dot(self.A, u) + self.f)
+            )
+
+    def solve_alpha_M_beta_F(self, alpha, beta, b, t):
+        # Solve  alpha * M * u + beta * F(u, t) = b  for u.
+        return numpy.linalg.solve(
+            alpha * self.M + beta * self.A, b - beta * self.f
+            )
+
+
+def test_integrate_hits_end():
+    problem = Heat(10)
+    stepper = parabolic.ImplicitEuler(problem)
+    u0 = numpy.sin(numpy.pi * problem.x)
+    out = list(parabolic.integrate(stepper, u0, 0.0, 0.25, 0.1))
+    assert [t for t, _ in out] == [0.1, 0.2, 0.25]
+    return
+
+
+def test_integrate_last_step_round_off():
+    # 0.1 + 0.1 + 0.1 > 0.3 in floating point; the last step must still be
+    # exactly dt, not dt minus round-off, so no new factorization is needed.
+    class Recording(parabolic.ImplicitEuler):
+        step_sizes = []
+
+        def step(self, u0, t, dt):
+            self.step_sizes.append(dt)
+            return super().step(u0, t, dt)
+
+    problem = Heat(10)
+    stepper = Recording(problem)
+    u0 = numpy.sin(numpy.pi * problem.x)
+    out = list(parabolic.integrate(stepper, u0, 0.0, 0.3, 0.1))
+    assert stepper.step_sizes == [0.1, 0.1, 0.1]
+    assert out[-1][0] == 0.3
+    return
+
+
+@pytest.mark.parametrize('method', [
+    parabolic.ExplicitEuler,
+    parabolic.ImplicitEuler,
+    parabolic.Trapezoidal,
+    ])
+def test_dense_output_endpoints(method):
+    problem = Heat(10)
+    stepper = method(problem)
+    u0 = numpy.sin(numpy.pi * problem.x)
+    dt = 1.0e-3
+    u1 = stepper.step(u0, 0.0, dt)
+    interpolant = stepper.dense_output(u0, u1, 0.0, dt)
+    assert numpy.allclose(interpolant(0.0), u0)
+    assert numpy.allclose(interpolant(dt), u1)
+    return
+
+
+def test_dense_output_order():
+    # Trapezoidal with linear dense output is second-order at off-grid times.
+    problem = Heat(50)
+    stepper = parabolic.Trapezoidal(problem)
+    u0 = numpy.sin(numpy.pi * problem.x)
+    # Use the semi-discrete eigenvalue to exclude the spatial error.
+    lmbda = 4.0 * (51.0)**2 * numpy.sin(0.5 * numpy.pi / 51.0)**2
+    t_out = numpy.linspace(0.0, 0.05, 101)
+
+    errors = []
+    Dt = [1.0e-2, 0.5e-2]
+    for dt in Dt:
+        out = parabolic.integrate(
+            stepper, u0, 0.0, 0.05, dt, output_times=t_out
+            )
+        errors.append(max(
+            numpy.max(abs(u - numpy.exp(-lmbda * t) * u0)) for t, u in out
+            ))
+
+    order = numpy.log(errors[0] / errors[1]) / numpy.log(Dt[0] / Dt[1])
+    assert order > 1.9
+    return
+
+
+def test_output_times_out_of_range():
+    problem = Heat(10)
+    stepper = parabolic.ImplicitEuler(problem)
+    u0 = numpy.sin(numpy.pi * problem.x)
+    with pytest.raises(ValueError):
+        list(parabolic.integrate(
+            stepper, u0, 0.0, 1.0, 0.1, output_times=[0.5, 2.0]
+            ))
+    return
+
+
+def test_steady_state():
+    problem = Heat(20, f=1.0)
+    # -u'' = 1  =>  u = x (1 - x) / 2; exact for finite differences, too
+    u_exact = 0.5 * problem.x * (1.0 - problem.x)
+    u0 = numpy.zeros(20)
+
+    class Counting(parabolic.ImplicitEuler):
+        num_steps = 0
+
+        def step(self, u0, t, dt):
+            self.num_steps += 1
+            return super().step(u0, t, dt)
+
+    stepper0 = Counting(problem)
+    _, u = parabolic.integrate_to_steady_state(
+        stepper0, u0, 0.0, 1.0e-2, tol=1.0e-8
+        )
+    assert numpy.max(abs(u - u_exact)) < 1.0e-8
+
+    # Growing the step size gets there with far fewer steps.
+    stepper1 = Counting(problem)
+    _, u = parabolic.integrate_to_steady_state(
+        stepper1, u0, 0.0, 1.0e-2, tol=1.0e-8, dt_growth=2.0, dt_max=1.0e3
+        )
+    assert numpy.max(abs(u - u_exact)) < 1.0e-8
+    assert 5 * stepper1.num_steps < stepper0.num_steps
+    return
+
+
+def test_steady_state_solve():
+    problem = Heat(20, f=1.0)
+    u_exact = 0.5 * problem.x * (1.0 - problem.x)
+    stepper = parabolic.ImplicitEuler(problem)
+    _, u = parabolic.integrate_to_steady_state(
+        stepper, numpy.zeros(20), 0.0, 1.0e-2, steady_solve_tol=1.0e-1
+        )
+    assert numpy.max(abs(u - u_exact)) < 1.0e-12
+    return
+
+
+def test_steady_state_not_reached():
+    problem = Heat(20, f=1.0)
+    stepper = parabolic.ImplicitEuler(problem)
+    with pytest.warns(UserWarning):
+        parabolic.integrate_to_steady_state(
+            stepper, numpy.zeros(20), 0.0, 1.0e-4, max_steps=5
+            )
+    # No step at all
+    with pytest.warns(UserWarning):
+        t, u = parabolic.integrate_to_steady_state(
+            stepper, numpy.zeros(20), 0.0, 1.0e-4, max_steps=0
+            )
+    assert t == 0.0
+    assert numpy.array_equal(u, numpy.zeros(20))
+    return
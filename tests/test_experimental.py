@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+#
+import os
+import sys
+
+import numpy
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                    '..', 'experimental')
+    )
+# pylint: disable=import-error,wrong-import-position
+from time_steppers import Heun  # noqa: E402
+
+
+class MassProblem(object):
+    '''
+    M u' = A u  with a (dense) mass matrix M other than the identity.
+    '''
+    def __init__(self, n):
+        h = 1.0 / (n+1)
+        self.M = h / 6 * (
+            numpy.eye(n, k=-1) + 4.0 * numpy.eye(n) + numpy.eye(n, k=1)
+            )
+        self.A = -(
+            2.0 * numpy.eye(n) - numpy.eye(n, k=-1) - numpy.eye(n, k=1)
+            ) / h
+        return
+
+    # pylint: disable=unused-argument
+    def eval_alpha_M_beta_F(self, alpha, beta, u, t):
+        return alpha * numpy.dot(self.M, u) + beta * numpy.dot(self.A, u)
+
+    def solve_alpha_M_beta_F(self, alpha, beta, b, t):
+        return numpy.linalg.solve(alpha * self.M + beta * self.A, b)
+
+
+def test_heun_mass_matrix():
+    problem = MassProblem(10)
+    u0 = numpy.sin(numpy.pi * numpy.linspace(0.0, 1.0, 12)[1:-1])
+    dt = 1.0e-3
+
+    # Heun's method for  u' = M^{-1} A u
+    def f(u):
+        return numpy.linalg.solve(problem.M, numpy.dot(problem.A, u))
+
+    k1 = f(u0)
+    k2 = f(u0 + dt * k1)
+    expected = u0 + 0.5 * dt * (k1 + k2)
+
+    u1 = Heun(problem).step(u0, 0.0, dt)
+    assert numpy.allclose(u1, expected, rtol=1.0e-12, atol=0.0)
+    return
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+#
+import numpy
+import scipy.sparse
+
+import parabolic
+from parabolic.numpy_backend import LinearProblem
+
+
+def test_cache():
+    calls = []
+
+    def assemble(t):
+        calls.append(t)
+        return numpy.full(3, t)
+
+    f = parabolic.ForcingCache(assemble, size=2)
+    assert numpy.all(f(0.0) == 0.0)
+    assert numpy.all(f(0.0) == 0.0)
+    f(1.0)
+    f(0.0)
+    f(2.0)
+    # 1.0 was the least recently used one
+    f(1.0)
+    assert calls == [0.0, 1.0, 2.0, 1.0]
+    assert f.hits == 2
+    assert f.misses == 4
+    return
+
+
+def test_affine():
+    b = [numpy.random.rand(5) for _ in range(3)]
+    g = [numpy.sin, numpy.cos, numpy.exp]
+    f = parabolic.AffineForcing(g, b)
+    t = 0.7
+    assert numpy.allclose(f(t), sum(gk(t) * bk for gk, bk in zip(g, b)))
+    # The precomputed vectors are not touched.
+    assert numpy.allclose(f(t), sum(gk(t) * bk for gk, bk in zip(g, b)))
+    return
+
+
+def test_trapezoidal_assembles_once_per_time():
+    calls = []
+
+    def f(t):
+        calls.append(t)
+        return numpy.ones(4)
+
+    n = 4
+    problem = LinearProblem(
+        scipy.sparse.identity(n), -scipy.sparse.identity(n), f
+        )
+    stepper = parabolic.Trapezoidal(problem)
+    for _ in parabolic.integrate(stepper, numpy.zeros(n), 0.0, 1.0, 0.25):
+        pass
+    assert calls == [0.0, 0.25, 0.5, 0.75, 1.0]
+    return
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+#
+import subprocess
+import sys
+
+import pytest
+
+import parabolic
+
+# Budget for `import parabolic` in seconds, excluding the interpreter
+# startup.
+BUDGET = 0.05
+
+
+def _run(code):
+    return subprocess.check_output(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        stderr=subprocess.STDOUT
+        ).decode()
+
+
+def test_import_time():
+    # The -X importtime lines read
+    #   import time: <self us> | <cumulative us> | <module>
+    output = _run('import parabolic')
+    cumulative = [
+        int(line.split('|')[1])
+        for line in output.splitlines()
+        if line.split('|')[-1].strip() == 'parabolic'
+        ]
+    assert len(cumulative) == 1
+    assert cumulative[0] * 1.0e-6 < BUDGET
+    return
+
+
+def test_no_heavy_imports():
+    output = _run(
+        'import sys, parabolic; '
+        'print(sorted(m for m in ["numpy", "scipy", "pipdate", "asyncio", '
+        '"multiprocessing"] if m in sys.modules))'
+        )
+    assert output.splitlines()[-1] == '[]'
+    return
+
+
+def test_lazy_attributes():
+    for name in parabolic.__all__:
+        assert getattr(parabolic, name) is not None
+        assert name in dir(parabolic)
+    assert parabolic.Trapezoidal is parabolic.time_steppers.Trapezoidal
+    assert parabolic.numpy_backend.Heat is not None
+    with pytest.raises(AttributeError):
+        parabolic.does_not_exist  # pylint: disable=pointless-statement
+    return
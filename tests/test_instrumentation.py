@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+#
+import json
+
+import numpy
+import pytest
+
+import parabolic
+
+
+class Heat(object):
+    '''
+    u' = \\Delta u  on (0, 1) with finite differences, solved with a
+    (pretend) iterative solver.
+    '''
+    def __init__(self, n):
+        h = 1.0 / (n+1)
+        self.A = (
+            numpy.eye(n, k=-1) - 2.0 * numpy.eye(n) + numpy.eye(n, k=1)
+            ) / h**2
+        self.M = numpy.eye(n)
+        self.last_num_iterations = None
+        return
+
+    # pylint: disable=unused-argument
+    def eval_alpha_M_beta_F(self, alpha, beta, u, t):
+        return alpha * numpy.dot(self.M, u) + beta * numpy.dot(self.A, u)
+
+    def solve_alpha_M_beta_F(self, alpha, beta, b, t):
+        self.last_num_iterations = 3
+        return numpy.linalg.solve(alpha * self.M + beta * self.A, b)
+
+
+@pytest.mark.parametrize('method', [
+    parabolic.ExplicitEuler,
+    parabolic.ImplicitEuler,
+    parabolic.Trapezoidal,
+    ])
+def test_counters(method):
+    problem = Heat(20)
+    stepper = parabolic.Instrumented(method(problem))
+    u = numpy.ones(20)
+    for _, u in parabolic.integrate(stepper, u, 0.0, 1.0e-3, 1.0e-4):
+        pass
+
+    stats = stepper.stats
+    assert len(stats.steps) == 10
+    totals = stats.totals()
+    assert totals['num_evals'] == 10
+    assert totals['num_solves'] == 10
+    assert totals['linear_iterations'] == 30
+    assert totals['max_bytes_allocated'] is None
+    for s in stats.steps:
+        assert s.wall_time >= s.eval_time + s.solve_time
+
+    assert stepper.detach().problem is problem
+    return
+
+
+def test_stepper_not_modified():
+    problem = Heat(20)
+    stepper = parabolic.ImplicitEuler(problem)
+    instrumented = parabolic.Instrumented(stepper)
+    assert stepper.problem is problem
+    u = numpy.ones(20)
+    assert numpy.array_equal(
+        instrumented.step(u, 0.0, 1.0e-3), stepper.step(u, 0.0, 1.0e-3)
+        )
+    # Only the instrumented steps are recorded.
+    assert len(instrumented.stats.steps) == 1
+    assert instrumented.stats.totals()['num_solves'] == 1
+    return
+
+
+def test_max_events():
+    stepper = parabolic.Instrumented(
+        parabolic.Trapezoidal(Heat(20)), max_events=5
+        )
+    u = numpy.ones(20)
+    for _ in range(10):
+        u = stepper.step(u, 0.0, 1.0e-3)
+    # Each step is three events; only the most recent ones are kept.
+    assert len(stepper.stats.events) == 5
+    assert stepper.stats.events[-1][0] == 'step'
+    # The per-step records are complete.
+    assert stepper.stats.totals()['num_evals'] == 10
+    return
+
+
+def test_trace_memory():
+    stepper = parabolic.Instrumented(
+        parabolic.ImplicitEuler(Heat(100)), trace_memory=True
+        )
+    stepper.step(numpy.ones(100), 0.0, 1.0e-3)
+    # At least the matrix alpha*M + beta*A is allocated.
+    assert stepper.stats.steps[0].bytes_allocated >= 100 * 100 * 8
+    return
+
+
+def test_export(tmp_path):
+    stepper = parabolic.Instrumented(parabolic.Trapezoidal(Heat(20)))
+    u = numpy.ones(20)
+    for _ in range(3):
+        u = stepper.step(u, 0.0, 1.0e-3)
+
+    stepper.stats.write_json(str(tmp_path / 'stats.json'))
+    with open(str(tmp_path / 'stats.json'), encoding='utf-8') as f:
+        data = json.load(f)
+    assert data['totals']['num_steps'] == 3
+    assert len(data['steps']) == 3
+
+    stepper.stats.write_chrome_trace(str(tmp_path / 'trace.json'))
+    with open(str(tmp_path / 'trace.json'), encoding='utf-8') as f:
+        data = json.load(f)
+    names = [event['name'] for event in data['traceEvents']]
+    assert names.count('step') == 3
+    assert names.count('eval_alpha_M_beta_F') == 3
+    assert names.count('solve_alpha_M_beta_F') == 3
+    return
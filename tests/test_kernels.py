@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+import multiprocessing
+
+import numpy
+import pytest
+import scipy.sparse
+
+import parabolic
+from parabolic.kernels import RowBlockOperator, linear_combination
+from parabolic.numpy_backend import Heat
+
+
+def _random_matrices(n):
+    # different sparsity patterns, with empty rows
+    M = scipy.sparse.random(n, n, density=0.05, random_state=0, format='csr')
+    A = scipy.sparse.random(n, n, density=0.05, random_state=1, format='csr')
+    A = A + scipy.sparse.eye(n)
+    M = scipy.sparse.diags((numpy.arange(n) % 7 != 0) * 1.0).dot(M)
+    return M.tocsr(), A.tocsr()
+
+
+def _two_products(M, A, alpha, beta, u):
+    # The plain evaluation which the row blocks reproduce
+    out = alpha * M.dot(u)
+    out += beta * A.dot(u)
+    return out
+
+
+@pytest.mark.parametrize('num_threads', [1, 3])
+def test_row_block_operator(num_threads):
+    n = 200
+    M, A = _random_matrices(n)
+    op = RowBlockOperator(M, A, num_threads=num_threads)
+    assert op.bounds[0] == 0 and op.bounds[-1] == n
+    # The blocks don't copy the matrices.
+    for _, _, M_k, A_k in op.blocks:
+        assert numpy.shares_memory(M_k.data, M.data)
+        assert numpy.shares_memory(A_k.data, A.data)
+    u = numpy.random.RandomState(2).rand(n)
+    b = numpy.random.RandomState(3).rand(n)
+    for alpha, beta in [(1.0, 0.0), (0.0, 1.0), (1.0, -0.1), (2.0, 3.0)]:
+        expected = _two_products(M, A, alpha, beta, u)
+        assert numpy.array_equal(op.apply(alpha, beta, u), expected)
+        if beta != 0.0:
+            expected += beta * b
+        assert numpy.array_equal(op.apply(alpha, beta, u, b), expected)
+    return
+
+
+def test_scales():
+    n = 200
+    M, A = _random_matrices(n)
+    u = numpy.random.RandomState(2).rand(n).astype(numpy.float32)
+    b = numpy.random.RandomState(3).rand(n)
+    op = RowBlockOperator(
+        M.astype(numpy.float32), A.astype(numpy.float32), num_threads=3
+        )
+    scales = numpy.zeros((len(op.blocks), 2))
+    out = op.apply(2.0, -0.1, u, b, dtype=numpy.float64, scales=scales)
+    assert out.dtype == numpy.float32
+    # The products are single precision, their sum is not.
+    M_u = 2.0 * M.astype(numpy.float32).dot(u).astype(numpy.float64)
+    beta_F = -0.1 * (A.astype(numpy.float32).dot(u).astype(numpy.float64) + b)
+    assert numpy.allclose(out, (M_u + beta_F).astype(numpy.float32))
+    assert numpy.allclose(
+        numpy.max(scales, axis=0),
+        [numpy.max(abs(M_u)), numpy.max(abs(beta_F))]
+        )
+    return
+
+
+def _evaluate_with_threads(n):
+    problem = Heat(n, num_threads=2)
+    return problem.eval_alpha_M_beta_F(1.0, -0.1, numpy.ones(n), 0.0)
+
+
+@pytest.mark.skipif(
+    'fork' not in multiprocessing.get_all_start_methods(),
+    reason='needs fork'
+    )
+def test_fork():
+    # The thread pool exists when the process forks. The child must not wait
+    # for the threads of the parent's pool, which it doesn't have.
+    expected = _evaluate_with_threads(100)
+    with multiprocessing.get_context('fork').Pool(1) as pool:
+        result = pool.apply_async(_evaluate_with_threads, (100,))
+        assert numpy.array_equal(result.get(timeout=30), expected)
+    return
+
+
+@pytest.mark.parametrize('num_threads', [1, 4])
+def test_linear_combination(num_threads):
+    n = 1000
+    rng = numpy.random.RandomState(0)
+    u = rng.rand(n)
+    vs = [rng.rand(n) for _ in range(3)]
+    terms = [(0.5, vs[0]), (0.0, vs[1]), (-2.0, vs[2])]
+    numpy.testing.assert_allclose(
+        linear_combination(u, terms, num_threads=num_threads, block_size=64),
+        u + 0.5 * vs[0] - 2.0 * vs[2],
+        rtol=1.0e-14
+        )
+    assert numpy.array_equal(linear_combination(u, []), u)
+    return
+
+
+def test_threads_in_problem():
+    def f(x, t):
+        return numpy.sin(numpy.pi * x[:, 0]) * numpy.cos(t)
+
+    u0 = numpy.zeros(100**2)
+    results = []
+    u = u0
+    for num_threads in [1, 4]:
+        problem = Heat(100, dim=2, f=f, num_threads=num_threads)
+        for _, u in parabolic.integrate(
+                parabolic.Trapezoidal(problem), u0, 0.0, 0.01, 1.0e-3
+                ):
+            pass
+        results.append(u)
+    # The row blocks add up in the same order.
+    numpy.testing.assert_array_equal(results[0], results[1])
+    return
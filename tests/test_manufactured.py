@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#
+import numpy
+import sympy
+
+import parabolic
+from parabolic.manufactured import lambdify, ManufacturedSolution
+from parabolic.numpy_backend import Heat
+
+
+def test_lambdify():
+    x = sympy.DeferredVector('x')
+    t = sympy.symbols('t')
+    expr = sympy.exp(t) * x[0] * (1 - x[0]) * x[1] * (1 - x[1])
+    f = lambdify(expr, 2)
+    # memoized
+    assert lambdify(expr, 2) is f
+
+    points = numpy.random.rand(10, 2)
+    ref = (
+        numpy.exp(0.3) * points[:, 0] * (1 - points[:, 0])
+        * points[:, 1] * (1 - points[:, 1])
+        )
+    assert numpy.allclose(f(points, 0.3), ref)
+
+    # constants are broadcast
+    assert numpy.allclose(lambdify(sympy.Integer(2), 2)(points, 0.3), 2.0)
+    return
+
+
+def test_forcing():
+    x = sympy.DeferredVector('x')
+    t = sympy.symbols('t')
+    mms = ManufacturedSolution(
+        sympy.exp(t) * sympy.sin(sympy.pi * x[0]), 1, kappa=3.0, rho_cp=2.0
+        )
+    points = numpy.random.rand(10, 1)
+    ref = (2.0 + 3.0 * numpy.pi**2) * numpy.exp(0.5) * numpy.sin(
+        numpy.pi * points[:, 0]
+        )
+    assert numpy.allclose(mms.forcing(points, 0.5), ref)
+    return
+
+
+def test_heat():
+    x = sympy.DeferredVector('x')
+    t = sympy.symbols('t')
+    mms = ManufacturedSolution(
+        sympy.exp(t) * sympy.sin(sympy.pi * x[0]) * sympy.sin(sympy.pi * x[1]),
+        2
+        )
+    problem = Heat(31, dim=2, f=mms.forcing)
+    stepper = parabolic.Trapezoidal(problem)
+    u0 = mms.solution(problem.points, 0.0)
+    t1, u = 0.0, u0
+    for t1, u in parabolic.integrate(stepper, u0, 0.0, 0.1, 0.01):
+        pass
+    err = numpy.max(abs(u - mms.solution(problem.points, t1)))
+    assert err < 1.0e-2
+    return
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+import numpy
+import pytest
+
+import parabolic
+from parabolic import matrix_free, numpy_backend
+
+
+@pytest.mark.parametrize('dim', [1, 2, 3])
+def test_operators(dim):
+    n = 6
+    problem = matrix_free.Heat(n, dim=dim, kappa=2.0)
+    reference = numpy_backend.Heat(n, dim=dim, kappa=2.0)
+    u = numpy.random.rand(n**dim)
+    assert numpy.allclose(problem.apply_M(u), reference.M.dot(u))
+    assert numpy.allclose(problem.apply_A(u), reference.A.dot(u))
+    assert numpy.allclose(problem.diagonal_M(), reference.M.diagonal())
+    assert numpy.allclose(problem.diagonal_A(), reference.A.diagonal())
+    return
+
+
+@pytest.mark.parametrize('preconditioner', [None, 'jacobi', 'chebyshev'])
+@pytest.mark.parametrize('alpha, beta', [
+    (1.0, -1.0e-3),  # implicit Euler: CG
+    (1.0, 1.0e-3),   # indefinite: GMRES
+    (1.0, 0.0),      # mass matrix
+    ])
+def test_solve(preconditioner, alpha, beta):
+    def f(x, t):
+        return numpy.sin(t) * x[:, 0]
+
+    problem = matrix_free.Heat(
+        15, dim=2, f=f, preconditioner=preconditioner, tol=1.0e-12
+        )
+    reference = numpy_backend.Heat(15, dim=2, f=f)
+    b = numpy.random.rand(15**2)
+    u = problem.solve_alpha_M_beta_F(alpha, beta, b, 0.3)
+    ref = reference.solve_alpha_M_beta_F(alpha, beta, b, 0.3)
+    assert numpy.linalg.norm(u - ref) < 1.0e-8 * numpy.linalg.norm(ref)
+    assert problem.last_num_iterations > 0
+    return
+
+
+def test_chebyshev_reduces_iterations():
+    b = numpy.random.rand(31**2)
+    iterations = {}
+    for preconditioner in [None, 'jacobi', 'chebyshev']:
+        problem = matrix_free.Heat(31, dim=2, preconditioner=preconditioner)
+        problem.solve_alpha_M_beta_F(1.0, -1.0, b, 0.0)
+        iterations[preconditioner] = problem.last_num_iterations
+    assert iterations['chebyshev'] < iterations['jacobi'] / 2
+    return
+
+
+def _final_state(problem, u0):
+    u = u0
+    for _, u in parabolic.integrate(
+            parabolic.Trapezoidal(problem), u0, 0.0, 0.1, 0.01
+            ):
+        pass
+    return u
+
+
+def test_stepping():
+    problem = matrix_free.Heat(15, dim=2)
+    reference = numpy_backend.Heat(15, dim=2)
+    u0 = numpy.prod(numpy.sin(numpy.pi * problem.points), axis=1)
+    assert numpy.allclose(
+        _final_state(problem, u0), _final_state(reference, u0),
+        atol=1.0e-8, rtol=0.0
+        )
+    return
+
+
+def test_cache_size():
+    problem = matrix_free.Heat(
+        10, preconditioner='chebyshev', cache_size=2
+        )
+    u = numpy.ones(10)
+    for dt in [1.0e-3, 2.0e-3, 4.0e-3, 2.0e-3]:
+        problem.solve_alpha_M_beta_F(1.0, -dt, u, 0.0)
+    # Per cache, the last two (alpha, beta) pairs are kept.
+    # pylint: disable=protected-access
+    for cache in [problem._last_solution, problem._lambda_max]:
+        assert list(cache) == [(1.0, -4.0e-3), (1.0, -2.0e-3)]
+    return
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+#
+import numpy
+import pytest
+import scipy.sparse.linalg
+
+import parabolic
+from parabolic import multigrid, numpy_backend
+
+
+def test_prolongation():
+    # Piecewise linear functions which vanish on the boundary are
+    # interpolated exactly.
+    P = multigrid.Heat(15).hierarchy.P[0]
+    x_coarse = numpy.linspace(0.0, 1.0, 9)[1:-1]
+    x_fine = numpy.linspace(0.0, 1.0, 17)[1:-1]
+    hat = numpy.minimum(x_coarse, 1.0 - x_coarse)
+    assert numpy.allclose(
+        P.dot(hat), numpy.minimum(x_fine, 1.0 - x_fine)
+        )
+    return
+
+
+@pytest.mark.parametrize('dim', [1, 2, 3])
+@pytest.mark.parametrize('alpha, beta', [(1.0, -1.0e-2), (0.0, 1.0)])
+def test_solve(dim, alpha, beta):
+    n = 15
+    problem = multigrid.Heat(n, dim=dim, tol=1.0e-12)
+    b = numpy.random.rand(n**dim)
+    u = problem.solve_alpha_M_beta_F(alpha, beta, b, 0.0)
+    ref = scipy.sparse.linalg.spsolve(
+        (alpha * problem.M + beta * problem.A).tocsc(), b
+        )
+    assert numpy.linalg.norm(u - ref) < 1.0e-9 * numpy.linalg.norm(ref)
+    return
+
+
+@pytest.mark.parametrize('method', [
+    parabolic.ImplicitEuler,
+    parabolic.Trapezoidal,
+    ])
+def test_mesh_independence(method):
+    dt = 1.0e-2
+    iterations = []
+    for n in [15, 31, 63, 127]:
+        problem = multigrid.Heat(n, dim=2)
+        u0 = numpy.prod(numpy.sin(numpy.pi * problem.points), axis=1)
+        method(problem).step(u0, 0.0, dt)
+        iterations.append(problem.last_num_iterations)
+    assert max(iterations) <= 12
+    assert max(iterations) - min(iterations) <= 1
+    return
+
+
+def test_stepping():
+    problem = multigrid.Heat(31, dim=2)
+    reference = numpy_backend.Heat(31, dim=2)
+    u = v = numpy.prod(numpy.sin(numpy.pi * problem.points), axis=1)
+    stepper = parabolic.Trapezoidal(problem)
+    reference_stepper = parabolic.Trapezoidal(reference)
+    for k in range(10):
+        u = stepper.step(u, k * 0.01, 0.01)
+        v = reference_stepper.step(v, k * 0.01, 0.01)
+    assert numpy.allclose(u, v, rtol=0.0, atol=1.0e-9)
+    # Solves don't need any factorizations.
+    assert not hasattr(problem, 'factorization')
+    return
+
+
+def test_hierarchy_cached():
+    problem = multigrid.Heat(31, dim=2)
+    levels = problem.hierarchy.levels(1.0, -0.01)
+    stepper = parabolic.ImplicitEuler(problem)
+    u = numpy.ones(31**2)
+    for _ in range(3):
+        u = stepper.step(u, 0.0, 0.01)
+    assert problem.hierarchy.levels(1.0, -0.01) is levels
+    return
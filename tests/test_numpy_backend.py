@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+#
+import warnings
+
+import numpy
+import pytest
+
+import parabolic
+from parabolic.numpy_backend import Heat
+
+
+def _eigenvalue(n, dim):
+    # Smallest eigenvalue of M^{-1} K for the discrete heat problem; the
+    # corresponding eigenvector is the nodal interpolant of prod sin(pi x_i).
+    h = 1.0 / (n+1)
+    c = numpy.cos(numpy.pi * h)
+    return dim * (2.0 - 2.0*c) / h / (h / 6.0 * (4.0 + 2.0*c))
+
+
+@pytest.mark.parametrize('dim', [1, 2, 3])
+def test_eigenmode(dim):
+    problem = Heat(7, dim=dim)
+    u = numpy.prod(numpy.sin(numpy.pi * problem.points), axis=1)
+    F = problem.eval_alpha_M_beta_F(0.0, 1.0, u, 0.0)
+    Mu = problem.eval_alpha_M_beta_F(1.0, 0.0, u, 0.0)
+    assert numpy.allclose(F, -_eigenvalue(7, dim) * Mu)
+    return
+
+
+@pytest.mark.parametrize('method', [
+    parabolic.ExplicitEuler,
+    parabolic.ImplicitEuler,
+    parabolic.Trapezoidal,
+    ])
+def test_temporal_order(method):
+    n = 15
+    problem = Heat(n, dim=2)
+    lmbda = _eigenvalue(n, 2)
+    u0 = numpy.prod(numpy.sin(numpy.pi * problem.points), axis=1)
+    Dt = [1.0e-4, 0.5e-4]
+    errors = []
+    for dt in Dt:
+        t, u = 0.0, u0
+        for t, u in parabolic.integrate(method(problem), u0, 0.0, 1.0e-2, dt):
+            pass
+        errors.append(numpy.max(abs(u - numpy.exp(-lmbda * t) * u0)))
+    order = numpy.log(errors[0] / errors[1]) / numpy.log(Dt[0] / Dt[1])
+    assert abs(order - method.order) < 0.1
+    return
+
+
+def test_forcing():
+    # u = t * x (1-x)  =>  f = x (1-x) + 2 t
+    def f(x, t):
+        return x[:, 0] * (1.0 - x[:, 0]) + 2.0 * t
+
+    problem = Heat(20, f=f)
+    x = problem.points[:, 0]
+    stepper = parabolic.Trapezoidal(problem)
+    t, u = 0.0, 0.0 * x
+    for t, u in parabolic.integrate(stepper, u, 0.0, 1.0, 0.1):
+        pass
+    # Linear elements reproduce the quadratic in x only up to O(h^2).
+    assert numpy.max(abs(u - t * x * (1.0 - x))) < 1.0e-3
+    return
+
+
+def test_factorization_cache():
+    problem = Heat(10, cache_size=2)
+    stepper = parabolic.ImplicitEuler(problem)
+    u = numpy.ones(10)
+    for _ in range(5):
+        u = stepper.step(u, 0.0, 0.1)
+    assert problem.cache_misses == 1
+    assert problem.cache_hits == 4
+
+    # Least recently used entries are evicted.
+    problem.factorization(1.0, -0.2)
+    problem.factorization(1.0, -0.3)
+    problem.factorization(1.0, -0.1)
+    assert problem.cache_misses == 4
+    return
+
+
+def test_mixed_precision_solve():
+    problem = Heat(15, dim=2, dtype=numpy.float32)
+    reference = Heat(15, dim=2)
+    b = numpy.random.rand(15**2)
+    u = problem.solve_alpha_M_beta_F(1.0, -1.0e-2, b, 0.0)
+    ref = reference.solve_alpha_M_beta_F(1.0, -1.0e-2, b, 0.0)
+    assert u.dtype == numpy.float32
+    eps = numpy.finfo(numpy.float32).eps
+    # only the rounding to single precision
+    assert numpy.max(abs(u - ref)) < eps * numpy.max(abs(ref))
+
+    u = problem.solve_alpha_M_beta_A_transposed(1.0, -1.0e-2, b)
+    ref = reference.solve_alpha_M_beta_A_transposed(1.0, -1.0e-2, b)
+    assert numpy.max(abs(u - ref)) < eps * numpy.max(abs(ref))
+    return
+
+
+def test_mixed_precision_stepping():
+    problem = Heat(15, dim=2, dtype=numpy.float32)
+    reference = Heat(15, dim=2)
+    u0 = numpy.prod(numpy.sin(numpy.pi * problem.points), axis=1)
+    assert problem.eval_alpha_M_beta_F(1.0, 0.1, u0, 0.0).dtype \
+        == numpy.float32
+    u = v = u0
+    for _, u in parabolic.integrate(
+            parabolic.Trapezoidal(problem), u0.astype(numpy.float32),
+            0.0, 0.1, 0.01
+            ):
+        pass
+    for _, v in parabolic.integrate(
+            parabolic.Trapezoidal(reference), u0, 0.0, 0.1, 0.01
+            ):
+        pass
+    assert u.dtype == numpy.float32
+    assert numpy.max(abs(u - v)) < 1.0e-5 * numpy.max(abs(v))
+    return
+
+
+def test_mixed_precision_ill_conditioned():
+    # The stiffness matrix with n=20000 has condition number ~1e8, too large
+    # for a single-precision factorization, but not for the solves of the
+    # mixed-precision mode.
+    n = 20000
+    problem = Heat(n, dtype=numpy.float32)
+    reference = Heat(n)
+    b = numpy.ones(n)
+    u = problem.solve_alpha_M_beta_F(0.0, -1.0, b, 0.0)
+    ref = reference.solve_alpha_M_beta_F(0.0, -1.0, b, 0.0)
+    eps = numpy.finfo(numpy.float32).eps
+    assert numpy.max(abs(u - ref)) < eps * numpy.max(abs(ref))
+    return
+
+
+def test_mixed_precision_resolution():
+    # Steps so small that dt * F(u) is rounded away in single precision
+    def f(x, _):
+        return numpy.ones(len(x))
+
+    problem = Heat(50, f=f, dtype=numpy.float32)
+    u0 = numpy.sin(numpy.pi * problem.points[:, 0]).astype(numpy.float32)
+    # The increment is only formed in the solve...
+    with pytest.warns(RuntimeWarning, match='rounded away'):
+        parabolic.ImplicitEuler(problem).step(u0, 0.0, 1.0e-9)
+    # ... or only in the evaluation.
+    with pytest.warns(RuntimeWarning, match='rounded away'):
+        parabolic.ExplicitEuler(problem).step(u0, 0.0, 1.0e-9)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        parabolic.ImplicitEuler(problem).step(u0, 0.0, 1.0e-5)
+        parabolic.ExplicitEuler(problem).step(u0, 0.0, 1.0e-5)
+        # The double-precision problem is fine with tiny steps.
+        parabolic.ImplicitEuler(Heat(50, f=f)).step(u0, 0.0, 1.0e-9)
+    return
+
+
+@pytest.mark.parametrize('theta, rannacher_steps, order', [
+    (0.0, 0, 1.0),
+    (0.7, 0, 1.0),
+    (0.5, 0, 2.0),
+    (0.5, 2, 2.0),
+    ])
+def test_theta(theta, rannacher_steps, order):
+    n = 15
+    problem = Heat(n, dim=2)
+    lmbda = _eigenvalue(n, 2)
+    u0 = numpy.prod(numpy.sin(numpy.pi * problem.points), axis=1)
+    Dt = [1.0e-4, 0.5e-4]
+    errors = []
+    t, u = 0.0, u0
+    for dt in Dt:
+        stepper = parabolic.Theta(
+            problem, theta=theta, rannacher_steps=rannacher_steps
+            )
+        for t, u in parabolic.integrate(stepper, u0, 0.0, 1.0e-2, dt):
+            pass
+        errors.append(numpy.max(abs(u - numpy.exp(-lmbda * t) * u0)))
+    assert stepper.order == order
+    assert abs(numpy.log(errors[0] / errors[1]) / numpy.log(2.0) - order) < 0.1
+    return
+
+
+def test_rannacher_smoothing():
+    # Crank-Nicolson with large steps barely damps the highest mode of
+    # nonsmooth data; a few implicit Euler steps remove it.
+    n = 63
+    problem = Heat(n)
+    x = problem.points[:, 0]
+    u0 = (abs(x - 0.5) < 0.25).astype(float)
+    results = []
+    u = u0
+    for rannacher_steps in [0, 2]:
+        stepper = parabolic.Trapezoidal(
+            problem, rannacher_steps=rannacher_steps
+            )
+        for _, u in parabolic.integrate(stepper, u0, 0.0, 0.05, 0.01):
+            pass
+        results.append(u)
+    # The smooth solution has a single maximum, so its total variation is
+    # about twice the maximum; oscillations add to it.
+    tv = [numpy.sum(abs(numpy.diff(u))) for u in results]
+    assert tv[0] > 4 * numpy.max(results[0])
+    assert tv[1] < 2.1 * numpy.max(results[1])
+    return
+
+
+def test_rannacher_steps_counted():
+    # The first steps of a run are smoothed wherever the run starts and
+    # however the step size varies.
+    problem = Heat(20)
+    u0 = numpy.ones(20)
+    stepper = parabolic.Trapezoidal(problem, rannacher_steps=2)
+    implicit = parabolic.ImplicitEuler(problem)
+    trapezoidal = parabolic.Trapezoidal(problem)
+    steps = [(5.0, 0.1), (5.1, 0.03), (5.13, 0.03)]
+    for _ in range(2):
+        u = u0
+        for k, (t, dt) in enumerate(steps):
+            expected = (implicit if k < 2 else trapezoidal).step(u, t, dt)
+            u = stepper.step(u, t, dt)
+            assert numpy.array_equal(u, expected)
+        assert stepper.steps_taken == 3
+        # A new run is smoothed again.
+        stepper.reset()
+    return
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+import os
+
+import numpy
+import pytest
+
+import parabolic
+from parabolic.numpy_backend import Heat
+
+
+@pytest.mark.parametrize('dtype', [numpy.float64, numpy.float32])
+def test_write_read(tmp_path, dtype):
+    basename = str(tmp_path / 'heat')
+    u = numpy.zeros(7)
+    with parabolic.AsyncWriter(
+            basename, u.shape, dtype=dtype, chunk_size=10, num_buffers=2
+            ) as writer:
+        for k in range(25):
+            # The state is modified in place after writing; the writer must
+            # have taken a copy.
+            u[:] = k
+            writer.write(0.1 * k, u)
+
+    times, chunks = parabolic.read_snapshots(basename)
+    assert numpy.allclose(times, 0.1 * numpy.arange(25))
+    assert [chunk.shape for chunk in chunks] == [(10, 7), (10, 7), (5, 7)]
+    assert all(chunk.dtype == dtype for chunk in chunks)
+    data = numpy.concatenate(chunks)
+    assert numpy.array_equal(data, numpy.outer(numpy.arange(25), numpy.ones(7)))
+    return
+
+
+def test_other_files(tmp_path):
+    # Neither stale chunks of an earlier, longer run nor the chunks of
+    # another basename with the same prefix are read.
+    basename = str(tmp_path / 'heat')
+    for name, num_snapshots in [('heat', 25), ('heat', 5), ('heat_2', 5)]:
+        with parabolic.AsyncWriter(
+                str(tmp_path / name), (3,), chunk_size=10
+                ) as writer:
+            for k in range(num_snapshots):
+                writer.write(float(k), numpy.full(3, k))
+
+    times, chunks = parabolic.read_snapshots(basename)
+    assert len(times) == 5
+    assert [chunk.shape for chunk in chunks] == [(5, 3)]
+    return
+
+
+def test_stepping(tmp_path):
+    basename = str(tmp_path / 'decay')
+    problem = Heat(15)
+    stepper = parabolic.ImplicitEuler(problem)
+    u0 = numpy.sin(numpy.pi * problem.points[:, 0])
+    states = []
+    with parabolic.AsyncWriter(basename, u0.shape, num_buffers=1) as writer:
+        for t, u in parabolic.integrate(stepper, u0, 0.0, 0.1, 0.01):
+            writer.write(t, u)
+            states.append(u)
+
+    times, chunks = parabolic.read_snapshots(basename)
+    assert len(times) == 10
+    assert numpy.array_equal(chunks[0], numpy.array(states))
+    return
+
+
+def test_error(tmp_path):
+    basename = os.path.join(str(tmp_path), 'does-not-exist', 'out')
+    writer = parabolic.AsyncWriter(basename, (3,))
+    writer.write(0.0, numpy.zeros(3))
+    with pytest.raises(IOError):
+        writer.close()
+    return
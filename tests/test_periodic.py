@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+#
+import numpy
+import pytest
+
+import parabolic
+from parabolic.numpy_backend import Heat
+
+
+def _problem(n, period):
+    def f(x, t):
+        return 50.0 * numpy.sin(2 * numpy.pi * t / period) \
+            * numpy.sin(numpy.pi * x[:, 0]) \
+            + 10.0 * numpy.cos(2 * numpy.pi * t / period) * x[:, 0]
+    # small diffusivity: the transient decays over many periods
+    return Heat(n, kappa=0.05, f=f)
+
+
+@pytest.mark.parametrize('affine', [True, False])
+def test_periodic_steady_state(affine):
+    n = 50
+    period = 0.1
+    dt = 0.005
+    problem = _problem(n, period)
+    u0 = numpy.zeros(n)
+    stepper = parabolic.Trapezoidal(problem)
+    u, num_period_maps = parabolic.periodic_steady_state(
+        stepper, u0, 0.0, period, dt, tol=1.0e-10, affine=affine
+        )
+    # Marching takes hundreds of periods to get there.
+    assert num_period_maps < (20 if affine else 40)
+
+    # It is periodic ...
+    v = u
+    for k in range(20):
+        v = stepper.step(v, k*dt, dt)
+    assert numpy.max(abs(v - u)) < 1.0e-8 * numpy.max(abs(u))
+
+    # ... and where marching ends up after many periods.
+    v = u0
+    for k in range(400 * 20):
+        v = stepper.step(v, k*dt, dt)
+    assert numpy.max(abs(v - u)) < 1.0e-6 * numpy.max(abs(u))
+    return
+
+
+def test_rannacher():
+    # Smoothing the start of the run does not change the periodic state.
+    problem = _problem(50, 0.1)
+    u0 = numpy.zeros(50)
+    u, _ = parabolic.periodic_steady_state(
+        parabolic.Trapezoidal(problem), u0, 0.0, 0.1, 0.005, tol=1.0e-10
+        )
+    stepper = parabolic.Trapezoidal(problem, rannacher_steps=2)
+    v, _ = parabolic.periodic_steady_state(
+        stepper, u0, 0.0, 0.1, 0.005, tol=1.0e-10
+        )
+    assert numpy.max(abs(v - u)) < 1.0e-8 * numpy.max(abs(u))
+    assert stepper.rannacher_steps == 2
+    return
+
+
+def test_factorizations_reused():
+    problem = _problem(50, 0.1)
+    parabolic.periodic_steady_state(
+        parabolic.ImplicitEuler(problem), numpy.zeros(50), 0.0, 0.1, 0.005,
+        affine=True
+        )
+    assert problem.cache_misses == 1
+    return
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+import numpy
+
+import parabolic
+from parabolic.numpy_backend import Heat
+
+
+def test_incremental_svd():
+    numpy.random.seed(0)
+    # rank-5 data plus tiny noise
+    X = numpy.random.rand(100, 5).dot(numpy.random.rand(5, 60)) \
+        + 1.0e-12 * numpy.random.rand(100, 60)
+    pod = parabolic.IncrementalPOD(tol=1.0e-8, block_size=7)
+    for j in range(X.shape[1]):
+        pod.add(X[:, j])
+    assert pod.num_snapshots == 60
+
+    s_ref = numpy.linalg.svd(X, compute_uv=False)
+    assert len(pod.singular_values) == 5
+    assert numpy.allclose(pod.singular_values, s_ref[:5])
+    V = pod.basis
+    assert numpy.allclose(V.T.dot(V), numpy.eye(5))
+    # The basis spans the data.
+    assert numpy.allclose(V.dot(V.T.dot(X)), X)
+    return
+
+
+def test_max_rank():
+    numpy.random.seed(0)
+    pod = parabolic.IncrementalPOD(max_rank=3, block_size=4)
+    for _ in range(10):
+        pod.add(numpy.random.rand(20))
+    assert pod.basis.shape == (20, 3)
+    return
+
+
+def _forcing(problem, omega, extra=None):
+    # f(t) = sin(omega t) b1 + cos(omega t) b2 (+ extra)
+    x = problem.points[:, 0]
+    coefficients = [
+        lambda t: numpy.sin(omega * t),
+        lambda t: numpy.cos(omega * t),
+        ]
+    vectors = [problem.M.dot(x * (1.0 - x)), problem.M.dot(numpy.sin(x))]
+    if extra is not None:
+        coefficients.append(lambda t: 1.0)
+        vectors.append(problem.M.dot(extra))
+    return parabolic.AffineForcing(coefficients, vectors)
+
+
+def _train(n, dt):
+    problem = Heat(n)
+    u0 = numpy.zeros(n)
+    pod = parabolic.IncrementalPOD(tol=1.0e-10)
+    for omega in [1.0, 5.0, 20.0]:
+        problem.set_forcing(_forcing(problem, omega))
+        for _, u in parabolic.integrate(
+                parabolic.ImplicitEuler(problem), u0, 0.0, 0.5, dt
+                ):
+            pod.add(u)
+    return problem, pod
+
+
+def test_reduced_run():
+    n = 200
+    dt = 1.0e-2
+    problem, pod = _train(n, dt)
+    assert pod.basis.shape[1] < 30
+
+    reduced = parabolic.ReducedProblem(problem, pod.basis)
+    f = _forcing(problem, 10.0)
+    reduced.set_forcing(f)
+    u0 = numpy.zeros(n)
+    t, u = 0.0, u0
+    for t, u in parabolic.integrate_reduced(
+            reduced, parabolic.ImplicitEuler, u0, 0.0, 0.5, dt, tol=1.0e-6
+            ):
+        pass
+    assert reduced.fallback_time is None
+
+    t_full, u_full = 0.0, u0
+    for t_full, u_full in parabolic.integrate(
+            parabolic.ImplicitEuler(problem), u0, 0.0, 0.5, dt
+            ):
+        pass
+    assert t == t_full
+    assert numpy.max(abs(u - u_full)) < 1.0e-6 * numpy.max(abs(u_full))
+    return
+
+
+def test_fallback():
+    n = 200
+    dt = 1.0e-2
+    problem, pod = _train(n, dt)
+    reduced = parabolic.ReducedProblem(problem, pod.basis)
+    # a forcing component which the basis cannot represent
+    x = problem.points[:, 0]
+    reduced.set_forcing(
+        _forcing(problem, 10.0, extra=numpy.sin(17 * numpy.pi * x))
+        )
+    u0 = numpy.zeros(n)
+    results = list(parabolic.integrate_reduced(
+        reduced, parabolic.Trapezoidal, u0, 0.0, 0.5, dt, check_every=5
+        ))
+    assert reduced.fallback_time is not None
+    assert abs(results[-1][0] - 0.5) < 1.0e-12
+    assert len(results) == 50
+
+    full = list(parabolic.integrate(
+        parabolic.Trapezoidal(problem), u0, 0.0, 0.5, dt
+        ))
+    # After the fallback, the full model takes over.
+    assert numpy.max(abs(results[-1][1] - full[-1][1])) \
+        < 1.0e-2 * numpy.max(abs(full[-1][1]))
+    return
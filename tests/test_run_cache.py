@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+import multiprocessing
+
+import numpy
+
+import parabolic
+from parabolic.numpy_backend import Heat
+
+
+class Counting(object):
+    def __init__(self, stepper):
+        self.stepper = stepper
+        self.problem = stepper.problem
+        self.num_steps = 0
+        return
+
+    def step(self, u0, t, dt):
+        self.num_steps += 1
+        return self.stepper.step(u0, t, dt)
+
+    def dense_output(self, u0, u1, t, dt):
+        return self.stepper.dense_output(u0, u1, t, dt)
+
+
+def _u0(problem):
+    return numpy.sin(numpy.pi * problem.points[:, 0])
+
+
+def test_hit(tmp_path):
+    cache = parabolic.RunCache(str(tmp_path))
+    problem = Heat(30)
+    u0 = _u0(problem)
+    stepper = Counting(parabolic.ImplicitEuler(problem))
+    times, states = cache.run(stepper, u0, 0.0, 0.1, 1.0e-2)
+    assert stepper.num_steps == 10
+    assert states.shape == (10, 30)
+    expected = list(parabolic.integrate(
+        parabolic.ImplicitEuler(Heat(30)), u0, 0.0, 0.1, 1.0e-2
+        ))
+    numpy.testing.assert_allclose(times, [t for t, _ in expected])
+    numpy.testing.assert_array_equal(states, [u for _, u in expected])
+
+    # The same run with new objects comes from the cache, ...
+    stepper = Counting(parabolic.ImplicitEuler(Heat(30)))
+    times2, states2 = cache.run(stepper, u0, 0.0, 0.1, 1.0e-2)
+    assert stepper.num_steps == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert isinstance(states2, numpy.memmap)
+    numpy.testing.assert_array_equal(times2, times)
+    numpy.testing.assert_array_equal(states2, states)
+
+    # ... but any change of the run is not.
+    runs = [
+        (parabolic.Trapezoidal(Heat(30)), u0, 0.1, 1.0e-2, None),
+        (parabolic.Theta(Heat(30), theta=0.6), u0, 0.1, 1.0e-2, None),
+        (parabolic.ImplicitEuler(Heat(30, kappa=2.0)), u0, 0.1, 1.0e-2, None),
+        (parabolic.ImplicitEuler(Heat(30)), 2*u0, 0.1, 1.0e-2, None),
+        (parabolic.ImplicitEuler(Heat(30)), u0, 0.2, 1.0e-2, None),
+        (parabolic.ImplicitEuler(Heat(30)), u0, 0.1, 5.0e-3, None),
+        (parabolic.ImplicitEuler(Heat(30)), u0, 0.1, 1.0e-2, 'other'),
+        ]
+    for stepper, u, t_end, dt, tag in runs:
+        cache.run(stepper, u, 0.0, t_end, dt, tag=tag)
+    assert cache.misses == 1 + len(runs)
+    assert len(cache.keys()) == 1 + len(runs)
+    return
+
+
+def test_output_times(tmp_path):
+    cache = parabolic.RunCache(str(tmp_path))
+    problem = Heat(20)
+    times, states = cache.run(
+        parabolic.Trapezoidal(problem), _u0(problem), 0.0, 0.1, 1.0e-2,
+        output_times=[0.0, 0.025, 0.1]
+        )
+    numpy.testing.assert_allclose(times, [0.0, 0.025, 0.1])
+    assert states.shape == (3, 20)
+    return
+
+
+def test_eviction(tmp_path):
+    problem = Heat(100)
+    u0 = _u0(problem)
+    # room for about two runs of 10 steps
+    cache = parabolic.RunCache(str(tmp_path), max_bytes=2.5 * 10 * 100 * 8)
+    keys = []
+    for dt in [1.0e-2, 5.0e-3, 1.0e-2]:
+        cache.run(parabolic.ImplicitEuler(problem), u0, 0.0, 0.1, dt)
+        keys.append(parabolic.run_fingerprint(
+            parabolic.ImplicitEuler(problem), u0, 0.0, 0.1, dt
+            ))
+    # The 20-step run pushed out the first one, which is stored again.
+    assert cache.misses == 3
+    assert sorted(cache.keys()) == sorted([keys[0]])
+    return
+
+
+def _worker(args):
+    directory, kappa = args
+    problem = Heat(50, kappa=kappa)
+    cache = parabolic.RunCache(directory)
+    _, states = cache.run(
+        parabolic.ImplicitEuler(problem), _u0(problem), 0.0, 0.1, 1.0e-3
+        )
+    return numpy.array(states[-1])
+
+
+def test_concurrent(tmp_path):
+    args = 4 * [(str(tmp_path), 1.0), (str(tmp_path), 2.0)]
+    with multiprocessing.Pool(4) as pool:
+        results = pool.map(_worker, args)
+    for k, result in enumerate(results):
+        numpy.testing.assert_array_equal(result, results[k % 2])
+    assert len(parabolic.RunCache(str(tmp_path)).keys()) == 2
+    # only complete entries, no temporary files left
+    assert len(list(tmp_path.iterdir())) == 4
+    return
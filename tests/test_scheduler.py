@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+import functools
+
+import numpy
+
+import parabolic
+from parabolic.numpy_backend import Heat, LinearProblem
+from parabolic.scheduler import SharedOperators, run_sweep
+
+
+def _forcing(b, t):
+    return numpy.cos(t) * b
+
+
+def _runs(problem, num_runs):
+    x = problem.points[:, 0]
+    return [
+        (numpy.sin((k+1) * numpy.pi * x),
+         None if k % 2 else functools.partial(_forcing, k * problem.M.dot(x)))
+        for k in range(num_runs)
+        ]
+
+
+def _reference(problem, runs, output_times=None):
+    out = []
+    for u0, f in runs:
+        p = LinearProblem(problem.M, problem.A, f)
+        steps = list(parabolic.integrate(
+            parabolic.Trapezoidal(p), u0, 0.0, 0.1, 0.01,
+            output_times=output_times
+            ))
+        out.append(
+            steps[-1][1] if output_times is None
+            else numpy.array([u for _, u in steps])
+            )
+    return numpy.array(out)
+
+
+def test_shared_operators():
+    problem = Heat(7, dim=2)
+    operators = SharedOperators(problem.M, problem.A)
+    try:
+        M, A = operators.attach()
+        assert (M != problem.M).nnz == 0
+        assert (A != problem.A).nnz == 0
+    finally:
+        operators.unlink()
+    return
+
+
+def test_sweep(tmp_path):
+    problem = Heat(15, dim=2)
+    runs = _runs(problem, 7)
+    results = run_sweep(
+        problem.M, problem.A, runs, parabolic.Trapezoidal, 0.0, 0.1, 0.01,
+        str(tmp_path / 'out.npy'), processes=3
+        )
+    assert results.shape == (7, 15**2)
+    assert numpy.allclose(results, _reference(problem, runs))
+    return
+
+
+def test_sweep_output_times(tmp_path):
+    problem = Heat(10)
+    runs = _runs(problem, 4)
+    output_times = [0.025, 0.05, 0.1]
+    results = run_sweep(
+        problem.M, problem.A, runs, parabolic.Trapezoidal, 0.0, 0.1, 0.01,
+        str(tmp_path / 'out.npy'), output_times=output_times, processes=2
+        )
+    assert results.shape == (4, 3, 10)
+    assert numpy.allclose(results, _reference(problem, runs, output_times))
+    return
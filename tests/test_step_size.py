@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#
+import numpy
+
+import parabolic
+from parabolic.numpy_backend import Heat
+
+
+def test_quantize():
+    ladder = parabolic.StepSizeLadder(1.0e-3, ratio=2.0)
+    assert ladder.quantize(1.0e-3) == 1.0e-3
+    assert ladder.quantize(1.9e-3) == 1.0e-3
+    assert ladder.quantize(2.0e-3) == 2.0e-3
+    assert ladder.quantize(0.9e-3) == 0.5e-3
+    # Rungs reached in different ways are bitwise equal.
+    assert ladder.quantize(3 * 1.0e-3 / 3 * 8) == ladder.rung(3)
+    assert ladder.quantize(1.0e-3 * 1.1**20) == ladder.quantize(6.7e-3)
+    return
+
+
+def test_bounds():
+    ladder = parabolic.StepSizeLadder(
+        1.0e-3, ratio=4.0, dt_min=1.0e-4, dt_max=1.0
+        )
+    assert ladder.quantize(1.0e-6) == ladder.rung(-1)
+    assert ladder.quantize(1.0e3) == ladder.rung(4)
+    assert ladder.rungs() == [ladder.rung(k) for k in range(-1, 5)]
+    assert numpy.all(numpy.diff(ladder.rungs()) > 0.0)
+    return
+
+
+def test_ramp():
+    ladder = parabolic.StepSizeLadder(1.0e-3)
+    assert ladder.ramp(1.0e-3, 4.0e-3, steps_per_rung=2) \
+        == [1.0e-3, 1.0e-3, 2.0e-3, 2.0e-3, 4.0e-3]
+    assert ladder.ramp(4.0e-3, 1.0e-3) == [4.0e-3, 2.0e-3, 1.0e-3]
+    return
+
+
+def test_steady_state_factorizations():
+    def f(x, t):  # pylint: disable=unused-argument
+        return numpy.ones(len(x))
+
+    u0 = numpy.zeros(50)
+    solutions = []
+    misses = []
+    for dt_ladder in [None, parabolic.StepSizeLadder(1.0e-3, ratio=4.0)]:
+        problem = Heat(50, f=f, cache_size=8)
+        _, u = parabolic.integrate_to_steady_state(
+            parabolic.ImplicitEuler(problem), u0, 0.0, 1.0e-3,
+            tol=1.0e-8, dt_growth=1.2, dt_max=1.0e3, dt_ladder=dt_ladder
+            )
+        solutions.append(u)
+        misses.append(problem.cache_misses)
+
+    assert numpy.allclose(solutions[0], solutions[1], atol=1.0e-8)
+    # Every growth of dt is another factorization, unless quantized.
+    assert misses[1] <= 8
+    assert misses[1] < misses[0] / 3
+    return
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+#
+import numpy
+import pytest
+import scipy.sparse.linalg
+
+import parabolic
+from parabolic import numpy_backend, structured
+
+
+@pytest.mark.parametrize('boundary', ['dirichlet', 'neumann', 'periodic'])
+@pytest.mark.parametrize('dim', [1, 2, 3])
+@pytest.mark.parametrize('n', [6, 7])
+def test_solve(boundary, dim, n):
+    problem = structured.Heat(n, dim=dim, kappa=0.7, boundary=boundary)
+    b = numpy.random.rand(n**dim)
+    for alpha, beta in [(1.0, -0.3), (2.0, 1.0e-2)]:
+        K = (alpha * problem.M + beta * problem.A).tocsc()
+        ref = scipy.sparse.linalg.spsolve(K, b)
+        u = problem.solve_alpha_M_beta_F(alpha, beta, b, 0.0)
+        assert numpy.allclose(u, ref, rtol=1.0e-10, atol=1.0e-12)
+        u = problem.solve_alpha_M_beta_A_transposed(alpha, beta, b)
+        assert numpy.allclose(u, ref, rtol=1.0e-10, atol=1.0e-12)
+    return
+
+
+def test_singular():
+    problem = structured.Heat(8, boundary='neumann')
+    with pytest.raises(ValueError):
+        problem.solve_alpha_M_beta_F(0.0, 1.0, numpy.ones(8), 0.0)
+    # Dirichlet problems are fine.
+    problem = structured.Heat(8)
+    problem.solve_alpha_M_beta_F(0.0, 1.0, numpy.ones(8), 0.0)
+    return
+
+
+def test_matches_numpy_backend():
+    def f(x, t):
+        return numpy.sin(t) * x[:, 0] * x[:, 1]
+
+    problem = structured.Heat(15, dim=2, f=f)
+    reference = numpy_backend.Heat(15, dim=2, f=f)
+    assert abs(problem.M - reference.M).max() == 0.0
+    assert abs(problem.A - reference.A).max() == 0.0
+    u0 = numpy.prod(numpy.sin(numpy.pi * problem.points), axis=1)
+    u, v = [
+        list(parabolic.integrate(
+            parabolic.Trapezoidal(p), u0, 0.0, 0.1, 0.01
+            ))[-1][1]
+        for p in [problem, reference]
+        ]
+    assert numpy.allclose(u, v, rtol=1.0e-12, atol=1.0e-14)
+    # Solves don't need any factorizations.
+    assert not hasattr(problem, 'factorization')
+    assert reference.cache_misses > 0
+    return
+
+
+def test_neumann_conserves_mass():
+    # Without forcing, the integral of u is preserved.
+    problem = structured.Heat(20, dim=2, boundary='neumann')
+    x = problem.points
+    u0 = numpy.exp(-20 * ((x[:, 0] - 0.3)**2 + (x[:, 1] - 0.6)**2))
+    ones = numpy.ones(len(u0))
+    u = u0
+    for _, u in parabolic.integrate(
+            parabolic.ImplicitEuler(problem), u0, 0.0, 1.0, 0.1
+            ):
+        pass
+    assert abs(ones.dot(problem.M.dot(u)) - ones.dot(problem.M.dot(u0))) \
+        < 1.0e-12
+    return
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+import numpy
+
+import parabolic
+from parabolic.numpy_backend import Heat, LinearProblem
+
+
+class VaryingHeat(object):
+    '''
+    u' = kappa(t) u'' with a diffusivity varying in time.
+    '''
+    def __init__(self, n, kappa):
+        heat = Heat(n)
+        self.points = heat.points
+        self.linear = LinearProblem(heat.M, heat.A)
+        self.kappa = kappa
+        return
+
+    def eval_alpha_M_beta_F(self, alpha, beta, u, t):
+        return self.linear.eval_alpha_M_beta_F(
+            alpha, beta * self.kappa(t), u, t
+            )
+
+    def solve_alpha_M_beta_F(self, alpha, beta, b, t):
+        return self.linear.solve_alpha_M_beta_F(
+            alpha, beta * self.kappa(t), b, t
+            )
+
+
+def _spectral_radius(problem):
+    return numpy.max(abs(numpy.linalg.eigvals(
+        numpy.linalg.solve(problem.M.toarray(), problem.A.toarray())
+        )))
+
+
+def _run(stepper, u0, t_end, dt):
+    u = u0
+    for _, u in parabolic.integrate(stepper, u0, 0.0, t_end, dt):
+        pass
+    return u
+
+
+def test_spectral_radius():
+    problem = Heat(20)
+    stepper = parabolic.StiffnessSwitching(problem, monitor_every=1)
+    u0 = numpy.sin(numpy.pi * problem.points[:, 0])
+    stepper.step(u0, 0.0, 1.0e-5)
+    rho = _spectral_radius(problem)
+    assert 0.9 * rho < stepper.spectral_radius <= rho * (1.0 + 1.0e-6)
+    # The estimate improves with every step.
+    for _ in range(20):
+        stepper.step(u0, 0.0, 1.0e-5)
+    assert abs(stepper.spectral_radius - rho) < 1.0e-2 * rho
+    return
+
+
+def test_nonstiff_and_stiff():
+    problem = Heat(20)
+    u0 = numpy.sin(numpy.pi * problem.points[:, 0])
+    dt_stable = 2.0 / _spectral_radius(problem)
+
+    # small steps: explicit only, identical to explicit Euler
+    stepper = parabolic.StiffnessSwitching(problem)
+    u = _run(stepper, u0, 0.1, 0.2 * dt_stable)
+    assert stepper.num_implicit_steps == 0
+    assert numpy.array_equal(
+        u, _run(parabolic.ExplicitEuler(problem), u0, 0.1, 0.2 * dt_stable)
+        )
+
+    # large steps: implicit only
+    dt = 10 * dt_stable
+    stepper = parabolic.StiffnessSwitching(problem)
+    u = _run(stepper, u0, 20 * dt, dt)
+    assert stepper.num_explicit_steps == 0
+    assert numpy.array_equal(
+        u, _run(parabolic.ImplicitEuler(problem), u0, 20 * dt, dt)
+        )
+    return
+
+
+def test_switching():
+    # Stiff during the first half, then non-stiff; the step size would be
+    # unstable for explicit Euler at first.
+    def kappa(t):
+        return 50.0 if t < 0.05 else 1.0
+
+    problem = VaryingHeat(20, kappa)
+    u0 = numpy.sin(numpy.pi * problem.points[:, 0])
+    stepper = parabolic.StiffnessSwitching(problem)
+    u = _run(stepper, u0, 0.1, 1.0e-4)
+    assert stepper.num_switches == 1
+    assert stepper.num_implicit_steps > 0
+    assert stepper.num_explicit_steps > 0
+    exact = numpy.exp(-numpy.pi**2 * (50.0 * 0.05 + 1.0 * 0.05)) * u0
+    assert numpy.max(abs(u - exact)) < 1.0e-2 * numpy.max(abs(u0))
+    return
+
+
+def test_hysteresis():
+    # After a few small steps, dt*rho oscillates between 0.6 and 1.0 of the
+    # stability limit: no switching back and forth
+    problem = Heat(20)
+    rho = _spectral_radius(problem)
+    dt0 = 2.0 / rho
+    u0 = numpy.sin(numpy.pi * problem.points[:, 0])
+    stepper = parabolic.StiffnessSwitching(problem)
+    u = u0
+    t = 0.0
+    for k in range(40):
+        if k < 5:
+            dt = 0.3 * dt0
+        else:
+            dt = (1.0 if k % 2 == 0 else 0.6) * dt0
+        u = stepper.step(u, t, dt)
+        t += dt
+    assert stepper.num_switches == 1
+    return
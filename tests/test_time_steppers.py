@@ -2,6 +2,8 @@
 #
 from __future__ import print_function
 
+import functools
+
 # pylint: disable=import-error
 from dolfin import (
     set_log_level, WARNING, Expression, FunctionSpace, DirichletBC, Function,
@@ -59,15 +61,19 @@ def problem_sin1d():
             self.M = assemble(u * v * dx)
             self.A = assemble(-inner(grad(u), grad(v)) * dx)
             self.bcs = DirichletBC(self.V, self.sol, 'on_boundary')
+
+            # The steppers need the right-hand side repeatedly at the same t;
+            # assemble it only once.
+            def assemble_f(t):
+                f.t = t
+                return assemble(f * v * dx)
+            self.f = parabolic.ForcingCache(assemble_f)
             return
 
         def eval_alpha_M_beta_F(self, alpha, beta, u, t):
             # Evaluate  alpha * M * u + beta * F(u, t).
             uvec = u.vector()
-
-            v = TestFunction(self.V)
-            f.t = t
-            b = assemble(f * v * dx)
+            b = self.f(t)
 
             out = Function(self.V)
             out.vector()[:] = \
@@ -78,11 +84,7 @@ def problem_sin1d():
             # Solve  alpha * M * u + beta * F(u, t) = b  for u.
             A = alpha * self.M + beta * self.A
 
-            f.t = t
-            v = TestFunction(self.V)
-            b2 = assemble(f * v * dx)
-
-            rhs = b.vector() - beta * b2
+            rhs = b.vector() - beta * self.f(t)
             self.bcs.apply(A, rhs)
 
             solver = \
@@ -152,27 +154,24 @@ def problem_sinsin():
                 )
 
             self.bcs = DirichletBC(self.V, self.sol, 'on_boundary')
+
+            def assemble_f(t):
+                f.t = t
+                return assemble(f * v / (rho * cp) * dx)
+            self.f = parabolic.ForcingCache(assemble_f)
             return
 
         def eval_alpha_M_beta_F(self, alpha, beta, u, t):
             # Evaluate  alpha * M * u + beta * F(u, t).
             uvec = u.vector()
-
-            v = TestFunction(self.V)
-            f.t = t
-            b = assemble(f * v / (rho * cp) * dx)
-
+            b = self.f(t)
             return alpha * (self.M * uvec) + beta * (self.A * uvec + b)
 
         def solve_alpha_M_beta_F(self, alpha, beta, b, t):
             # Solve  alpha * M * u + beta * F(u, t) = b  for u.
             A = alpha * self.M + beta * self.A
 
-            f.t = t
-            v = TestFunction(self.V)
-            b2 = assemble(f * v / (rho * cp) * dx)
-
-            rhs = b - beta * b2
+            rhs = b - beta * self.f(t)
             self.bcs.apply(A, rhs)
 
             solver = \
@@ -479,17 +478,17 @@ def test_temporal_order(problem, method):
     # TODO add test for spatial order
     mesh_sizes = [16, 32, 64]
     Dt = [1.0e-3, 0.5e-3]
-    errors = _compute_time_errors(problem, method, mesh_sizes, Dt)
-
-    # Error bounds are of the form
+    # The errors are divided by t_n (=dt in this case) since the error bounds
+    # are of the form
     #
     #     ||E|| < C t_n (C1 dt^k + C2 dh^l).
     #
-    # Hence, divide the error by t_n (=dt in this case).
-    errors /= Dt
-
-    # numerical orders of convergence
-    orders = helpers.compute_numerical_order_of_convergence(Dt, errors.T).T
+    # No worker processes: forking after MPI has been initialized by dolfin
+    # is not safe.
+    _, orders = parabolic.verify_temporal_order(
+        functools.partial(_setup, problem), method, mesh_sizes, Dt,
+        processes=1
+        )
 
     # The test is considered passed if the numerical order of convergence
     # matches the expected order in at least the first step in the coarsest
@@ -500,6 +499,30 @@ def test_temporal_order(problem, method):
     return
 
 
+def _setup(problem, mesh_size):
+    mesh_generator, solution, ProblemClass, _ = problem()
+    # Translate data into FEniCS expressions.
+    fenics_sol = Expression(
+        sympy.printing.ccode(solution),
+        degree=MAX_DEGREE,
+        t=0.0
+        )
+    theta0 = Expression(
+        fenics_sol.cppcode,
+        degree=MAX_DEGREE,
+        t=0.0
+        )
+    # Choose the function space such that the exact solution can be
+    # represented as well as possible.
+    V = FunctionSpace(mesh_generator(mesh_size), 'CG', 4)
+
+    def error(u, t):
+        fenics_sol.t = t
+        return errornorm(fenics_sol, u)
+
+    return ProblemClass(V), project(theta0, V), error
+
+
 def _compute_time_errors(problem, method, mesh_sizes, Dt, plot_error=False):
     mesh_generator, solution, ProblemClass, _ = problem()
     # Translate data into FEniCS expressions.
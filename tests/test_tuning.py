@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+import numpy
+import pytest
+
+import parabolic
+from parabolic.numpy_backend import Heat
+
+
+METHODS = {
+    'ExplicitEuler': parabolic.ExplicitEuler,
+    'ImplicitEuler': parabolic.ImplicitEuler,
+    'Trapezoidal': parabolic.Trapezoidal,
+    }
+
+
+class Factory(object):
+    def __init__(self, n):
+        self.n = n
+        self.num_calls = 0
+        return
+
+    def __call__(self, cache_size=4):
+        self.num_calls += 1
+        return Heat(self.n, cache_size=cache_size)
+
+
+def _u0(n):
+    x = numpy.linspace(0.0, 1.0, n+2)[1:-1]
+    return numpy.sin(numpy.pi * x) + 0.5 * numpy.sin(3 * numpy.pi * x)
+
+
+def test_autotune(tmp_path):
+    n = 50
+    factory = Factory(n)
+    u0 = _u0(n)
+    Dt = [1.0e-2, 3.0e-3, 1.0e-3, 3.0e-4]
+    options = parabolic.TuningOptions(
+        1.0e-4, METHODS, Dt,
+        solvers={'small': {'cache_size': 1}, 'large': {'cache_size': 4}},
+        cache_file=str(tmp_path / 'tuning.json')
+        )
+    best = parabolic.autotune(factory, u0, 0.0, 0.1, options)
+    assert best['error'] <= 1.0e-4
+    assert best['method'] in METHODS
+    assert best['dt'] in Dt
+    assert best['solver'] in ['small', 'large']
+    # Only Trapezoidal is second order.
+    assert abs(best['orders']['Trapezoidal/large'][-1] - 2.0) < 0.2
+    assert abs(best['orders']['ImplicitEuler/large'][-1] - 1.0) < 0.2
+
+    # Second call: from the cache, without running anything.
+    num_calls = factory.num_calls
+    assert parabolic.autotune(factory, u0, 0.0, 0.1, options) == best
+    assert factory.num_calls == num_calls + 1
+
+    # A different problem is a different key.
+    parabolic.autotune(
+        Factory(40), _u0(40), 0.0, 0.1,
+        parabolic.TuningOptions(
+            1.0e-4, METHODS, Dt, cache_file=options.cache_file
+            )
+        )
+    assert factory.num_calls == num_calls + 1
+    return
+
+
+def test_unstable_candidates_skipped():
+    # Explicit Euler is unstable for all step sizes here.
+    options = parabolic.TuningOptions(
+        5.0e-2,
+        {'ExplicitEuler': parabolic.ExplicitEuler,
+         'ImplicitEuler': parabolic.ImplicitEuler},
+        [1.0e-2, 5.0e-3]
+        )
+    best = parabolic.autotune(Factory(50), _u0(50), 0.0, 0.1, options)
+    assert best['method'] == 'ImplicitEuler'
+    return
+
+
+def test_unreachable_target():
+    with pytest.raises(ValueError):
+        parabolic.autotune(
+            Factory(20), _u0(20), 0.0, 0.1, parabolic.TuningOptions(
+                1.0e-12, {'ImplicitEuler': parabolic.ImplicitEuler}, [1.0e-2]
+                )
+            )
+    return
+
+
+def test_no_candidates():
+    with pytest.raises(ValueError):
+        parabolic.TuningOptions(1.0e-4, METHODS, [])
+    with pytest.raises(ValueError):
+        parabolic.TuningOptions(1.0e-4, {}, [1.0e-2])
+    return
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+#
+import numpy
+import pytest
+
+import parabolic
+from parabolic.numpy_backend import Heat
+
+
+def _setup(n):
+    # The nodal interpolant of sin(pi x) is an eigenvector of the discrete
+    # problem; take the eigenvalue of the discretization to exclude all
+    # spatial errors.
+    problem = Heat(n)
+    h = 1.0 / (n+1)
+    c = numpy.cos(numpy.pi * h)
+    lmbda = (2.0 - 2.0*c) / h / (h / 6.0 * (4.0 + 2.0*c))
+    u0 = numpy.sin(numpy.pi * problem.points[:, 0])
+
+    def error(u, t):
+        return numpy.max(abs(u - numpy.exp(-lmbda * t) * u0))
+
+    return problem, u0, error
+
+
+@pytest.mark.parametrize('method', [
+    parabolic.ExplicitEuler,
+    parabolic.ImplicitEuler,
+    parabolic.Trapezoidal,
+    ])
+def test_temporal_order(method):
+    mesh_sizes = [100, 200]
+    Dt = [1.0e-3, 0.5e-3]
+    errors, orders = parabolic.verify_temporal_order(
+        _setup, method, mesh_sizes, Dt, processes=2
+        )
+    assert errors.shape == (2, 2)
+    assert orders.shape == (2, 1)
+    assert (orders[:, 0] > method.order - 0.1).all()
+    return
+
+
+def test_serial_equals_parallel():
+    mesh_sizes = [10, 20]
+    Dt = [1.0e-2, 0.5e-2, 0.25e-2]
+    errors0 = parabolic.compute_time_errors(
+        _setup, parabolic.Trapezoidal, mesh_sizes, Dt, t_end=0.1,
+        processes=1
+        )
+    errors1 = parabolic.compute_time_errors(
+        _setup, parabolic.Trapezoidal, mesh_sizes, Dt, t_end=0.1,
+        processes=2
+        )
+    assert numpy.array_equal(errors0, errors1)
+    return
+
+
+def test_invalid_end_time():
+    with pytest.raises(ValueError):
+        parabolic.compute_time_errors(
+            _setup, parabolic.Trapezoidal, [10], [1.0e-2], t_end=0.0,
+            processes=1
+            )
+    return